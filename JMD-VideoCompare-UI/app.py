@@ -15,7 +15,7 @@ _BASE_DIR = (
 )
 sys.path.insert(0, str(_BASE_DIR))
 
-_CLI_COMMANDS = {"process", "ffmpeg-test", "--version", "-V", "--help", "-h"}
+_CLI_COMMANDS = {"process", "probe", "ffmpeg-test", "runtime-bench", "--version", "-V", "--help", "-h"}
 
 
 def _ensure_console_for_cli() -> None:
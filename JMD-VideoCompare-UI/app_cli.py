@@ -6,20 +6,86 @@ No Qt imports in this module.
 from __future__ import annotations
 
 import argparse
+import glob
+import json
 import os
 import re
 import subprocess
 import sys
-from dataclasses import dataclass
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, replace
+from functools import partial
 from pathlib import Path
 
 from app_info import APP_CLI_NAME, APP_NAME, cli_banner, version_label
-from ffmpeg_runtime import ensure_ffmpeg_runtime, validate_ffmpeg_pair
+from compare_command import (
+    IMAGE_OUTPUT_TYPES,
+    CompareJob,
+    OutputVariant,
+    audio_codec_args,
+    build_compare_command,
+    build_grid_command,
+    build_still_command,
+    compose_compare_command,
+    output_seconds,
+)
+from compare_graph import (
+    ANIMATED_FPS,
+    ANIMATED_TYPES,
+    ANIMATED_WIDTH,
+    LAYOUT_CHOICES,
+    CompareSource,
+    GRID_MAX_INPUTS,
+    IMAGE_EXTENSIONS,
+    SAMPLE_MODES,
+    SCALERS,
+    SLIDESHOW_FPS,
+    Segment,
+    TextLabel,
+    animated_codec_args,
+    build_fanout_graph,
+    format_clock,
+    parse_segment,
+    parse_roi,
+    parse_time,
+    rasterize_label,
+    required_filters,
+    roi_bitrate_k,
+)
+from ffmpeg_runtime import (
+    FFmpegCapabilities,
+    default_cache_root,
+    ensure_ffmpeg_runtime,
+    find_cached_ffmpeg_pair,
+    find_ffmpeg_pair_in_tree,
+    pin_runtime,
+    probe_capabilities,
+    read_pinned_runtime,
+    resolve_system_ffmpeg_pair,
+    runtime_version,
+    unpin_runtime,
+    validate_ffmpeg_pair,
+)
+from media_probe import MediaInfo, plan_seek, probe_media
+from preflight import (
+    AUDIO_AUTO,
+    AUDIO_COPY,
+    PreflightInput,
+    PreflightJob,
+    PreflightReport,
+    audio_encoder,
+    codec_fits_container,
+    resolve_audio_codec,
+    run_preflight,
+    source_audio_codec,
+)
 
 _COLOR_CHOICES = ["white", "black", "red", "green", "blue", "yellow", "purple", "cyan", "grey"]
 _VIDEO_CODEC_CHOICES = ["libx264", "libx265", "mpeg4", "vp9", "av1"]
 _AUDIO_CODEC_CHOICES = ["aac", "libmp3lame", "opus", "vorbis", "flac"]
-_OUTPUT_TYPE_CHOICES = ["mkv", "mp4", "avi", "mov", "flv", "wmv", "webm"]
+_OUTPUT_TYPE_CHOICES = ["mkv", "mp4", "avi", "mov", "flv", "wmv", "webm", *ANIMATED_TYPES]
 _POSITION_CHOICES = ["top", "middle", "bottom"]
 
 _FONT_STYLE_WORDS = (
@@ -50,47 +116,21 @@ def _strip_style_words(font_name: str) -> str:
     return " ".join(words) if words else font_name.strip()
 
 
-def _parse_time_to_seconds(time_str: str) -> float:
-    m = re.match(r"(\d+):(\d+):(\d+)(?:\.(\d+))?", time_str.strip())
-    if not m:
-        return 0.0
-    h, mm, s = int(m.group(1)), int(m.group(2)), int(m.group(3))
-    ms = int(m.group(4)) if m.group(4) else 0
-    return h * 3600 + mm * 60 + s + ms / 100.0
+def _time_arg(text: str) -> str:
+    """argparse type for FFmpeg-style times; rejects values FFmpeg would not take."""
+    try:
+        parse_time(text)
+    except RuntimeError as exc:
+        raise argparse.ArgumentTypeError(str(exc)) from None
+    return text.strip()
 
 
 def _print_update(message: str) -> None:
     print(message)
 
 
-def _probe_resolution(ffprobe_path: str, video_path: str) -> tuple[int, int]:
-    cmd = [
-        ffprobe_path,
-        "-v",
-        "error",
-        "-select_streams",
-        "v:0",
-        "-show_entries",
-        "stream=width,height",
-        "-of",
-        "csv=s=x:p=0",
-        video_path,
-    ]
-    result = subprocess.run(cmd, capture_output=True, text=True)
-    if result.returncode != 0:
-        raise RuntimeError(f"ffprobe failed for {video_path}: {result.stderr.strip()}")
-    match = re.match(r"(\d+)x(\d+)", result.stdout.strip())
-    if not match:
-        raise RuntimeError(f"Unable to parse resolution for {video_path}: {result.stdout.strip()}")
-    return int(match.group(1)), int(match.group(2))
-
-
-def _escape_drawtext_text(text: str) -> str:
-    return text.replace("\\", "\\\\").replace("'", "\\'")
-
-
-def _convert_font_path_for_ffmpeg(font_path: str) -> str:
-    return font_path.replace("\\", "/").replace(":", "\\:")
+def _print_status(message: str) -> None:
+    print(message, file=sys.stderr)
 
 
 def _scan_windows_fonts_registry() -> dict[str, str]:
@@ -169,6 +209,29 @@ def _resolve_font_path(explicit_path: str | None, family: str, font_cache: dict[
 class CliProcessOptions:
     video1: str
     video2: str
+    # Grid mode: 2-16 inputs given with --input instead of --video1/--video2.
+    inputs: list[str]
+    input_labels: list[str]
+    input_starts: list[str]
+    audio_input: int | None
+    # Fanout mode: --video1 is the reference for every --candidate.
+    candidates: list[str]
+    # Excerpts (START:DURATION) concatenated into one output instead of --duration.
+    segments: list[str]
+    title_cards: bool
+    title_card_seconds: float
+    # Sampled mode: keep keyframes, every Nth frame or one frame every N seconds.
+    sample: str | None
+    sample_interval: float
+    sample_png: bool
+    # Tile the (sampled) compare frames into COLSxROWS sheets; needs an image output type.
+    contact_sheet: str | None
+    # Frame-rate cap for animated gif/webp previews.
+    animated_fps: float
+    # Extra encodes of the same compare (codec=,bitrate=,size=,type=), fed from one graph.
+    variants: list[str]
+    # Concurrent FFmpeg processes for folders of still-image pairs.
+    workers: int
     output: str
     output_type: str
     start1: str
@@ -195,18 +258,62 @@ class CliProcessOptions:
     text2_color: str
     text1_position: str
     text2_position: str
+    layout: str | None
+    split_ratio: float
+    roi: str | None
+    roi_zoom: int
+    # Cap on the composed frame (0 = no cap), applied in each side's scale stage.
+    max_width: int
+    max_height: int
+    scaler: str
     dry_run: bool
+    preflight_only: bool
     ffmpeg_path: str | None
     ffprobe_path: str | None
     force_download_ffmpeg: bool
 
 
-def _position_expr(position: str) -> str:
-    if position == "top":
-        return "10"
-    if position == "bottom":
-        return "h-text_h-10"
-    return "(h-text_h)/2"
+_VARIANT_KEYS = ("codec", "bitrate", "size", "type")
+
+
+def _parse_variant(opts: CliProcessOptions, spec: str) -> OutputVariant:
+    values: dict[str, str] = {}
+    for item in spec.split(","):
+        key, sep, value = item.partition("=")
+        key, value = key.strip().lower(), value.strip()
+        if not sep or key not in _VARIANT_KEYS or not value:
+            raise RuntimeError(f"Invalid --variant '{spec}': expected comma-separated codec=, bitrate=, size=WxH, type= entries.")
+        values[key] = value
+
+    codec = values.get("codec", opts.video_codec)
+    if codec not in _VIDEO_CODEC_CHOICES:
+        raise RuntimeError(f"--variant '{spec}': unknown codec '{codec}' (choose from {', '.join(_VIDEO_CODEC_CHOICES)}).")
+    output_type = values.get("type", opts.output_type).lower()
+    if output_type not in _OUTPUT_TYPE_CHOICES:
+        raise RuntimeError(f"--variant '{spec}': unknown type '{output_type}' (choose from {', '.join(_OUTPUT_TYPE_CHOICES)}).")
+    bitrate = values.get("bitrate", str(opts.bitrate_k)).lower().removesuffix("k")
+    if not bitrate.isdigit() or int(bitrate) <= 0:
+        raise RuntimeError(f"--variant '{spec}': bitrate must be a positive number of kbps.")
+    size = None
+    if "size" in values:
+        m = re.fullmatch(r"(\d+)x(\d+)", values["size"].lower())
+        if not m or int(m.group(1)) < 2 or int(m.group(2)) < 2:
+            raise RuntimeError(f"--variant '{spec}': size must be WIDTHxHEIGHT, e.g. 1280x720.")
+        size = (int(m.group(1)), int(m.group(2)))
+
+    name = f"{codec}_{bitrate}k" + (f"_{size[0]}x{size[1]}" if size else "")
+    base = _output_file(opts)[: -len(opts.output_type) - 1]
+    return OutputVariant(codec, int(bitrate), output_type, size, f"{base}_{name}.{output_type}")
+
+
+def _variants(opts: CliProcessOptions) -> list[OutputVariant]:
+    variants = [_parse_variant(opts, spec) for spec in opts.variants]
+    seen: set[str] = set()
+    for index, variant in enumerate(variants, start=1):
+        if variant.output in seen:
+            variant.output = f"{variant.output[: -len(variant.output_type) - 1]}_{index}.{variant.output_type}"
+        seen.add(variant.output)
+    return variants
 
 
 def _build_ffmpeg_command(
@@ -220,77 +327,443 @@ def _build_ffmpeg_command(
     if not Path(opts.video2).exists():
         raise RuntimeError(f"Video 2 not found: {opts.video2}")
 
-    res1_w, res1_h = _probe_resolution(ffprobe_path, opts.video1)
-    res2_w, res2_h = _probe_resolution(ffprobe_path, opts.video2)
-    if res1_w <= 0 or res2_w <= 0:
-        raise RuntimeError("Failed to obtain valid input video resolutions.")
+    job = _compare_job(opts, font_cache)
+    return build_compare_command(ffmpeg_path, job, _probe_pair(opts, ffprobe_path, job))
+
+
+def _probe_pair(opts: CliProcessOptions, ffprobe_path: str, job: CompareJob) -> list[MediaInfo]:
+    # The keyframe index is only worth collecting when the input is seeked into
+    # (or, for keyframe sampling, to count the samples).
+    offset = job.segments[0].start if job.segments else 0.0
+    return [
+        probe_media(ffprobe_path, opts.video1, with_keyframes=job.starts[0] + offset > 0 or opts.sample == "keyframes"),
+        probe_media(ffprobe_path, opts.video2, with_keyframes=job.starts[1] + offset > 0),
+    ]
+
+
+def _compare_job(opts: CliProcessOptions, font_cache: dict[str, str]) -> CompareJob:
+    """The shared compare job for a --video1/--video2 or --input grid run."""
+    if opts.inputs:
+        font = _resolve_font_path(opts.text1_font_file, opts.text1_font_family, font_cache) if opts.text1_enable else ""
+        entries = _grid_entries(opts)
+        inputs = [path for path, _, _ in entries]
+        starts = [start for _, start, _ in entries]
+        labels = [
+            TextLabel(label, font, opts.text1_font_size, opts.text1_color, opts.text1_position) if font else None
+            for _, _, label in entries
+        ]
+    else:
+        inputs = [opts.video1, opts.video2]
+        starts = [parse_time(opts.start1), parse_time(opts.start2)]
+        labels = list(_labels(opts, font_cache))
+    title_card = None
+    if opts.segments and opts.title_cards:
+        font = _resolve_font_path(opts.text1_font_file, opts.text1_font_family, font_cache)
+        title_card = TextLabel("", font, opts.text1_font_size, opts.text1_color, "middle")
+    return CompareJob(
+        inputs=inputs,
+        output=_output_file(opts),
+        output_type=opts.output_type,
+        duration=parse_time(opts.duration),
+        starts=starts,
+        labels=labels,
+        video_codec=opts.video_codec,
+        bitrate_k=opts.bitrate_k,
+        audio_codec=opts.audio_codec,
+        audio_input=_audio_input_index(opts),
+        layout=_effective_layout(opts),
+        ratio=opts.split_ratio,
+        divider_width=opts.divider_width if opts.divider else 0,
+        divider_color=opts.divider_color,
+        roi=parse_roi(opts.roi) if opts.roi else None,
+        zoom=opts.roi_zoom,
+        max_size=(opts.max_width, opts.max_height),
+        scaler=opts.scaler,
+        sample=opts.sample,
+        sample_interval=opts.sample_interval,
+        image_type=_image_type(opts),
+        contact_sheet=_contact_sheet_shape(opts) if opts.contact_sheet else None,
+        animated_fps=opts.animated_fps,
+        segments=_segments(opts),
+        title_card=title_card,
+        title_card_seconds=opts.title_card_seconds,
+        variants=_variants(opts),
+    )
+
+
+def _image_type(opts: CliProcessOptions) -> str | None:
+    """The still-image output type, or None for video output."""
+    if opts.sample_png:
+        return "png"
+    return opts.output_type if opts.output_type in IMAGE_OUTPUT_TYPES else None
+
+
+def _image_dir(opts: CliProcessOptions) -> Path:
+    """Folder stills are written to: the output path without its extension."""
+    return Path(_output_file(opts)[: -len(opts.output_type) - 1])
 
-    half_width2 = res2_w // 2
-    if half_width2 % 2 != 0:
-        half_width2 -= 1
 
-    font1 = _resolve_font_path(opts.text1_font_file, opts.text1_font_family, font_cache)
-    font2 = _resolve_font_path(opts.text2_font_file, opts.text2_font_family, font_cache)
-    font1 = _convert_font_path_for_ffmpeg(font1)
-    font2 = _convert_font_path_for_ffmpeg(font2)
+def _contact_sheet_shape(opts: CliProcessOptions) -> tuple[int, int]:
+    m = re.fullmatch(r"(\d+)x(\d+)", (opts.contact_sheet or "").lower())
+    if not m or int(m.group(1)) < 1 or int(m.group(2)) < 1 or int(m.group(1)) * int(m.group(2)) < 2:
+        raise RuntimeError("--contact-sheet must be COLSxROWS with at least two cells, e.g. 4x3.")
+    return int(m.group(1)), int(m.group(2))
 
-    crop_scale_left = f"crop=iw/2:ih:0:0,scale=-2:{res2_h}"
-    crop_right = f"crop={half_width2}:{res2_h}:{half_width2}:0"
-    filter_complex = f"[0:v]{crop_scale_left}[left];[1:v]{crop_right}[right];"
 
+def _segments(opts: CliProcessOptions) -> list[Segment]:
+    return [parse_segment(text) for text in opts.segments]
+
+
+def _output_seconds(opts: CliProcessOptions, ffprobe_path: str, font_cache: dict[str, str]) -> float:
+    """Length of the output, for progress reporting."""
+    info = probe_media(ffprobe_path, opts.video1, with_keyframes=opts.sample == "keyframes") if opts.sample else None
+    return output_seconds(_compare_job(opts, font_cache), info)
+
+
+def _build_grid_command(
+    opts: CliProcessOptions,
+    ffmpeg_path: str,
+    ffprobe_path: str,
+    font_cache: dict[str, str],
+    script_path: str,
+) -> list[str]:
+    """Build one FFmpeg invocation tiling every --input into a grid, with the graph in `script_path`."""
+    job = _compare_job(opts, font_cache)
+    media = [probe_media(ffprobe_path, path, with_keyframes=start > 0) for path, start in zip(job.inputs, job.starts)]
+    return build_grid_command(ffmpeg_path, job, media, script_path)
+
+
+def _fanout_outputs(opts: CliProcessOptions) -> list[str]:
+    """One output per candidate, named <output>_<candidate file name>."""
+    base = _output_file(opts)[: -len(opts.output_type) - 1]
+    names: list[str] = []
+    for index, candidate in enumerate(opts.candidates, start=1):
+        name = Path(candidate).stem
+        if name in names:
+            name = f"{name}_{index}"
+        names.append(name)
+    return [f"{base}_{name}.{opts.output_type}" for name in names]
+
+
+def _build_fanout_command(
+    opts: CliProcessOptions,
+    ffmpeg_path: str,
+    ffprobe_path: str,
+    font_cache: dict[str, str],
+) -> list[str]:
+    """Compare --video1 against every --candidate, writing one output each from one process."""
+    label1 = None
     if opts.text1_enable:
-        text1 = _escape_drawtext_text(opts.text1)
-        filter_complex += (
-            f"[left]drawtext=text='{text1}':fontfile='{font1}':fontsize={opts.text1_font_size}:"
-            f"fontcolor={opts.text1_color}:x=(w-text_w)/2:y={_position_expr(opts.text1_position)}[left];"
-        )
+        font1 = _resolve_font_path(opts.text1_font_file, opts.text1_font_family, font_cache)
+        label1 = TextLabel(opts.text1, font1, opts.text1_font_size, opts.text1_color, opts.text1_position)
+    font2 = _resolve_font_path(opts.text2_font_file, opts.text2_font_family, font_cache) if opts.text2_enable else ""
+
+    start1 = parse_time(opts.start1)
+    start2 = parse_time(opts.start2)
+    info1 = probe_media(ffprobe_path, opts.video1, with_keyframes=start1 > 0)
+    seek1 = plan_seek(info1, start1)
+    input_args = [*seek1.input_args(), "-i", opts.video1]
+    candidates = []
+    candidate_audio: list[str] = []
+    for path in opts.candidates:
+        info = probe_media(ffprobe_path, path, with_keyframes=start2 > 0)
+        candidate_audio.append(source_audio_codec(info))
+        seek = plan_seek(info, start2)
+        input_args += [*seek.input_args(), "-i", path]
+        label = TextLabel(Path(path).stem, font2, opts.text2_font_size, opts.text2_color, opts.text2_position) if font2 else None
+        candidates.append(CompareSource(*info.display_resolution, info.pix_fmt, seek.trim, label))
+
+    roi = parse_roi(opts.roi) if opts.roi else None
+    graph = build_fanout_graph(
+        CompareSource(*info1.display_resolution, info1.pix_fmt, seek1.trim, label1),
+        candidates,
+        audio_from={"video1": "reference", "video2": "candidate"}.get(opts.audio_source),
+        render_label=partial(rasterize_label, ffmpeg_path),
+        layout=_effective_layout(opts),
+        ratio=opts.split_ratio,
+        divider_width=opts.divider_width if opts.divider else 0,
+        divider_color=opts.divider_color,
+        roi=roi,
+        zoom=opts.roi_zoom,
+        max_size=(opts.max_width, opts.max_height),
+        scaler=opts.scaler,
+    )
+    bitrate_k = roi_bitrate_k(opts.bitrate_k, roi, opts.roi_zoom, info1.display_resolution) if roi else opts.bitrate_k
+
+    cmd = [ffmpeg_path, *input_args]
+    for label_image in graph.extra_inputs:
+        cmd.extend(["-i", label_image])
+    cmd += ["-filter_complex", graph.filter_complex]
+    outputs = zip(graph.video_maps, graph.audio_maps, candidate_audio, _fanout_outputs(opts))
+    duration = format_clock(parse_time(opts.duration))
+    for video_map, audio_map, audio_codec, output_file in outputs:
+        cmd += ["-map", video_map, "-t", duration, "-c:v", opts.video_codec, "-b:v", f"{bitrate_k}k"]
+        if audio_map is not None:
+            source = source_audio_codec(info1) if opts.audio_source == "video1" else audio_codec
+            cmd.extend(["-map", audio_map, *audio_codec_args(opts.audio_codec, audio_map, source, opts.output_type)])
+        cmd.append(output_file)
+    return cmd
+
+
+def _effective_layout(opts: CliProcessOptions) -> str:
+    # A region of interest is most useful shown whole on both sides.
+    if opts.layout:
+        return opts.layout
+    return "side-by-side" if opts.roi else "split"
+
+
+def _output_file(opts: CliProcessOptions) -> str:
+    if opts.output.lower().endswith(f".{opts.output_type.lower()}"):
+        return opts.output
+    return f"{opts.output}.{opts.output_type}"
+
+
+def _audio_input_index(opts: CliProcessOptions) -> int | None:
+    if opts.audio_source == "none" or opts.sample or _image_type(opts) or opts.output_type in ANIMATED_TYPES:
+        return None
+    if opts.inputs and opts.audio_input is not None:
+        return opts.audio_input - 1
+    return {"video1": 0, "video2": 1}.get(opts.audio_source)
+
+
+def _grid_entries(opts: CliProcessOptions) -> list[tuple[str, float, str]]:
+    """(path, start seconds, label) for each --input, filling unset labels and starts."""
+    entries = []
+    for index, path in enumerate(opts.inputs):
+        start = opts.input_starts[index] if index < len(opts.input_starts) else "00:00:00"
+        label = opts.input_labels[index] if index < len(opts.input_labels) else Path(path).stem
+        entries.append((path, parse_time(start), label))
+    return entries
+
+
+def _preflight_job(opts: CliProcessOptions, font_cache: dict[str, str]) -> PreflightJob:
+    fonts = {}
+    if opts.text1_enable:
+        fonts["text1"] = lambda: _resolve_font_path(opts.text1_font_file, opts.text1_font_family, font_cache)
+    if opts.text2_enable and not opts.inputs:
+        fonts["text2"] = lambda: _resolve_font_path(opts.text2_font_file, opts.text2_font_family, font_cache)
+    if opts.inputs:
+        inputs = [PreflightInput(path, start, f"input{index + 1}") for index, (path, start, _) in enumerate(_grid_entries(opts))]
+    elif opts.candidates:
+        start2 = parse_time(opts.start2)
+        inputs = [
+            PreflightInput(opts.video1, parse_time(opts.start1), "reference"),
+            *(PreflightInput(path, start2, f"candidate{index}") for index, path in enumerate(opts.candidates, start=1)),
+        ]
+    else:
+        inputs = [
+            PreflightInput(opts.video1, parse_time(opts.start1), "video1"),
+            PreflightInput(opts.video2, parse_time(opts.start2), "video2"),
+        ]
+    duration = parse_time(opts.duration)
+    if opts.segments:
+        # Check the span from the first excerpt to the end of the last one.
+        segments = _segments(opts)
+        for item in inputs:
+            item.start += segments[0].start
+        duration = segments[-1].end - segments[0].start
+        if opts.title_cards and "text1" not in fonts:
+            fonts["title cards"] = lambda: _resolve_font_path(opts.text1_font_file, opts.text1_font_family, font_cache)
+    video_codec, output_type, bitrate_k = opts.video_codec, opts.output_type, opts.bitrate_k
+    if opts.candidates:
+        outputs = _fanout_outputs(opts)
+    elif opts.variants:
+        # Codecs and containers of every variant were checked up front; size the disk estimate for the largest.
+        variants = _variants(opts)
+        outputs = [variant.output for variant in variants]
+        video_codec, output_type = variants[0].video_codec, variants[0].output_type
+        bitrate_k = max(variant.bitrate_k for variant in variants)
+    elif _image_type(opts):
+        outputs = [str(_image_dir(opts))]
+    else:
+        outputs = [_output_file(opts)]
+    return PreflightJob(
+        inputs=inputs,
+        output_path=outputs[0],
+        output_type=output_type,
+        duration=duration,
+        video_codec=video_codec,
+        audio_codec=opts.audio_codec,
+        bitrate_k=bitrate_k,
+        audio_input=_audio_input_index(opts),
+        fonts=fonts,
+        extra_outputs=outputs[1:],
+    )
+
+
+def _print_preflight(report: PreflightReport, *, verbose: bool) -> None:
+    for check in report.checks:
+        if verbose or not check.ok:
+            status = "ok" if check.ok else check.severity
+            print(f"  {status:<8} {check.name:<16} {check.message}")
+    print(f"Preflight {'passed' if report.ok else 'failed'} in {report.elapsed * 1000:.0f} ms.")
+
+
+def _labels(opts: CliProcessOptions, font_cache: dict[str, str]) -> tuple[TextLabel | None, TextLabel | None]:
+    label1 = label2 = None
+    if opts.text1_enable:
+        font1 = _resolve_font_path(opts.text1_font_file, opts.text1_font_family, font_cache)
+        label1 = TextLabel(opts.text1, font1, opts.text1_font_size, opts.text1_color, opts.text1_position)
     if opts.text2_enable:
-        text2 = _escape_drawtext_text(opts.text2)
-        filter_complex += (
-            f"[right]drawtext=text='{text2}':fontfile='{font2}':fontsize={opts.text2_font_size}:"
-            f"fontcolor={opts.text2_color}:x=(w-text_w)/2:y={_position_expr(opts.text2_position)}[right];"
+        font2 = _resolve_font_path(opts.text2_font_file, opts.text2_font_family, font_cache)
+        label2 = TextLabel(opts.text2, font2, opts.text2_font_size, opts.text2_color, opts.text2_position)
+    return label1, label2
+
+
+def _image_pairs(opts: CliProcessOptions, ffprobe_path: str) -> list[tuple[str, str, str]] | None:
+    """(image 1, image 2, output PNG) for a still compare, or None when the inputs are videos."""
+    folder1, folder2 = Path(opts.video1), Path(opts.video2)
+    if folder1.is_dir() or folder2.is_dir():
+        if not (folder1.is_dir() and folder2.is_dir()):
+            raise RuntimeError("For a batch of image pairs, --video1 and --video2 must both be folders.")
+        # Pairs are matched by file name.
+        names = sorted(
+            path.name for path in folder1.iterdir() if path.suffix.lower() in IMAGE_EXTENSIONS and (folder2 / path.name).is_file()
         )
+        if not names:
+            raise RuntimeError(f"No images with the same name found in {folder1} and {folder2}.")
+        return [(str(folder1 / name), str(folder2 / name), str(Path(opts.output) / f"{Path(name).stem}.png")) for name in names]
 
-    divider_layout = f"|w0+{opts.divider_width}_0" if opts.divider else "|w0_0"
-    filter_complex += f"[left][right]xstack=inputs=2:layout=0_0{divider_layout}:fill={opts.divider_color}[v]"
-
-    output_file = opts.output
-    if not output_file.lower().endswith(f".{opts.output_type.lower()}"):
-        output_file = f"{output_file}.{opts.output_type}"
-
-    cmd = [
-        ffmpeg_path,
-        "-ss",
-        opts.start1,
-        "-i",
-        opts.video1,
-        "-ss",
-        opts.start2,
-        "-i",
-        opts.video2,
-        "-filter_complex",
-        filter_complex,
-        "-map",
-        "[v]",
-        "-t",
-        opts.duration,
-        "-c:v",
-        opts.video_codec,
-        "-b:v",
-        f"{opts.bitrate_k}k",
-    ]
+    images = [probe_media(ffprobe_path, path).is_image for path in (opts.video1, opts.video2)]
+    if not any(images):
+        return None
+    if not all(images):
+        raise RuntimeError("Video 1 and Video 2 must both be videos or both be still images.")
+    output = opts.output if opts.output.lower().endswith(".png") else f"{opts.output}.png"
+    return [(opts.video1, opts.video2, output)]
 
-    if opts.audio_source == "video1":
-        cmd.extend(["-map", "0:a", "-c:a", opts.audio_codec])
-    elif opts.audio_source == "video2":
-        cmd.extend(["-map", "1:a", "-c:a", opts.audio_codec])
 
-    cmd.append(output_file)
-    return cmd
+def _build_image_command(
+    opts: CliProcessOptions,
+    ffmpeg_path: str,
+    ffprobe_path: str,
+    font_cache: dict[str, str],
+    image1: str,
+    image2: str,
+    output: str,
+) -> list[str]:
+    """One image-to-image FFmpeg call writing the compare as a lossless PNG."""
+    job = replace(
+        _compare_job(opts, font_cache),
+        inputs=[image1, image2],
+        output=output,
+        # Stills are usually judged whole, so they default to side-by-side.
+        layout=opts.layout or "side-by-side",
+    )
+    cmd = build_still_command(ffmpeg_path, job, [probe_media(ffprobe_path, image1), probe_media(ffprobe_path, image2)])
+    return [cmd[0], "-v", "error", *cmd[1:]]
+
 
+def _run_image_pairs(
+    opts: CliProcessOptions,
+    ffmpeg_path: str,
+    ffprobe_path: str,
+    pairs: list[tuple[str, str, str]],
+) -> int:
+    if opts.sample or opts.segments or opts.variants or opts.contact_sheet:
+        raise RuntimeError("--sample, --segment, --variant and --contact-sheet apply to videos, not still images.")
+    if not probe_capabilities(Path(ffmpeg_path)).has_encoder("png", "V"):
+        raise RuntimeError("Resolved FFmpeg build does not support: video encoder 'png'.")
 
-def _run_ffmpeg_command(cmd: list[str], duration: str) -> int:
-    duration_seconds = _parse_time_to_seconds(duration)
+    font_cache = _scan_windows_fonts_registry()
+    # The first command renders the label bands into the cache; the rest reuse them.
+    first = _build_image_command(opts, ffmpeg_path, ffprobe_path, font_cache, *pairs[0])
+    print("FFmpeg command:")
+    print(" ".join(first))
+    if len(pairs) > 1:
+        print(f"... and {len(pairs) - 1} more image pair(s) with {opts.workers} worker(s).")
+    if opts.dry_run:
+        return 0
+    if Path(opts.video1).is_dir():
+        # A folder batch writes into --output, even when only one pair matched.
+        Path(opts.output).mkdir(parents=True, exist_ok=True)
+
+    def compare(index: int) -> None:
+        cmd = first if index == 0 else _build_image_command(opts, ffmpeg_path, ffprobe_path, font_cache, *pairs[index])
+        result = subprocess.run(cmd, capture_output=True, text=True)
+        if result.returncode != 0:
+            raise RuntimeError(result.stderr.strip() or f"FFmpeg exited with code {result.returncode}.")
+
+    failures = 0
+    with ThreadPoolExecutor(max_workers=opts.workers) as pool:
+        futures = {pool.submit(compare, index): pairs[index][2] for index in range(len(pairs))}
+        for done, future in enumerate(as_completed(futures), start=1):
+            try:
+                future.result()
+            except Exception as exc:
+                failures += 1
+                print(f"[output] failed  {futures[future]}: {exc}")
+            print(f"[progress] {100 * done // len(pairs)}%")
+    print(f"Wrote {len(pairs) - failures} of {len(pairs)} still compare(s).")
+    return 1 if failures else 0
+
+
+def _report_outputs(outputs: list[str], returncode: int) -> int:
+    """
+    Print one status line per output; a missing or empty output fails the run.
+    A folder output (image sequence) counts as empty when it holds no files.
+    """
+    failed = False
+    for path in outputs:
+        if Path(path).is_dir():
+            size = sum(item.stat().st_size for item in Path(path).iterdir() if item.is_file())
+        else:
+            size = Path(path).stat().st_size if Path(path).is_file() else 0
+        if returncode == 0 and size > 0:
+            print(f"[output] ok      {path} ({size / 1e6:.1f} MB)")
+        else:
+            failed = True
+            print(f"[output] failed  {path}")
+    return returncode or int(failed)
+
+
+def _check_runtime_capabilities(opts: CliProcessOptions, caps: FFmpegCapabilities) -> None:
+    missing: list[str] = []
+    image_type = _image_type(opts)
+    video_encoder = IMAGE_OUTPUT_TYPES[image_type][1] if image_type else opts.video_codec
+    if opts.output_type in ANIMATED_TYPES:
+        video_encoder = animated_codec_args(opts.output_type)[1]
+    if not caps.has_encoder(video_encoder, "V"):
+        missing.append(f"video encoder '{video_encoder}'")
+    # For auto this is the encoder it falls back to when the source track cannot be copied.
+    audio_name = opts.audio_codec if opts.audio_codec == AUDIO_COPY else resolve_audio_codec(opts.audio_codec, opts.output_type, "")
+    if _audio_input_index(opts) is not None and audio_name != AUDIO_COPY and not caps.has_encoder(audio_name, "A"):
+        missing.append(f"audio encoder '{audio_name}'")
+    if not caps.supports_output_type(image_type or opts.output_type):
+        missing.append(f"muxer for '{image_type or opts.output_type}'")
+    filters = required_filters(
+        "grid" if opts.inputs else _effective_layout(opts),
+        divider=opts.divider,
+        labels=opts.text1_enable or opts.text2_enable,
+    )
+    if len(opts.candidates) > 1:
+        filters.append("split")
+    if opts.sample:
+        filters.append({"frames": "select", "seconds": "select", "keyframes": "setpts"}[opts.sample])
+    if opts.contact_sheet:
+        filters.extend(["select", "tile"])
+    if opts.output_type in ANIMATED_TYPES:
+        filters.extend(["fps", "split", "palettegen", "paletteuse"] if opts.output_type == "gif" else ["fps"])
+    if opts.segments:
+        filters.extend(["split", "trim", "concat"])
+        if opts.title_cards:
+            # Card text is rasterized with drawtext and laid over a colour clip.
+            filters.extend(["color", "drawtext", "overlay", "setsar"])
+            if _audio_input_index(opts) is not None:
+                filters.extend(["anullsrc", "atrim", "aformat"])
+    for variant in _variants(opts):
+        if not caps.has_encoder(variant.video_codec, "V"):
+            missing.append(f"video encoder '{variant.video_codec}'")
+        if not caps.supports_output_type(variant.output_type):
+            missing.append(f"muxer for '{variant.output_type}'")
+    if opts.variants:
+        filters.extend(["split", "asplit"] if opts.audio_source != "none" else ["split"])
+    missing.extend(f"filter '{name}'" for name in dict.fromkeys(filters) if not caps.has_filter(name))
+    if missing:
+        raise RuntimeError(f"Resolved FFmpeg build does not support: {', '.join(missing)}.")
+
+
+def _run_ffmpeg_command(cmd: list[str], duration_seconds: float) -> int:
     time_re = re.compile(r"time=(\d+):(\d+):(\d+)\.?(\d*)")
 
     process = subprocess.Popen(
@@ -322,8 +795,23 @@ def _run_ffmpeg_command(cmd: list[str], duration: str) -> int:
 
 def _run_process_command(args: argparse.Namespace, base_dir: Path) -> int:
     opts = CliProcessOptions(
-        video1=args.video1,
-        video2=args.video2,
+        video1=args.video1 or "",
+        video2=args.video2 or "",
+        inputs=list(args.input or []),
+        input_labels=list(args.input_label or []),
+        input_starts=list(args.input_start or []),
+        audio_input=args.audio_input,
+        candidates=list(args.candidate or []),
+        segments=list(args.segment or []),
+        title_cards=bool(args.title_cards),
+        title_card_seconds=float(args.title_card_seconds),
+        sample=args.sample,
+        sample_interval=float(args.sample_interval),
+        sample_png=bool(args.sample_png),
+        contact_sheet=args.contact_sheet,
+        animated_fps=float(args.animated_fps),
+        variants=list(args.variant or []),
+        workers=max(1, int(args.workers)),
         output=args.output,
         output_type=args.output_type,
         start1=args.start1,
@@ -350,12 +838,91 @@ def _run_process_command(args: argparse.Namespace, base_dir: Path) -> int:
         text2_color=args.text2_color,
         text1_position=args.text1_position,
         text2_position=args.text2_position,
+        layout=args.layout,
+        split_ratio=float(args.split_ratio),
+        roi=args.roi,
+        roi_zoom=int(args.roi_zoom),
+        max_width=int(args.max_width),
+        max_height=int(args.max_height),
+        scaler=args.scaler,
         dry_run=bool(args.dry_run),
+        preflight_only=bool(args.preflight_only),
         ffmpeg_path=args.ffmpeg_path,
         ffprobe_path=args.ffprobe_path,
         force_download_ffmpeg=bool(args.force_download_ffmpeg),
     )
 
+    if opts.inputs:
+        if opts.video1 or opts.video2 or opts.candidates:
+            raise RuntimeError("Use either --input (grid) or --video1/--video2, not both.")
+        if not 2 <= len(opts.inputs) <= GRID_MAX_INPUTS:
+            raise RuntimeError(f"Grid compare needs 2 to {GRID_MAX_INPUTS} --input files.")
+        if len(opts.input_labels) > len(opts.inputs) or len(opts.input_starts) > len(opts.inputs):
+            raise RuntimeError("More --input-label/--input-start values than --input files.")
+        if opts.audio_input is not None and not 1 <= opts.audio_input <= len(opts.inputs):
+            raise RuntimeError(f"--audio-input must be between 1 and {len(opts.inputs)}.")
+        if opts.roi or opts.layout:
+            raise RuntimeError("--roi and --layout apply to two-input compares only.")
+    elif opts.candidates:
+        if not opts.video1 or opts.video2:
+            raise RuntimeError("--candidate compares against --video1; leave out --video2.")
+    elif not (opts.video1 and opts.video2):
+        raise RuntimeError("Give --video1 and --video2, or 2 to 16 --input files.")
+    elif opts.input_labels or opts.input_starts or opts.audio_input is not None:
+        raise RuntimeError("--input-label, --input-start and --audio-input need --input.")
+
+    if opts.segments:
+        if opts.inputs or opts.candidates:
+            raise RuntimeError("--segment works with --video1/--video2 compares only.")
+        segments = _segments(opts)
+        if any(current.start < previous.end for previous, current in zip(segments, segments[1:])):
+            raise RuntimeError("--segment values must be in time order and must not overlap.")
+    elif opts.title_cards:
+        raise RuntimeError("--title-cards needs --segment.")
+    if opts.sample:
+        if opts.inputs or opts.candidates or opts.segments:
+            raise RuntimeError("--sample works with plain --video1/--video2 compares only.")
+        if opts.sample_interval <= 0:
+            raise RuntimeError("--sample-interval must be greater than zero.")
+    elif opts.sample_png:
+        raise RuntimeError("--sample-png needs --sample.")
+    if opts.sample_png and opts.output_type in IMAGE_OUTPUT_TYPES:
+        raise RuntimeError(f"--sample-png writes PNG files; leave it out with --output-type {opts.output_type}.")
+    if _image_type(opts) and (opts.inputs or opts.candidates or opts.segments):
+        raise RuntimeError("Image output works with --video1/--video2 compares only.")
+    if opts.output_type in ANIMATED_TYPES:
+        if opts.inputs or opts.candidates or opts.sample:
+            raise RuntimeError("Animated gif/webp output works with --video1/--video2 compares (optionally with --segment) only.")
+        if opts.animated_fps <= 0:
+            raise RuntimeError("--animated-fps must be greater than zero.")
+    if opts.contact_sheet:
+        _contact_sheet_shape(opts)
+        if not _image_type(opts):
+            raise RuntimeError(f"--contact-sheet needs --output-type {', '.join(IMAGE_OUTPUT_TYPES)}.")
+    if opts.variants:
+        if opts.inputs or opts.candidates or opts.sample or _image_type(opts) or opts.output_type in ANIMATED_TYPES:
+            raise RuntimeError("--variant works with --video1/--video2 compares (optionally with --segment) only.")
+        for variant in _variants(opts):
+            if variant.output_type in ANIMATED_TYPES:
+                raise RuntimeError("--variant: animated gif/webp previews cannot be variants.")
+            if not codec_fits_container(variant.output_type, variant.video_codec, "video"):
+                raise RuntimeError(f"--variant: {variant.video_codec} cannot be written to .{variant.output_type}.")
+            if (
+                opts.audio_source != "none"
+                and opts.audio_codec not in (AUDIO_AUTO, AUDIO_COPY)
+                and not codec_fits_container(variant.output_type, opts.audio_codec, "audio")
+            ):
+                raise RuntimeError(f"--variant: {opts.audio_codec} audio cannot be written to .{variant.output_type}.")
+
+    if opts.roi:
+        parse_roi(opts.roi)
+    elif opts.roi_zoom != 1:
+        raise RuntimeError("--roi-zoom needs --roi.")
+    if not 0.0 < opts.split_ratio < 1.0:
+        raise RuntimeError("--split-ratio must be between 0 and 1.")
+    if opts.max_width < 0 or opts.max_height < 0:
+        raise RuntimeError("--max-width and --max-height must be zero (no cap) or positive.")
+
     if opts.ffmpeg_path and not opts.ffprobe_path:
         sibling = Path(opts.ffmpeg_path).with_name("ffprobe.exe")
         if sibling.exists():
@@ -380,15 +947,68 @@ def _run_process_command(args: argparse.Namespace, base_dir: Path) -> int:
     print(f"Using FFmpeg source: {source}")
     print(f"ffmpeg:  {ffmpeg_path}")
     print(f"ffprobe: {ffprobe_path}")
+    if not opts.inputs and not opts.candidates:
+        pairs = _image_pairs(opts, ffprobe_path)
+        if pairs is not None:
+            # Stills skip the video pipeline (and its preflight) entirely.
+            return _run_image_pairs(opts, ffmpeg_path, ffprobe_path, pairs)
+    _check_runtime_capabilities(opts, probe_capabilities(Path(ffmpeg_path)))
 
     font_cache = _scan_windows_fonts_registry()
-    cmd = _build_ffmpeg_command(opts, ffmpeg_path, ffprobe_path, font_cache)
+    report = run_preflight(ffprobe_path, _preflight_job(opts, font_cache))
+    _print_preflight(report, verbose=opts.preflight_only)
+    if opts.preflight_only:
+        return 0 if report.ok else 1
+    if not report.ok:
+        raise RuntimeError("Preflight failed: " + " ".join(check.message for check in report.errors))
+
+    if opts.inputs:
+        return _run_grid_command(opts, ffmpeg_path, ffprobe_path, font_cache)
+
+    if opts.candidates:
+        cmd = _build_fanout_command(opts, ffmpeg_path, ffprobe_path, font_cache)
+    else:
+        cmd = _build_ffmpeg_command(opts, ffmpeg_path, ffprobe_path, font_cache)
     print("FFmpeg command:")
     print(" ".join(cmd))
     if opts.dry_run:
         return 0
 
-    return _run_ffmpeg_command(cmd, opts.duration)
+    if _image_type(opts):
+        _image_dir(opts).mkdir(exist_ok=True)
+    if opts.candidates or opts.variants:
+        count = len(opts.candidates) if opts.candidates else len(opts.variants)
+        # One process encodes every output from the same graph, so they all advance together.
+        print(f"Encoding {count} outputs in one pass; each [progress] line applies to every output.")
+    returncode = _run_ffmpeg_command(cmd, _output_seconds(opts, ffprobe_path, font_cache))
+    if opts.candidates:
+        return _report_outputs(_fanout_outputs(opts), returncode)
+    if opts.variants:
+        return _report_outputs([variant.output for variant in _variants(opts)], returncode)
+    if _image_type(opts):
+        return _report_outputs([str(_image_dir(opts))], returncode)
+    return returncode
+
+
+def _run_grid_command(
+    opts: CliProcessOptions,
+    ffmpeg_path: str,
+    ffprobe_path: str,
+    font_cache: dict[str, str],
+) -> int:
+    fd, script_path = tempfile.mkstemp(prefix="compare-grid-", suffix=".txt")
+    os.close(fd)
+    try:
+        cmd = _build_grid_command(opts, ffmpeg_path, ffprobe_path, font_cache, script_path)
+        print("FFmpeg command:")
+        print(" ".join(cmd))
+        if opts.dry_run:
+            print("Filter script:")
+            print(Path(script_path).read_text(encoding="utf-8"))
+            return 0
+        return _run_ffmpeg_command(cmd, parse_time(opts.duration))
+    finally:
+        Path(script_path).unlink(missing_ok=True)
 
 
 def _run_ffmpeg_test_command(args: argparse.Namespace, base_dir: Path) -> int:
@@ -404,9 +1024,268 @@ def _run_ffmpeg_test_command(args: argparse.Namespace, base_dir: Path) -> int:
         print("Validation failed.", file=sys.stderr)
         return 2
     print("FFmpeg runtime validation successful.")
+
+    caps = probe_capabilities(Path(ffmpeg_path))
+    print(f"Version: {caps.version}")
+    for label, choices, media_type in (
+        ("Video codecs", _VIDEO_CODEC_CHOICES, "V"),
+        ("Audio codecs", _AUDIO_CODEC_CHOICES, "A"),
+    ):
+        available = [name for name in choices if caps.has_encoder(audio_encoder(name) if media_type == "A" else name, media_type)]
+        print(f"{label}: {', '.join(available) or 'none'}")
+    output_types = [name for name in (*_OUTPUT_TYPE_CHOICES, *IMAGE_OUTPUT_TYPES) if caps.supports_output_type(name)]
+    print(f"Output types: {', '.join(output_types) or 'none'}")
     return 0
 
 
+_BENCH_LINE_RE = re.compile(r"bench:\s*utime=([\d.]+)s\s+stime=([\d.]+)s\s+rtime=([\d.]+)s")
+_FRAME_RE = re.compile(r"frame=\s*(\d+)")
+
+
+@dataclass
+class BenchResult:
+    label: str
+    ffmpeg_path: str
+    ffprobe_path: str
+    version: str
+    wall_seconds: float
+    cpu_seconds: float
+    frames: int
+    returncode: int
+
+    @property
+    def fps(self) -> float:
+        return self.frames / self.wall_seconds if self.wall_seconds > 0 else 0.0
+
+
+def _resolve_bench_runtime(spec: str, base_dir: Path) -> tuple[Path | None, Path | None]:
+    name = spec.lower()
+    if name == "system":
+        return resolve_system_ffmpeg_pair()
+    if name == "bundled":
+        ffmpeg = base_dir / "bin" / "ffmpeg.exe"
+        ffprobe = base_dir / "bin" / "ffprobe.exe"
+        return (ffmpeg, ffprobe) if validate_ffmpeg_pair(ffmpeg, ffprobe) else (None, None)
+    if name == "cached":
+        return find_cached_ffmpeg_pair(default_cache_root())
+    if name == "pinned":
+        return read_pinned_runtime(update_cb=_print_update)
+    if name == "auto":
+        ffmpeg_path, ffprobe_path, _ = ensure_ffmpeg_runtime(base_dir, _print_update)
+        return Path(ffmpeg_path), Path(ffprobe_path)
+
+    path = Path(spec)
+    if path.is_file():
+        ffprobe = path.with_name("ffprobe.exe")
+        return (path, ffprobe) if validate_ffmpeg_pair(path, ffprobe) else (None, None)
+    if path.is_dir():
+        return find_ffmpeg_pair_in_tree(path)
+    return None, None
+
+
+def _bench_options(args: argparse.Namespace) -> CliProcessOptions:
+    return CliProcessOptions(
+        video1="testsrc2",
+        video2="testsrc2",
+        inputs=[],
+        input_labels=[],
+        input_starts=[],
+        audio_input=None,
+        candidates=[],
+        segments=[],
+        title_cards=False,
+        title_card_seconds=2.0,
+        sample=None,
+        sample_interval=10.0,
+        sample_png=False,
+        contact_sheet=None,
+        animated_fps=ANIMATED_FPS,
+        variants=[],
+        workers=1,
+        output="-",
+        output_type="null",
+        start1="00:00:00",
+        start2="00:00:00",
+        duration=str(args.duration),
+        video_codec=args.video_codec,
+        audio_codec="aac",
+        bitrate_k=int(args.bitrate),
+        divider=True,
+        divider_width=4,
+        divider_color="white",
+        audio_source="none",
+        text1_enable=bool(args.text),
+        text2_enable=bool(args.text),
+        text1="Runtime A",
+        text2="Runtime B",
+        text1_font_family="Arial",
+        text2_font_family="Arial",
+        text1_font_file=args.font_file,
+        text2_font_file=args.font_file,
+        text1_font_size=48,
+        text2_font_size=48,
+        text1_color="white",
+        text2_color="white",
+        text1_position="bottom",
+        text2_position="bottom",
+        layout=None,
+        split_ratio=0.5,
+        roi=None,
+        roi_zoom=1,
+        max_width=0,
+        max_height=0,
+        scaler="",
+        dry_run=False,
+        preflight_only=False,
+        ffmpeg_path=None,
+        ffprobe_path=None,
+        force_download_ffmpeg=False,
+    )
+
+
+def _run_bench_once(cmd: list[str]) -> tuple[float, float, int, int]:
+    started = time.perf_counter()
+    result = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
+    wall = time.perf_counter() - started
+    output = (result.stdout or "").replace("\r", "\n")
+    cpu = 0.0
+    bench = _BENCH_LINE_RE.search(output)
+    if bench:
+        cpu = float(bench.group(1)) + float(bench.group(2))
+    frames = [int(m) for m in _FRAME_RE.findall(output)]
+    return wall, cpu, frames[-1] if frames else 0, int(result.returncode or 0)
+
+
+def _run_runtime_bench_command(args: argparse.Namespace, base_dir: Path) -> int:
+    if args.unpin:
+        unpin_runtime()
+        print("Pinned runtime cleared.")
+        return 0
+
+    specs = args.runtime or ["system", "bundled", "cached"]
+    runtimes: list[tuple[str, Path, Path]] = []
+    seen: set[str] = set()
+    for spec in specs:
+        ffmpeg, ffprobe = _resolve_bench_runtime(spec, base_dir)
+        if not ffmpeg or not ffprobe:
+            print(f"Skipping runtime '{spec}': not found or failed validation.")
+            continue
+        key = os.path.normcase(str(ffmpeg.resolve()))
+        if key in seen:
+            print(f"Skipping runtime '{spec}': same binary as an earlier runtime.")
+            continue
+        seen.add(key)
+        runtimes.append((spec, ffmpeg, ffprobe))
+    if not runtimes:
+        raise RuntimeError("No FFmpeg runtimes could be resolved for benchmarking.")
+    if len(runtimes) < 2:
+        print("Only one runtime resolved; reporting it without a comparison.")
+
+    opts = _bench_options(args)
+    size = f"{args.width}x{args.height}"
+    source = f"testsrc2=size={size}:rate={args.rate}"
+    input_args = ["-f", "lavfi", "-i", source, "-f", "lavfi", "-i", source]
+    output_args = ["-f", "null", "-"]
+    font_cache = _scan_windows_fonts_registry() if args.text else {}
+    resolution = (int(args.width), int(args.height))
+
+    job = _compare_job(opts, font_cache)
+    sources = [CompareSource(*resolution, label=text) for text in job.labels]
+
+    results: list[BenchResult] = []
+    for label, ffmpeg, ffprobe in runtimes:
+        cmd = compose_compare_command(str(ffmpeg), job, input_args, sources, output_args=output_args)
+        cmd.insert(1, "-benchmark")
+        print(f"[{label}] {' '.join(cmd)}")
+        runs = [_run_bench_once(cmd) for _ in range(max(1, int(args.repeat)))]
+        failed = next((run for run in runs if run[3] != 0), None)
+        wall, cpu, frames, returncode = failed or sorted(runs)[len(runs) // 2]
+        results.append(
+            BenchResult(
+                label=label,
+                ffmpeg_path=str(ffmpeg),
+                ffprobe_path=str(ffprobe),
+                version=runtime_version(ffmpeg) or "unknown",
+                wall_seconds=wall,
+                cpu_seconds=cpu,
+                frames=frames,
+                returncode=returncode,
+            )
+        )
+
+    print("")
+    label_width = max(len("runtime"), *(len(result.label) for result in results))
+    print(f"{'runtime':<{label_width}} {'fps':>8} {'wall s':>8} {'cpu s':>8} {'frames':>7}  version")
+    for result in results:
+        status = "" if result.returncode == 0 else f"  (exit {result.returncode})"
+        print(
+            f"{result.label:<{label_width}} {result.fps:>8.1f} {result.wall_seconds:>8.2f} {result.cpu_seconds:>8.2f} "
+            f"{result.frames:>7}  {result.version}{status}"
+        )
+
+    if args.pin:
+        ok_results = [result for result in results if result.returncode == 0]
+        if args.pin == "fastest":
+            chosen = max(ok_results, key=lambda result: result.fps, default=None)
+        else:
+            chosen = next((result for result in ok_results if result.label == args.pin), None)
+        if chosen is None:
+            raise RuntimeError(f"Cannot pin '{args.pin}': no successful benchmark run with that label.")
+        pin_runtime(Path(chosen.ffmpeg_path), Path(chosen.ffprobe_path))
+        print(f"Pinned runtime '{chosen.label}': {chosen.ffmpeg_path}")
+
+    return 0 if all(result.returncode == 0 for result in results) else 1
+
+
+def _expand_probe_inputs(patterns: list[str]) -> list[str]:
+    paths: list[str] = []
+    seen: set[str] = set()
+    for pattern in patterns:
+        matches = sorted(glob.glob(pattern, recursive=True)) if glob.has_magic(pattern) else [pattern]
+        if not matches:
+            _print_status(f"No files match: {pattern}")
+        for match in matches:
+            if Path(match).is_dir():
+                continue
+            key = os.path.normcase(os.path.abspath(match))
+            if key not in seen:
+                seen.add(key)
+                paths.append(match)
+    return paths
+
+
+def _resolve_ffprobe_only(args: argparse.Namespace, base_dir: Path) -> str:
+    if args.ffprobe_path:
+        return str(args.ffprobe_path)
+    _, ffprobe_path, _ = ensure_ffmpeg_runtime(base_dir, _print_status)
+    return ffprobe_path
+
+
+def _run_probe_command(args: argparse.Namespace, base_dir: Path) -> int:
+    ffprobe_path = _resolve_ffprobe_only(args, base_dir)
+    paths = _expand_probe_inputs(args.inputs)
+    if not paths:
+        raise RuntimeError("No input files to probe.")
+
+    workers = max(1, int(args.workers))
+    _print_status(f"Probing {len(paths)} file(s) with {workers} worker(s)...")
+    failures = 0
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {
+            pool.submit(probe_media, ffprobe_path, path, use_cache=not args.no_cache): path
+            for path in paths
+        }
+        for future in as_completed(futures):
+            path = futures[future]
+            try:
+                record = {"path": path, "ok": True, "info": future.result().to_dict()}
+            except Exception as exc:
+                failures += 1
+                record = {"path": path, "ok": False, "error": str(exc)}
+            print(json.dumps(record), flush=True)
+    return 1 if failures else 0
+
+
 def build_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(
         prog=APP_CLI_NAME,
@@ -422,16 +1301,97 @@ def build_parser() -> argparse.ArgumentParser:
         help="Force a fresh FFmpeg download even if system/cached runtime exists.",
     )
 
+    p_probe = sub.add_parser(
+        "probe",
+        help="Probe many media files concurrently and print JSON lines.",
+    )
+    p_probe.add_argument("inputs", nargs="+", help="Files or glob patterns (use ** for recursive matches).")
+    p_probe.add_argument(
+        "--workers",
+        type=int,
+        default=min(8, os.cpu_count() or 4),
+        help="Number of concurrent ffprobe processes.",
+    )
+    p_probe.add_argument("--no-cache", action="store_true", help="Ignore and do not update the probe cache.")
+    p_probe.add_argument("--ffprobe-path", default=None, help="Optional explicit ffprobe.exe path.")
+
+    p_bench = sub.add_parser(
+        "runtime-bench",
+        help="Benchmark a synthetic compare job across FFmpeg runtimes.",
+    )
+    p_bench.add_argument(
+        "--runtime",
+        action="append",
+        default=None,
+        help="Runtime to test: system, bundled, cached, pinned, auto, or a path to ffmpeg.exe/a folder. Repeatable.",
+    )
+    p_bench.add_argument("--width", type=int, default=1920)
+    p_bench.add_argument("--height", type=int, default=1080)
+    p_bench.add_argument("--rate", type=int, default=30, help="Synthetic input frame rate.")
+    p_bench.add_argument("--duration", type=_time_arg, default="00:00:10", help="Benchmark clip duration (seconds, MM:SS or HH:MM:SS).")
+    p_bench.add_argument("--video-codec", default="libx264", choices=_VIDEO_CODEC_CHOICES)
+    p_bench.add_argument("--bitrate", type=int, default=4000, help="Video bitrate in kbps.")
+    p_bench.add_argument("--text", action=argparse.BooleanOptionalAction, default=True, help="Include label overlays.")
+    p_bench.add_argument("--font-file", default=None, help="Optional explicit font file for the labels.")
+    p_bench.add_argument("--repeat", type=int, default=1, help="Runs per runtime; the median is reported.")
+    p_bench.add_argument(
+        "--pin",
+        default=None,
+        help="After benchmarking, pin a runtime label (or 'fastest') as the preferred FFmpeg.",
+    )
+    p_bench.add_argument("--unpin", action="store_true", help="Clear the pinned runtime and exit.")
+
     p_proc = sub.add_parser("process", help="Run video compare processing headless.")
-    p_proc.add_argument("--video1", required=True, help="Path to Video 1 input file.")
-    p_proc.add_argument("--video2", required=True, help="Path to Video 2 input file.")
+    p_proc.add_argument("--video1", default=None, help="Path to Video 1 input file.")
+    p_proc.add_argument("--video2", default=None, help="Path to Video 2 input file.")
+    p_proc.add_argument(
+        "--candidate",
+        action="append",
+        default=None,
+        help=(
+            "Compare --video1 against this file; repeat for several candidates. The reference is decoded once "
+            "and each candidate gets its own output, <output>_<candidate name>, labelled with the file name."
+        ),
+    )
+    p_proc.add_argument(
+        "--input",
+        action="append",
+        default=None,
+        help=f"Grid input file; repeat 2-{GRID_MAX_INPUTS} times instead of --video1/--video2.",
+    )
+    p_proc.add_argument(
+        "--input-label",
+        action="append",
+        default=None,
+        help="Label for the matching --input (default: file name). Uses the --text1-* font settings.",
+    )
+    p_proc.add_argument(
+        "--input-start",
+        action="append",
+        type=_time_arg,
+        default=None,
+        help="Start time (seconds, MM:SS or HH:MM:SS) for the matching --input (default: 00:00:00).",
+    )
     p_proc.add_argument("--output", required=True, help="Output file path without extension or with extension.")
-    p_proc.add_argument("--output-type", default="mkv", choices=_OUTPUT_TYPE_CHOICES)
-    p_proc.add_argument("--start1", default="00:00:00", help="Video 1 start time HH:MM:SS.")
-    p_proc.add_argument("--start2", default="00:00:00", help="Video 2 start time HH:MM:SS.")
-    p_proc.add_argument("--duration", default="00:01:30", help="Output duration HH:MM:SS.")
+    p_proc.add_argument(
+        "--output-type",
+        default="mkv",
+        choices=[*_OUTPUT_TYPE_CHOICES, *IMAGE_OUTPUT_TYPES],
+        help="Container, gif/webp for an animated preview, or png/jpg/webp-seq for numbered stills in a folder named after --output (default: mkv).",
+    )
+    p_proc.add_argument("--start1", type=_time_arg, default="00:00:00", help="Video 1 start time (seconds, MM:SS or HH:MM:SS).")
+    p_proc.add_argument("--start2", type=_time_arg, default="00:00:00", help="Video 2 start time (seconds, MM:SS or HH:MM:SS).")
+    p_proc.add_argument("--duration", type=_time_arg, default="00:01:30", help="Output duration (seconds, MM:SS or HH:MM:SS).")
     p_proc.add_argument("--video-codec", default="libx264", choices=_VIDEO_CODEC_CHOICES)
-    p_proc.add_argument("--audio-codec", default="aac", choices=_AUDIO_CODEC_CHOICES)
+    p_proc.add_argument(
+        "--audio-codec",
+        default=AUDIO_AUTO,
+        choices=[AUDIO_AUTO, AUDIO_COPY, *_AUDIO_CODEC_CHOICES],
+        help=(
+            "Audio encoder; copy keeps the source track as-is; auto (default) copies it when the container "
+            "accepts its codec and the audio is not trimmed, and encodes otherwise."
+        ),
+    )
     p_proc.add_argument("--bitrate", type=int, default=4000, help="Video bitrate in kbps.")
     p_proc.add_argument("--divider", action=argparse.BooleanOptionalAction, default=True, help="Enable vertical divider.")
     p_proc.add_argument("--divider-width", type=int, default=4)
@@ -442,6 +1402,12 @@ def build_parser() -> argparse.ArgumentParser:
         choices=["video1", "video2", "none"],
         help="Audio source mapping in output.",
     )
+    p_proc.add_argument(
+        "--audio-input",
+        type=int,
+        default=None,
+        help="Grid mode: 1-based --input whose audio is used (default: first input unless --audio-source none).",
+    )
 
     p_proc.add_argument("--text1-enable", action=argparse.BooleanOptionalAction, default=True)
     p_proc.add_argument("--text2-enable", action=argparse.BooleanOptionalAction, default=True)
@@ -465,20 +1431,143 @@ def build_parser() -> argparse.ArgumentParser:
         action="store_true",
         help="Force FFmpeg download before processing.",
     )
+    p_proc.add_argument(
+        "--layout",
+        choices=LAYOUT_CHOICES,
+        default=None,
+        help="Compare layout (default: split, or side-by-side with --roi).",
+    )
+    p_proc.add_argument(
+        "--split-ratio",
+        type=float,
+        default=0.5,
+        help="Share of the frame taken by Video 1 in split and vstack layouts (default: 0.5).",
+    )
+    p_proc.add_argument(
+        "--roi",
+        default=None,
+        metavar="X:Y:W:H",
+        help="Compare only this region (Video 1 pixels) from both inputs, cropped before any other filter.",
+    )
+    p_proc.add_argument(
+        "--roi-zoom",
+        type=int,
+        default=1,
+        help="Integer nearest-neighbour zoom applied to the ROI (default: 1).",
+    )
+    p_proc.add_argument(
+        "--animated-fps",
+        type=float,
+        default=ANIMATED_FPS,
+        help=(
+            f"Frame-rate cap for --output-type gif/webp previews (default: {ANIMATED_FPS:g}). "
+            f"Their width is capped at {ANIMATED_WIDTH} unless --max-width is given."
+        ),
+    )
+    p_proc.add_argument(
+        "--contact-sheet",
+        default=None,
+        metavar="COLSxROWS",
+        help=(
+            "Tile compare frames into sheets of COLSxROWS with an image --output-type. Frames are spread evenly over "
+            "--duration, or taken from --sample when given."
+        ),
+    )
+    p_proc.add_argument(
+        "--variant",
+        action="append",
+        default=None,
+        metavar="SPEC",
+        help=(
+            "Encode the compare again with other settings, e.g. codec=libx265,bitrate=2500,size=1280x720,type=mp4; "
+            "repeat for more. Unset keys use --video-codec/--bitrate/--output-type. All variants share one decode "
+            "and are written as <output>_<codec>_<bitrate>k[_<size>].<type> instead of --output."
+        ),
+    )
+    p_proc.add_argument(
+        "--workers",
+        type=int,
+        default=min(8, os.cpu_count() or 4),
+        help="Concurrent FFmpeg processes when --video1/--video2 are folders of still images.",
+    )
+    p_proc.add_argument(
+        "--max-width",
+        type=int,
+        default=0,
+        help="Cap the output width; each input is scaled down once in the graph (default: 0, no cap).",
+    )
+    p_proc.add_argument(
+        "--max-height",
+        type=int,
+        default=0,
+        help="Cap the output height (default: 0, no cap).",
+    )
+    p_proc.add_argument(
+        "--scaler",
+        choices=SCALERS,
+        default="",
+        help="Scaling algorithm for resizing (default: FFmpeg's bicubic).",
+    )
+    p_proc.add_argument(
+        "--segment",
+        action="append",
+        default=None,
+        metavar="START:DURATION",
+        help=(
+            "Excerpt to compare, relative to --start1/--start2, e.g. 00:01:20:00:00:10; repeat for more. "
+            "All excerpts are concatenated into one output and --duration is ignored."
+        ),
+    )
+    p_proc.add_argument(
+        "--title-cards",
+        action="store_true",
+        help="Show a card with the segment's time range before each --segment (uses the --text1-* font).",
+    )
+    p_proc.add_argument("--title-card-seconds", type=float, default=2.0, help="Title card length in seconds.")
+    p_proc.add_argument(
+        "--sample",
+        choices=SAMPLE_MODES,
+        default=None,
+        help=(
+            "Compare only sampled frames for a quick check: keyframes (decodes keyframes only), "
+            "frames (every Nth frame) or seconds (one frame every N seconds)."
+        ),
+    )
+    p_proc.add_argument(
+        "--sample-interval",
+        type=float,
+        default=10.0,
+        help="N for --sample frames/seconds (default: 10).",
+    )
+    p_proc.add_argument(
+        "--sample-png",
+        action="store_true",
+        help=f"Write one PNG per sample into a folder named after --output instead of a {SLIDESHOW_FPS:g} fps slideshow.",
+    )
     p_proc.add_argument("--dry-run", action="store_true", help="Print command and exit.")
+    p_proc.add_argument(
+        "--preflight-only",
+        action="store_true",
+        help="Check inputs, fonts, codecs, audio, time range and disk space, then exit.",
+    )
     return parser
 
 
 def run_from_argv(argv: list[str], *, base_dir: Path) -> int:
     parser = build_parser()
     args = parser.parse_args(argv)
-    print(cli_banner())
+    # Keep stdout machine-readable for JSON-lines commands.
+    print(cli_banner(), file=sys.stderr if args.command == "probe" else sys.stdout)
 
     try:
         if args.command == "ffmpeg-test":
             return _run_ffmpeg_test_command(args, base_dir)
         if args.command == "process":
             return _run_process_command(args, base_dir)
+        if args.command == "probe":
+            return _run_probe_command(args, base_dir)
+        if args.command == "runtime-bench":
+            return _run_runtime_bench_command(args, base_dir)
         parser.error(f"Unknown command: {args.command}")
         return 2
     except Exception as exc:
@@ -0,0 +1,375 @@
+"""
+FFmpeg command assembly shared by the GUI and headless CLI: input seeking,
+the compare graph and the output arguments of one compare job.
+Pure stdlib module; the callers probe the inputs and run the command.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field, replace
+from functools import partial
+from pathlib import Path
+
+from compare_graph import (
+    ANIMATED_FPS,
+    ANIMATED_TYPES,
+    ANIMATED_WIDTH,
+    GRID_MAX_SIZE,
+    SLIDESHOW_FPS,
+    TITLE_CARD_SECONDS,
+    CompareGraph,
+    CompareSource,
+    Roi,
+    Segment,
+    TextLabel,
+    animated_codec_args,
+    animated_output,
+    animated_rate_filter,
+    build_compare_graph,
+    build_grid_graph,
+    build_segments_graph,
+    expected_samples,
+    fit_filter,
+    format_clock,
+    rasterize_label,
+    roi_bitrate_k,
+    sample_filter,
+    sample_input_args,
+    still_output_args,
+    still_pix_fmt,
+)
+from ffmpeg_runtime import probe_capabilities
+from media_probe import MediaInfo, plan_seek
+from preflight import AUDIO_AUTO, resolve_audio_codec, source_audio_codec
+
+# Still-image output types, written as a numbered sequence: file extension and encoder.
+IMAGE_OUTPUT_TYPES = {"png": ("png", "png"), "jpg": ("jpg", "mjpeg"), "webp-seq": ("webp", "libwebp")}
+
+
+@dataclass
+class OutputVariant:
+    video_codec: str
+    bitrate_k: int
+    output_type: str
+    size: tuple[int, int] | None  # box the compare is fitted into, or None for full size
+    output: str
+
+
+@dataclass
+class CompareJob:
+    inputs: list[str]
+    output: str  # output file; image sequences go into a folder named after it
+    output_type: str
+    duration: float
+    starts: list[float] = field(default_factory=list)  # seconds, per input
+    labels: list[TextLabel | None] = field(default_factory=list)  # per input
+    video_codec: str = "libx264"
+    bitrate_k: int = 5000
+    audio_codec: str = AUDIO_AUTO
+    audio_input: int | None = None
+    layout: str = "split"
+    ratio: float = 0.5
+    divider_width: int = 0
+    divider_color: str = "white"
+    roi: Roi | None = None
+    zoom: int = 1
+    # Cap on the composed frame (0 = no cap), applied in each side's scale stage.
+    max_size: tuple[int, int] = (0, 0)
+    scaler: str = ""
+    # Sampled mode: keep keyframes, every Nth frame or one frame every N seconds.
+    sample: str | None = None
+    sample_interval: float = 10.0
+    # An IMAGE_OUTPUT_TYPES key: write the frames as a numbered image sequence.
+    image_type: str | None = None
+    contact_sheet: tuple[int, int] | None = None  # columns, rows
+    animated_fps: float = ANIMATED_FPS
+    # Excerpts (relative to the starts) concatenated instead of `duration`.
+    segments: list[Segment] = field(default_factory=list)
+    # Style of the card shown before each segment; the text is filled in per segment.
+    title_card: TextLabel | None = None
+    title_card_seconds: float = TITLE_CARD_SECONDS
+    # Extra encodes of the same compare, fed from one graph instead of `output`.
+    variants: list[OutputVariant] = field(default_factory=list)
+
+    @property
+    def animated(self) -> bool:
+        return self.output_type in ANIMATED_TYPES
+
+    @property
+    def audio_index(self) -> int | None:
+        """Input whose audio is mapped; sampled, still and animated output has none."""
+        if self.sample or self.image_type or self.animated:
+            return None
+        return self.audio_input
+
+    @property
+    def image_dir(self) -> Path:
+        return Path(self.output).with_suffix("")
+
+
+def audio_codec_args(requested: str, audio_map: str, source_codec: str, output_type: str) -> list[str]:
+    """-c:a for `audio_map`; a filter output ("[a]") is trimmed, so it cannot be stream-copied."""
+    return ["-c:a", resolve_audio_codec(requested, output_type, source_codec, filtered=audio_map.startswith("["))]
+
+
+def _input_limit_args(job: CompareJob, trim: float) -> list[str]:
+    # GIF palettes are only generated once their input ends, which an output -t does not cause.
+    animated = job.animated and not job.segments
+    if not (job.sample or job.contact_sheet or animated):
+        return []
+    # Sampled output is retimed or tiled, so the range is limited on the input side instead of with -t.
+    return ["-t", f"{job.duration + trim:.6f}", *(sample_input_args(job.sample) if job.sample else [])]
+
+
+def _passthrough_args(ffmpeg_path: str) -> list[str]:
+    """Write every composed frame once, without duplicating or dropping any."""
+    if probe_capabilities(Path(ffmpeg_path)).supports_fps_mode:
+        return ["-fps_mode", "passthrough"]
+    return ["-vsync", "passthrough"]
+
+
+def _output_args(job: CompareJob, ffmpeg_path: str) -> list[str]:
+    if job.image_type:
+        extension, encoder = IMAGE_OUTPUT_TYPES[job.image_type]
+        quality = {"mjpeg": ["-q:v", "2"], "libwebp": ["-quality", "90"]}.get(encoder, [])
+        pattern = "sheet_%03d" if job.contact_sheet else "frame_%05d"
+        output = str(job.image_dir / f"{pattern}.{extension}")
+        return [*_passthrough_args(ffmpeg_path), "-c:v", encoder, *quality, output]
+    if job.sample:
+        return ["-r", f"{SLIDESHOW_FPS:g}", job.output]
+    return [job.output]
+
+
+def output_seconds(job: CompareJob, info: MediaInfo | None = None) -> float:
+    """
+    Length of the output, for progress reporting. A sampled slideshow needs
+    `info` for the first input (with its keyframe index for keyframe sampling).
+    """
+    if job.sample and not job.image_type and info is not None:
+        # A slideshow plays every sample for 1/SLIDESHOW_FPS seconds.
+        samples = expected_samples(
+            job.sample,
+            job.sample_interval,
+            job.duration,
+            fps=info.fps,
+            keyframes=info.keyframes,
+            start=job.starts[0] if job.starts else 0.0,
+        )
+        return samples / SLIDESHOW_FPS
+    if not job.segments:
+        return job.duration
+    cards = len(job.segments) * job.title_card_seconds if job.title_card is not None else 0.0
+    return sum(segment.duration for segment in job.segments) + cards
+
+
+def build_compare_command(ffmpeg_path: str, job: CompareJob, media: list[MediaInfo]) -> list[str]:
+    """Seek both probed inputs to their starts and build the compare command."""
+    if any(info.display_resolution[0] <= 0 for info in media[:2]):
+        raise RuntimeError("Failed to obtain valid input video resolutions.")
+    starts = job.starts or [0.0, 0.0]
+    labels = job.labels or [None, None]
+    # With segments, seek once to the first excerpt; later ones are trimmed from there.
+    offset = job.segments[0].start if job.segments else 0.0
+    input_args: list[str] = []
+    sources: list[CompareSource] = []
+    for path, info, start, label in zip(job.inputs[:2], media[:2], starts, labels):
+        seek = plan_seek(info, start + offset)
+        input_args += [*seek.input_args(), *_input_limit_args(job, seek.trim), "-i", path]
+        sources.append(CompareSource(*info.display_resolution, info.pix_fmt, seek.trim, label))
+    return compose_compare_command(
+        ffmpeg_path,
+        job,
+        input_args,
+        sources,
+        audio_codecs=[source_audio_codec(info) for info in media[:2]],
+        rate=media[1].fps or media[0].fps,
+    )
+
+
+def compose_compare_command(
+    ffmpeg_path: str,
+    job: CompareJob,
+    input_args: list[str],
+    sources: list[CompareSource],
+    *,
+    audio_codecs: list[str] | None = None,
+    rate: float = 25.0,
+    output_args: list[str] | None = None,
+) -> list[str]:
+    """Build the compare command for two already-described inputs; `output_args` replaces the job's output."""
+    max_size = job.max_size
+    sample = sample_filter(job.sample, job.sample_interval) if job.sample else ""
+    if job.contact_sheet:
+        columns, rows = job.contact_sheet
+        if not job.sample:
+            # Spread one sheet's worth of frames evenly over the duration.
+            frames = job.duration * (rate or 25.0)
+            sample = sample_filter("frames", max(1, int(frames // (columns * rows))))
+        # Each cell is capped so the whole sheet fits the grid limit (or the size cap).
+        sheet_width, sheet_height = job.max_size[0] or GRID_MAX_SIZE[0], job.max_size[1] or GRID_MAX_SIZE[1]
+        max_size = (sheet_width // columns, sheet_height // rows)
+    if job.animated:
+        # Previews are capped in size and frame rate before anything is composed.
+        sample = animated_rate_filter(rate, job.animated_fps)
+        max_size = (job.max_size[0] or ANIMATED_WIDTH, job.max_size[1])
+    left, right = (replace(source, sample=sample) for source in sources[:2])
+    audio_input = job.audio_index
+    render_label = partial(rasterize_label, ffmpeg_path)
+    if job.segments:
+        first = job.segments[0].start
+        cards = None
+        if job.title_card is not None:
+            cards = [
+                replace(job.title_card, text=f"{index}. {format_clock(segment.start)} - {format_clock(segment.end)}")
+                for index, segment in enumerate(job.segments, start=1)
+            ]
+        graph = build_segments_graph(
+            left,
+            right,
+            # The inputs are already seeked to the first segment.
+            [Segment(segment.start - first, segment.duration) for segment in job.segments],
+            title_cards=cards,
+            card_seconds=job.title_card_seconds,
+            rate=rate or 25.0,
+            layout=job.layout,
+            ratio=job.ratio,
+            divider_width=job.divider_width,
+            divider_color=job.divider_color,
+            audio_input=audio_input,
+            render_label=render_label,
+            roi=job.roi,
+            zoom=job.zoom,
+            max_size=max_size,
+            scaler=job.scaler,
+        )
+    else:
+        graph = build_compare_graph(
+            left,
+            right,
+            layout=job.layout,
+            ratio=job.ratio,
+            divider_width=job.divider_width,
+            divider_color=job.divider_color,
+            audio_input=audio_input,
+            render_label=render_label,
+            roi=job.roi,
+            zoom=job.zoom,
+            max_size=max_size,
+            scaler=job.scaler,
+        )
+    if job.contact_sheet:
+        graph = graph.then("tile={}x{}".format(*job.contact_sheet))
+    elif job.sample and not job.image_type:
+        # Play the samples back as a slideshow.
+        graph = graph.then(f"setpts=N/{SLIDESHOW_FPS:g}/TB")
+    elif job.animated:
+        graph = animated_output(graph, job.output_type)
+    bitrate_k = job.bitrate_k
+    if job.roi:
+        bitrate_k = roi_bitrate_k(job.bitrate_k, job.roi, job.zoom, (sources[0].width, sources[0].height))
+
+    cmd = [ffmpeg_path, *input_args]
+    for label_image in graph.extra_inputs:
+        cmd.extend(["-i", label_image])
+    audio_source = (audio_codecs or ["", ""])[audio_input or 0]
+    if job.variants:
+        return cmd + _variant_output_args(job, graph, audio_source)
+    cmd += ["-filter_complex", graph.filter_complex, "-map", graph.video_map]
+    if not job.segments and not job.sample and not job.contact_sheet:
+        # A segment graph ends by itself after the last excerpt.
+        cmd += ["-t", format_clock(job.duration)]
+    if job.animated:
+        cmd += animated_codec_args(job.output_type)
+    elif not job.image_type:
+        cmd += ["-c:v", job.video_codec, "-b:v", f"{bitrate_k}k"]
+    if graph.audio_map is not None:
+        cmd.extend(["-map", graph.audio_map, *audio_codec_args(job.audio_codec, graph.audio_map, audio_source, job.output_type)])
+    cmd.extend(_output_args(job, ffmpeg_path) if output_args is None else output_args)
+    return cmd
+
+
+def _variant_output_args(job: CompareJob, graph: CompareGraph, audio_source: str) -> list[str]:
+    """Split the composed graph into one encoder per variant."""
+    outputs = graph.split([fit_filter(*variant.size, job.scaler) if variant.size else None for variant in job.variants])
+    args = ["-filter_complex", outputs.filter_complex]
+    for variant, video_map, audio_map in zip(job.variants, outputs.video_maps, outputs.audio_maps):
+        args += ["-map", video_map]
+        if not job.segments:
+            args += ["-t", format_clock(job.duration)]
+        args += ["-c:v", variant.video_codec, "-b:v", f"{variant.bitrate_k}k"]
+        if audio_map is not None:
+            args.extend(["-map", audio_map, *audio_codec_args(job.audio_codec, audio_map, audio_source, variant.output_type)])
+        args.append(variant.output)
+    return args
+
+
+def build_grid_command(ffmpeg_path: str, job: CompareJob, media: list[MediaInfo], script_path: str) -> list[str]:
+    """
+    Build one FFmpeg invocation tiling every input into a grid. The graph is
+    written to `script_path` and passed with -filter_complex_script, since a
+    16-input graph easily exceeds the Windows command-line limit.
+    """
+    starts = job.starts or [0.0] * len(job.inputs)
+    labels = job.labels or [None] * len(job.inputs)
+    sources: list[CompareSource] = []
+    input_args: list[str] = []
+    for path, info, start, label in zip(job.inputs, media, starts, labels):
+        seek = plan_seek(info, start)
+        input_args += [*seek.input_args(), "-i", path]
+        sources.append(CompareSource(*info.display_resolution, info.pix_fmt, seek.trim, label))
+
+    graph = build_grid_graph(
+        sources,
+        gap=job.divider_width,
+        gap_color=job.divider_color,
+        audio_input=job.audio_index,
+        render_label=partial(rasterize_label, ffmpeg_path),
+        max_size=job.max_size,
+        scaler=job.scaler,
+    )
+    Path(script_path).write_text(graph.filter_complex, encoding="utf-8")
+
+    cmd = [ffmpeg_path, *input_args]
+    for label_image in graph.extra_inputs:
+        cmd.extend(["-i", label_image])
+    cmd += [
+        "-filter_complex_script",
+        script_path,
+        "-map",
+        graph.video_map,
+        "-t",
+        format_clock(job.duration),
+        "-c:v",
+        job.video_codec,
+        "-b:v",
+        f"{job.bitrate_k}k",
+    ]
+    if graph.audio_map is not None:
+        source_codec = source_audio_codec(media[job.audio_index or 0])
+        cmd.extend(["-map", graph.audio_map, *audio_codec_args(job.audio_codec, graph.audio_map, source_codec, job.output_type)])
+    cmd.append(job.output)
+    return cmd
+
+
+def build_still_command(ffmpeg_path: str, job: CompareJob, media: list[MediaInfo]) -> list[str]:
+    """One image-to-image FFmpeg call writing the compare of two stills as a lossless PNG."""
+    labels = job.labels or [None, None]
+    info1, info2 = media[:2]
+    graph = build_compare_graph(
+        CompareSource(*info1.display_resolution, info1.pix_fmt, label=labels[0]),
+        CompareSource(*info2.display_resolution, info2.pix_fmt, label=labels[1]),
+        layout=job.layout,
+        ratio=job.ratio,
+        divider_width=job.divider_width,
+        divider_color=job.divider_color,
+        pix_fmt=still_pix_fmt(info1.pix_fmt, info2.pix_fmt),
+        render_label=partial(rasterize_label, ffmpeg_path),
+        roi=job.roi,
+        zoom=job.zoom,
+        max_size=job.max_size,
+        scaler=job.scaler,
+    )
+    cmd = [ffmpeg_path, "-y", "-i", job.inputs[0], "-i", job.inputs[1]]
+    for label_image in graph.extra_inputs:
+        cmd.extend(["-i", label_image])
+    return cmd + still_output_args(graph, job.output)
@@ -0,0 +1,1012 @@
+"""
+Compare filtergraph engine shared by the GUI and headless CLI.
+Pure stdlib module; emits the cheapest equivalent FFmpeg filtergraph.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import math
+import os
+import re
+import subprocess
+from dataclasses import dataclass, field, replace
+from pathlib import Path
+from typing import Callable
+
+from ffmpeg_runtime import default_cache_root
+
+DEFAULT_PIX_FMT = "yuv420p"
+LABEL_MARGIN = 10
+
+
+@dataclass
+class TextLabel:
+    text: str
+    font_file: str
+    font_size: int
+    color: str
+    position: str = "bottom"
+
+
+@dataclass
+class CompareSource:
+    width: int  # display resolution (after autorotate)
+    height: int
+    pix_fmt: str = ""
+    trim: float = 0.0  # seconds to drop after the input-side seek
+    label: TextLabel | None = None
+    duration: float = 0.0  # seconds kept after the trim; 0 keeps everything
+    sample: str = ""  # frame-sampling filter applied right after the trim
+
+
+@dataclass
+class Roi:
+    x: int
+    y: int
+    width: int
+    height: int
+
+    def aligned(self) -> "Roi":
+        """Snap to even coordinates so 4:2:0 chroma planes crop cleanly."""
+        return Roi(_even(self.x), _even(self.y), max(2, _even(self.width)), max(2, _even(self.height)))
+
+
+def parse_roi(text: str) -> Roi:
+    parts = text.strip().split(":")
+    try:
+        x, y, width, height = (int(part) for part in parts)
+    except ValueError:
+        raise RuntimeError(f"ROI must be x:y:w:h in whole pixels, got '{text}'.") from None
+    if x < 0 or y < 0 or width <= 0 or height <= 0:
+        raise RuntimeError(f"ROI must have a non-negative origin and a positive size, got '{text}'.")
+    return Roi(x, y, width, height)
+
+
+def roi_bitrate_k(bitrate_k: int, roi: Roi, zoom: int, source_size: tuple[int, int]) -> int:
+    """Scale a full-frame bitrate down to the (zoomed) ROI area."""
+    source_area = source_size[0] * source_size[1]
+    if source_area <= 0:
+        return bitrate_k
+    ratio = min(1.0, roi.width * roi.height * zoom * zoom / source_area)
+    return min(bitrate_k, max(100, round(bitrate_k * ratio)))
+
+
+@dataclass
+class Segment:
+    start: float  # seconds after the input's start time
+    duration: float
+
+    @property
+    def end(self) -> float:
+        return self.start + self.duration
+
+
+def _parse_clock(text: str) -> float:
+    value = 0.0
+    for part in text.split(":"):
+        value = value * 60 + float(part)
+    return value
+
+
+_SECONDS_UNITS = {"": 1.0, "s": 1.0, "ms": 0.001, "us": 0.000001}
+
+
+def parse_time(text: str) -> float:
+    """
+    Parse an FFmpeg time duration: plain seconds ("90", "1.5", "250ms"),
+    MM:SS ("1:30") or HH:MM:SS[.frac] ("00:01:30.5").
+    """
+    value = text.strip()
+    match = re.fullmatch(r"(\d+(?:\.\d*)?|\.\d+)(s|ms|us)?", value)
+    if match:
+        return float(match.group(1)) * _SECONDS_UNITS[match.group(2) or ""]
+    match = re.fullmatch(r"(?:(\d+):)?(\d{1,2}):(\d{1,2}(?:\.\d*)?)", value)
+    if match and int(match.group(2)) < 60 and float(match.group(3)) < 60:
+        return int(match.group(1) or 0) * 3600 + int(match.group(2)) * 60 + float(match.group(3))
+    raise RuntimeError(f"Time must be seconds, MM:SS or HH:MM:SS[.frac], got '{text}'.")
+
+
+def parse_segment(text: str) -> Segment:
+    """
+    Parse START:DURATION, where both halves use the same form: seconds
+    ("80:10"), MM:SS ("01:20:00:10") or HH:MM:SS ("00:01:20:00:00:10").
+    """
+    parts = text.strip().split(":")
+    half = len(parts) // 2
+    try:
+        if len(parts) % 2 or half > 3:
+            raise ValueError
+        segment = Segment(_parse_clock(":".join(parts[:half])), _parse_clock(":".join(parts[half:])))
+    except ValueError:
+        raise RuntimeError(f"Segment must be START:DURATION, e.g. 00:01:20:00:00:10, got '{text}'.") from None
+    if segment.start < 0 or segment.duration <= 0:
+        raise RuntimeError(f"Segment needs a non-negative start and a positive duration, got '{text}'.")
+    return segment
+
+
+def format_clock(seconds: float) -> str:
+    minutes, secs = divmod(seconds, 60)
+    hours, minutes = divmod(int(minutes), 60)
+    return f"{hours:02d}:{minutes:02d}:{secs:06.3f}"
+
+
+@dataclass
+class CompareGraph:
+    filter_complex: str
+    video_map: str
+    audio_map: str | None
+    # Label PNGs to append as inputs after the compared sources, in order.
+    extra_inputs: list[str] = field(default_factory=list)
+
+    def then(self, stage: str, name: str = "out") -> "CompareGraph":
+        """Return this graph with `stage` appended to its video output."""
+        return replace(self, filter_complex=f"{self.filter_complex};{self.video_map}{stage}[{name}]", video_map=f"[{name}]")
+
+    def split(self, stages: list[str | None]) -> "FanoutGraph":
+        """
+        Feed one encoder per entry of `stages` from this graph, so the inputs
+        are decoded and composed once. Each branch gets its own optional stage
+        (e.g. a scale); a filtered audio output is split the same way.
+        """
+        count = len(stages)
+        parts = [self.filter_complex, f"{self.video_map}split={count}" + "".join(f"[branch{index}]" for index in range(count))]
+        video_maps = []
+        for index, stage in enumerate(stages):
+            if stage:
+                parts.append(f"[branch{index}]{stage}[variant{index}]")
+                video_maps.append(f"[variant{index}]")
+            else:
+                video_maps.append(f"[branch{index}]")
+        audio_maps: list[str | None] = [self.audio_map] * count
+        if self.audio_map and self.audio_map.startswith("["):
+            # A filter output can only be mapped once; stream specifiers can be reused.
+            parts.append(f"{self.audio_map}asplit={count}" + "".join(f"[abranch{index}]" for index in range(count)))
+            audio_maps = [f"[abranch{index}]" for index in range(count)]
+        return FanoutGraph(";".join(parts), video_maps, audio_maps, self.extra_inputs)
+
+
+SAMPLE_MODES = ("keyframes", "frames", "seconds")
+SLIDESHOW_FPS = 2.0
+
+
+def sample_filter(mode: str, interval: float) -> str:
+    """Per-input filter keeping every Nth frame or one frame every N seconds."""
+    if mode == "frames":
+        return f"select='not(mod(n\\,{max(1, int(interval))}))'"
+    if mode == "seconds":
+        # Keep the first frame of every interval-long window, so both inputs sample the
+        # same instants and a compare shorter than one interval still yields a frame.
+        return f"select='isnan(prev_selected_t)+gte(floor(t/{interval:g})\\,floor(prev_selected_t/{interval:g})+1)'"
+    return ""
+
+
+def sample_input_args(mode: str) -> list[str]:
+    """Decoder options for a sampling mode; keyframes skip decoding every other frame."""
+    return ["-skip_frame", "nokey"] if mode == "keyframes" else []
+
+
+def expected_samples(
+    mode: str,
+    interval: float,
+    duration: float,
+    *,
+    fps: float,
+    keyframes: list[float] | None = None,
+    start: float = 0.0,
+) -> int:
+    """Number of frames a sampled compare will produce, for progress reporting."""
+    if mode == "frames":
+        return max(1, math.ceil(duration * fps / max(1, int(interval))))
+    if mode == "seconds":
+        return max(1, math.ceil(duration / interval))
+    if keyframes:
+        return max(1, sum(1 for time in keyframes if start <= time < start + duration))
+    return max(1, math.ceil(duration * fps))
+
+
+ANIMATED_TYPES = ("gif", "webp")
+ANIMATED_FPS = 15.0
+ANIMATED_WIDTH = 960
+
+
+def animated_rate_filter(source_fps: float, max_fps: float) -> str:
+    """Per-input frame-rate cap for animated previews; empty when the source is already at or below it."""
+    return f"fps={max_fps:g}" if source_fps <= 0 or source_fps > max_fps else ""
+
+
+def animated_output(graph: CompareGraph, output_type: str) -> CompareGraph:
+    """
+    Finish a compare graph as an animated preview without audio. GIF gets a
+    palette generated from the clip itself and applied in the same graph.
+    """
+    graph = replace(graph, audio_map=None)
+    if output_type != "gif":
+        return graph
+    palette = f"{graph.video_map}split[gifsrc][gifpal];[gifpal]palettegen=stats_mode=diff[palette];[gifsrc][palette]paletteuse=dither=sierra2_4a[gif]"
+    return replace(graph, filter_complex=f"{graph.filter_complex};{palette}", video_map="[gif]")
+
+
+def animated_codec_args(output_type: str) -> list[str]:
+    if output_type == "gif":
+        return ["-c:v", "gif", "-loop", "0"]
+    return ["-c:v", "libwebp_anim", "-loop", "0", "-quality", "75"]
+
+
+IMAGE_EXTENSIONS = (".png", ".tif", ".tiff", ".jpg", ".jpeg", ".webp", ".bmp")
+
+
+def still_pix_fmt(*pix_fmts: str) -> str:
+    """Lossless RGB format for a still compare; 16-bit when any input has more than 8 bits."""
+    deep = any(fmt.endswith(("10le", "10be", "12le", "12be", "16le", "16be", "48le", "48be", "64le", "64be")) for fmt in pix_fmts)
+    return "rgb48be" if deep else "rgb24"
+
+
+def still_output_args(graph: CompareGraph, output: str) -> list[str]:
+    """Write one frame of a compare graph as a lossless PNG."""
+    return ["-filter_complex", graph.filter_complex, "-map", graph.video_map, "-frames:v", "1", "-c:v", "png", output]
+
+
+def filter_path(path: str) -> str:
+    """Escape a file path for use inside a filter option value."""
+    return str(path).replace("\\", "/").replace(":", "\\:").replace("'", "\\'")
+
+
+def default_label_cache_dir() -> Path:
+    return default_cache_root().parent / "label-cache"
+
+
+def _label_band_height(label: TextLabel) -> int:
+    return _even(2 * label.font_size + 2)
+
+
+def _label_text_y(position: str) -> str:
+    # Placing the text at the matching edge of the band keeps it where a
+    # per-frame drawtext at the same position would have put it.
+    if position == "top":
+        return "0"
+    if position == "bottom":
+        return "h-text_h"
+    return "(h-text_h)/2"
+
+
+def _label_overlay_y(position: str) -> str:
+    if position == "top":
+        return str(LABEL_MARGIN)
+    if position == "bottom":
+        return f"main_h-overlay_h-{LABEL_MARGIN}"
+    return "(main_h-overlay_h)/2"
+
+
+def rasterize_label(
+    ffmpeg_path: str,
+    label: TextLabel,
+    width: int,
+    *,
+    cache_dir: Path | None = None,
+) -> str:
+    """
+    Render `label` once onto a transparent band `width` pixels wide and return the
+    PNG path. Bands are cached by text, font file, size, colour, position and width.
+    """
+    font = Path(label.font_file)
+    try:
+        font_stat = font.stat()
+    except OSError:
+        raise RuntimeError(f"Font file not found: {label.font_file}") from None
+    key_source = "\0".join(
+        [
+            label.text,
+            os.path.normcase(str(font.resolve())),
+            str(font_stat.st_size),
+            str(font_stat.st_mtime_ns),
+            str(label.font_size),
+            label.color,
+            label.position,
+            str(width),
+        ]
+    )
+    cache_dir = cache_dir or default_label_cache_dir()
+    digest = hashlib.sha1(key_source.encode("utf-8")).hexdigest()
+    png_path = cache_dir / f"{digest}.png"
+    if png_path.is_file():
+        return str(png_path)
+
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    # The text goes through a file so it never needs filtergraph quoting.
+    text_path = cache_dir / f"{digest}.{os.getpid()}.txt"
+    tmp_path = cache_dir / f"{digest}.{os.getpid()}.tmp.png"
+    text_path.write_text(label.text, encoding="utf-8")
+    drawtext = (
+        f"drawtext=textfile='{filter_path(str(text_path))}':expansion=none:"
+        f"fontfile='{filter_path(str(font))}':fontsize={label.font_size}:fontcolor={label.color}:"
+        f"x=(w-text_w)/2:y={_label_text_y(label.position)}"
+    )
+    cmd = [
+        ffmpeg_path,
+        "-v",
+        "error",
+        "-y",
+        "-f",
+        "lavfi",
+        "-i",
+        f"color=c=black@0.0:s={width}x{_label_band_height(label)}",
+        "-vf",
+        f"format=rgba,{drawtext}",
+        "-frames:v",
+        "1",
+        str(tmp_path),
+    ]
+    try:
+        result = subprocess.run(cmd, capture_output=True, text=True)
+        if result.returncode != 0 or not tmp_path.is_file():
+            raise RuntimeError(f"Failed to render label '{label.text}': {result.stderr.strip()}")
+        os.replace(tmp_path, png_path)
+    finally:
+        text_path.unlink(missing_ok=True)
+        tmp_path.unlink(missing_ok=True)
+    return str(png_path)
+
+
+def trim_filter(trim: float, *, audio: bool = False, duration: float = 0.0) -> str:
+    """Drop the decoded gap between the seeked keyframe and the requested start."""
+    prefix = "a" if audio else ""
+    end = f":duration={duration:.6f}" if duration > 0 else ""
+    return f"{prefix}trim=start={trim:.6f}{end},{prefix}setpts=PTS-STARTPTS"
+
+
+def _even(value: int) -> int:
+    return value - (value % 2)
+
+
+def _branch(source: CompareSource, crop: str | None, scale: str | None, pix_fmt: str) -> str:
+    # Crop first so every later stage touches only the pixels that are shown.
+    stages = []
+    if source.trim > 0 or source.duration > 0:
+        stages.append(trim_filter(source.trim, duration=source.duration))
+    if source.sample:
+        stages.append(source.sample)
+    if crop:
+        stages.append(crop)
+    if scale:
+        stages.append(scale)
+    if source.pix_fmt != pix_fmt:
+        stages.append(f"format={pix_fmt}")
+    return ",".join(stages)
+
+
+@dataclass
+class _Region:
+    x: int
+    y: int
+    width: int
+    height: int
+
+    def crop(self, source: CompareSource) -> str | None:
+        if (self.x, self.y, self.width, self.height) == (0, 0, source.width, source.height):
+            return None
+        return f"crop={self.width}:{self.height}:{self.x}:{self.y}"
+
+
+@dataclass
+class _Side:
+    region: _Region  # source pixels to keep
+    width: int  # size after scaling
+    height: int
+
+
+@dataclass
+class _LayoutContext:
+    left: _Region  # full view of each input (whole frame or ROI)
+    right: _Region
+    width: int  # common view size
+    height: int
+    ratio: float
+    divider_width: int
+    divider_color: str
+
+
+@dataclass
+class _LayoutPlan:
+    left: _Side
+    right: _Side
+    combine: str  # filter applied to [left][right], producing [v]
+    # Labels go on each side before combining, or on the halves of the result.
+    labels_on_result: bool = False
+    direction: str = "horizontal"  # how the sides combine: horizontal, vertical or blended
+
+    def size(self, divider_width: int) -> tuple[int, int]:
+        if self.direction == "horizontal":
+            return self.left.width + self.right.width + divider_width, self.left.height
+        if self.direction == "vertical":
+            return self.left.width, self.left.height + self.right.height + divider_width
+        return self.left.width, self.left.height
+
+
+LAYOUTS: dict[str, Callable[[_LayoutContext], _LayoutPlan]] = {}
+DIFFERENCE_GAIN = 4
+CHECKER_SIZE = 64
+WIPE_PERIOD = 4
+
+
+def register_layout(name: str):
+    def decorator(func: Callable[[_LayoutContext], _LayoutPlan]) -> Callable[[_LayoutContext], _LayoutPlan]:
+        LAYOUTS[name] = func
+        return func
+
+    return decorator
+
+
+def _fit_height(region: _Region, height: int) -> _Side:
+    return _Side(region, _even(round(region.width * height / region.height)) or 2, height)
+
+
+def _fit_width(region: _Region, width: int) -> _Side:
+    return _Side(region, width, _even(round(region.height * width / region.width)) or 2)
+
+
+def _hstack(ctx: _LayoutContext) -> str:
+    if ctx.divider_width > 0:
+        return f"xstack=inputs=2:layout=0_0|w0+{ctx.divider_width}_0:fill={ctx.divider_color}"
+    return "hstack=inputs=2"
+
+
+@register_layout("split")
+def _split_layout(ctx: _LayoutContext) -> _LayoutPlan:
+    """Left part of input 0 beside the rest of input 1, split at `ratio`."""
+    left_width = max(2, _even(round(ctx.left.width * ctx.ratio)))
+    right_offset = max(2, _even(round(ctx.right.width * ctx.ratio)))
+    left = _Region(ctx.left.x, ctx.left.y, left_width, ctx.left.height)
+    right = _Region(ctx.right.x + right_offset, ctx.right.y, max(2, _even(ctx.right.width - right_offset)), ctx.right.height)
+    return _LayoutPlan(_fit_height(left, ctx.height), _fit_height(right, ctx.height), _hstack(ctx))
+
+
+@register_layout("side-by-side")
+def _side_by_side_layout(ctx: _LayoutContext) -> _LayoutPlan:
+    """Both full views next to each other."""
+    return _LayoutPlan(_fit_height(ctx.left, ctx.height), _fit_height(ctx.right, ctx.height), _hstack(ctx))
+
+
+@register_layout("vstack")
+def _vstack_layout(ctx: _LayoutContext) -> _LayoutPlan:
+    """Top part of input 0 above the rest of input 1, for portrait sources."""
+    top_height = max(2, _even(round(ctx.left.height * ctx.ratio)))
+    bottom_offset = max(2, _even(round(ctx.right.height * ctx.ratio)))
+    top = _Region(ctx.left.x, ctx.left.y, ctx.left.width, top_height)
+    bottom = _Region(ctx.right.x, ctx.right.y + bottom_offset, ctx.right.width, max(2, _even(ctx.right.height - bottom_offset)))
+    if ctx.divider_width > 0:
+        combine = f"xstack=inputs=2:layout=0_0|0_h0+{ctx.divider_width}:fill={ctx.divider_color}"
+    else:
+        combine = "vstack=inputs=2"
+    return _LayoutPlan(_fit_width(top, ctx.width), _fit_width(bottom, ctx.width), combine, direction="vertical")
+
+
+def _full_views(ctx: _LayoutContext) -> tuple[_Side, _Side]:
+    return _Side(ctx.left, ctx.width, ctx.height), _Side(ctx.right, ctx.width, ctx.height)
+
+
+@register_layout("difference")
+def _difference_layout(ctx: _LayoutContext) -> _LayoutPlan:
+    """Amplified absolute luma difference; identical pixels are black."""
+    left, right = _full_views(ctx)
+    combine = f"blend=all_mode=difference,lutyuv=y=val*{DIFFERENCE_GAIN}:u=128:v=128"
+    return _LayoutPlan(left, right, combine, labels_on_result=True, direction="blended")
+
+
+@register_layout("checkerboard")
+def _checkerboard_layout(ctx: _LayoutContext) -> _LayoutPlan:
+    """Alternating tiles from each input."""
+    left, right = _full_views(ctx)
+    combine = f"blend=all_expr='if(mod(floor(X/SW/{CHECKER_SIZE})+floor(Y/SH/{CHECKER_SIZE}),2),B,A)'"
+    return _LayoutPlan(left, right, combine, labels_on_result=True, direction="blended")
+
+
+@register_layout("wipe")
+def _wipe_layout(ctx: _LayoutContext) -> _LayoutPlan:
+    """A split line sweeping back and forth across the frame."""
+    left, right = _full_views(ctx)
+    position = f"(0.5+0.5*sin(2*PI*T/{WIPE_PERIOD}))"
+    combine = f"blend=all_expr='if(lt(X/SW,{position}*W/SW),A,B)'"
+    return _LayoutPlan(left, right, combine, labels_on_result=True, direction="blended")
+
+
+LAYOUT_CHOICES = list(LAYOUTS)
+
+_LAYOUT_FILTERS = {
+    "split": ["hstack"],
+    "side-by-side": ["hstack"],
+    "vstack": ["vstack"],
+    "difference": ["blend", "lutyuv"],
+    "checkerboard": ["blend"],
+    "wipe": ["blend"],
+    # N-way grids are built by build_grid_graph, not the two-input registry.
+    "grid": ["pad", "xstack"],
+}
+
+
+def required_filters(layout: str, *, divider: bool, labels: bool) -> list[str]:
+    """FFmpeg filters a compare graph with these options may use."""
+    filters = ["crop", "scale", "format", *_LAYOUT_FILTERS.get(layout, [])]
+    if divider and layout in ("split", "side-by-side", "vstack"):
+        filters = [name for name in filters if name not in ("hstack", "vstack")] + ["xstack"]
+    if labels:
+        filters.extend(["drawtext", "overlay"])
+    return filters
+
+
+SCALERS = ("bicubic", "bilinear", "lanczos", "spline", "area", "neighbor", "fast_bilinear")
+
+
+def fit_filter(width: int, height: int, scaler: str = "") -> str:
+    """Scale a frame to fit inside width x height, keeping its aspect ratio."""
+    flags = f":flags={scaler}" if scaler else ""
+    return f"scale={width}:{height}:force_original_aspect_ratio=decrease:force_divisible_by=2{flags}"
+
+
+def _cap_plan(plan: _LayoutPlan, divider_width: int, max_size: tuple[int, int]) -> _LayoutPlan:
+    # Shrink both sides so the combined frame fits; 0 leaves a dimension uncapped.
+    width, height = plan.size(divider_width)
+    gap_x = divider_width if plan.direction == "horizontal" else 0
+    gap_y = divider_width if plan.direction == "vertical" else 0
+    factor = 1.0
+    if max_size[0] > 0:
+        factor = min(factor, (max_size[0] - gap_x) / (width - gap_x))
+    if max_size[1] > 0:
+        factor = min(factor, (max_size[1] - gap_y) / (height - gap_y))
+    if factor >= 1.0:
+        return plan
+    if factor <= 0:
+        raise RuntimeError(f"Maximum output size {max_size[0]}x{max_size[1]} is too small for this layout.")
+
+    def shrink(side: _Side) -> _Side:
+        return _Side(side.region, max(2, _even(int(side.width * factor))), max(2, _even(int(side.height * factor))))
+
+    return replace(plan, left=shrink(plan.left), right=shrink(plan.right))
+
+
+def _scale_stage(side: _Side, flags: str) -> str | None:
+    if (side.region.width, side.region.height) == (side.width, side.height):
+        return None
+    suffix = f":flags={flags}" if flags else ""
+    return f"scale={side.width}:{side.height}{suffix}"
+
+
+def _roi_views(left: CompareSource, right: CompareSource, roi: Roi, zoom: int) -> tuple[_Region, _Region]:
+    if zoom < 1:
+        raise RuntimeError("ROI zoom must be 1 or greater.")
+    if roi.x + roi.width > left.width or roi.y + roi.height > left.height:
+        raise RuntimeError(
+            f"ROI {roi.x}:{roi.y}:{roi.width}:{roi.height} is outside the {left.width}x{left.height} input."
+        )
+    roi = roi.aligned()
+    # Map the region onto input 1 proportionally.
+    sx = right.width / left.width
+    sy = right.height / left.height
+    mapped = Roi(round(roi.x * sx), round(roi.y * sy), round(roi.width * sx), round(roi.height * sy)).aligned()
+    mapped.width = min(mapped.width, _even(right.width - mapped.x))
+    mapped.height = min(mapped.height, _even(right.height - mapped.y))
+    return (
+        _Region(roi.x, roi.y, roi.width, roi.height),
+        _Region(mapped.x, mapped.y, mapped.width, mapped.height),
+    )
+
+
+def build_compare_graph(
+    left: CompareSource,
+    right: CompareSource,
+    *,
+    layout: str = "split",
+    ratio: float = 0.5,
+    divider_width: int = 0,
+    divider_color: str = "white",
+    audio_input: int | None = None,
+    pix_fmt: str = DEFAULT_PIX_FMT,
+    render_label: Callable[[TextLabel, int], str] | None = None,
+    roi: Roi | None = None,
+    zoom: int = 1,
+    max_size: tuple[int, int] = (0, 0),
+    scaler: str = "",
+) -> CompareGraph:
+    """
+    Compile one registered layout into a single-pass filtergraph. Each input is
+    one linear chain (trim, crop to the pixels the layout shows, scale only when
+    the size changes, one pixel-format pin) feeding a single combine stage.
+    The common view is input 1's frame, or with `roi` (in input 0 display
+    pixels) that region from both inputs, enlarged `zoom` times with
+    nearest-neighbour. Labels are rendered once by `render_label(label, width)`
+    and composited with a static overlay. `max_size` caps the combined frame
+    by shrinking each side's own scale stage (using `scaler`), so nothing is
+    filtered or encoded above the viewing resolution.
+    """
+    extra_inputs: list[str] = []
+
+    def label_input(label: TextLabel, width: int) -> int:
+        if render_label is None:
+            raise RuntimeError("Labels need a renderer to rasterize them.")
+        extra_inputs.append(render_label(label, width))
+        return 1 + len(extra_inputs)
+
+    graph, _ = _pair_graph(
+        left,
+        right,
+        inputs=("0:v", "1:v"),
+        tag="",
+        label_input=label_input,
+        layout=layout,
+        ratio=ratio,
+        divider_width=divider_width,
+        divider_color=divider_color,
+        pix_fmt=pix_fmt,
+        roi=roi,
+        zoom=zoom,
+        max_size=max_size,
+        scaler=scaler,
+    )
+
+    audio_map = None
+    if audio_input is not None:
+        source = (left, right)[audio_input]
+        audio_map = f"{audio_input}:a"
+        if source.trim > 0:
+            graph += f";[{audio_input}:a]{trim_filter(source.trim, audio=True)}[a]"
+            audio_map = "[a]"
+    return CompareGraph(graph, "[v]", audio_map, extra_inputs)
+
+
+def _pair_graph(
+    left: CompareSource,
+    right: CompareSource,
+    *,
+    inputs: tuple[str, str],
+    tag: str,
+    label_input: Callable[[TextLabel, int], int],
+    layout: str,
+    ratio: float,
+    divider_width: int,
+    divider_color: str,
+    pix_fmt: str,
+    roi: Roi | None,
+    zoom: int,
+    max_size: tuple[int, int] = (0, 0),
+    scaler: str = "",
+) -> tuple[str, tuple[int, int]]:
+    # Pads are suffixed with `tag` so several pairs can share one filtergraph;
+    # the result is [v<tag>], returned with its frame size.
+    if left.width <= 0 or left.height <= 0 or right.width <= 0 or right.height <= 0:
+        raise RuntimeError("Compare graph needs valid input resolutions.")
+    if layout not in LAYOUTS:
+        raise RuntimeError(f"Unknown layout '{layout}'. Choose from: {', '.join(LAYOUT_CHOICES)}.")
+    if not 0.0 < ratio < 1.0:
+        raise RuntimeError("Split ratio must be between 0 and 1.")
+
+    if roi is not None:
+        left_view, right_view = _roi_views(left, right, roi, zoom)
+        view_width, view_height = left_view.width * zoom, left_view.height * zoom
+        scale_flags = "neighbor" if zoom > 1 else scaler
+    else:
+        left_view = _Region(0, 0, _even(left.width), _even(left.height))
+        right_view = _Region(0, 0, _even(right.width), _even(right.height))
+        view_width, view_height = right_view.width, right_view.height
+        scale_flags = scaler
+
+    plan = LAYOUTS[layout](
+        _LayoutContext(left_view, right_view, view_width, view_height, ratio, divider_width, divider_color)
+    )
+    plan = _cap_plan(plan, divider_width, max_size)
+
+    graph = ""
+    for pad, source, side, name in zip(inputs, (left, right), (plan.left, plan.right), (f"left{tag}", f"right{tag}")):
+        chain = _branch(source, side.region.crop(source), _scale_stage(side, scale_flags), pix_fmt)
+        if source.label is None or plan.labels_on_result:
+            graph += f"[{pad}]{chain or 'null'}[{name}];"
+            continue
+        graph += (
+            f"[{pad}]{chain or 'null'}[{name}base];"
+            f"[{name}base][{label_input(source.label, side.width)}:v]"
+            f"overlay=x=(main_w-overlay_w)/2:y={_label_overlay_y(source.label.position)}[{name}];"
+        )
+
+    pair = f"[left{tag}][right{tag}]{plan.combine}"
+    labelled = [(source.label, x) for source, x in ((left, "0"), (right, "main_w/2")) if source.label is not None]
+    if plan.labels_on_result and labelled:
+        graph += f"{pair}[stack{tag}]"
+        current = f"stack{tag}"
+        for position, (label, x) in enumerate(labelled):
+            target = f"v{tag}" if position == len(labelled) - 1 else f"stack{tag}_{position}"
+            graph += (
+                f";[{current}][{label_input(label, _even(plan.left.width // 2))}:v]"
+                f"overlay=x={x}:y={_label_overlay_y(label.position)}[{target}]"
+            )
+            current = target
+    else:
+        graph += f"{pair}[v{tag}]"
+    return graph, plan.size(divider_width)
+
+
+def _shared_label_inputs(
+    render_label: Callable[[TextLabel, int], str] | None,
+    first_index: int,
+    extra_inputs: list[str],
+) -> Callable[[TextLabel, int], int]:
+    """Label allocator that adds each distinct PNG as one input, however often it is overlaid."""
+    indexes: dict[str, int] = {}
+
+    def label_input(label: TextLabel, width: int) -> int:
+        if render_label is None:
+            raise RuntimeError("Labels need a renderer to rasterize them.")
+        path = render_label(label, width)
+        if path not in indexes:
+            indexes[path] = first_index + len(extra_inputs)
+            extra_inputs.append(path)
+        return indexes[path]
+
+    return label_input
+
+
+@dataclass
+class FanoutGraph:
+    filter_complex: str
+    video_maps: list[str]  # one per candidate, in order
+    audio_maps: list[str | None]
+    extra_inputs: list[str] = field(default_factory=list)
+
+
+def build_fanout_graph(
+    reference: CompareSource,
+    candidates: list[CompareSource],
+    *,
+    audio_from: str | None = None,
+    pix_fmt: str = DEFAULT_PIX_FMT,
+    render_label: Callable[[TextLabel, int], str] | None = None,
+    **options,
+) -> FanoutGraph:
+    """
+    Compare input 0 against inputs 1..N in one filtergraph with N outputs.
+    The reference is decoded, trimmed and pixel-format converted once, then
+    `split` feeds each compare pair, so its cost does not grow with N.
+    `audio_from` is "reference", "candidate" or None; `options` are the
+    layout keywords accepted by build_compare_graph.
+    """
+    if not candidates:
+        raise RuntimeError("Fanout compare needs at least one candidate.")
+    if reference.width <= 0 or reference.height <= 0:
+        raise RuntimeError("Compare graph needs valid input resolutions.")
+
+    extra_inputs: list[str] = []
+    label_input = _shared_label_inputs(render_label, len(candidates) + 1, extra_inputs)
+    count = len(candidates)
+    shared = ",".join(stage for stage in (
+        trim_filter(reference.trim) if reference.trim > 0 else "",
+        f"format={pix_fmt}" if reference.pix_fmt != pix_fmt else "",
+    ) if stage)
+    if count == 1:
+        graph = f"[0:v]{shared or 'null'}[ref0]"
+    else:
+        pads = "".join(f"[ref{index}]" for index in range(count))
+        graph = f"[0:v]{shared + ',' if shared else ''}split={count}{pads}"
+    prepared = CompareSource(reference.width, reference.height, pix_fmt, 0.0, reference.label)
+
+    video_maps = []
+    for index, candidate in enumerate(candidates):
+        pair, _ = _pair_graph(
+            prepared,
+            candidate,
+            inputs=(f"ref{index}", f"{index + 1}:v"),
+            tag=str(index),
+            label_input=label_input,
+            pix_fmt=pix_fmt,
+            **options,
+        )
+        graph += ";" + pair
+        video_maps.append(f"[v{index}]")
+
+    audio_maps: list[str | None] = [None] * count
+    if audio_from == "reference":
+        if reference.trim > 0:
+            pads = "".join(f"[a{index}]" for index in range(count))
+            graph += f";[0:a]{trim_filter(reference.trim, audio=True)},asplit={count}{pads}"
+            audio_maps = [f"[a{index}]" for index in range(count)]
+        else:
+            audio_maps = ["0:a"] * count
+    elif audio_from == "candidate":
+        for index, candidate in enumerate(candidates):
+            audio_maps[index] = f"{index + 1}:a"
+            if candidate.trim > 0:
+                graph += f";[{index + 1}:a]{trim_filter(candidate.trim, audio=True)}[a{index}]"
+                audio_maps[index] = f"[a{index}]"
+    return FanoutGraph(graph, video_maps, audio_maps, extra_inputs)
+
+TITLE_CARD_SECONDS = 2.0
+_CARD_AUDIO = "sample_rates=48000:channel_layouts=stereo"
+
+
+def build_segments_graph(
+    left: CompareSource,
+    right: CompareSource,
+    segments: list[Segment],
+    *,
+    title_cards: list[TextLabel] | None = None,
+    card_seconds: float = TITLE_CARD_SECONDS,
+    rate: float = 25.0,
+    audio_input: int | None = None,
+    pix_fmt: str = DEFAULT_PIX_FMT,
+    render_label: Callable[[TextLabel, int], str] | None = None,
+    **options,
+) -> CompareGraph:
+    """
+    Compare several excerpts of the same two inputs in one pass. Each input is
+    decoded once and `split` per segment; every branch is trimmed to its
+    segment (times are relative to the source's trim point), compared, and
+    the results are joined with `concat`, optionally with a title card
+    (`rate` fps, `card_seconds` long) before each segment. `options` are the
+    layout keywords accepted by build_compare_graph.
+    """
+    if not segments:
+        raise RuntimeError("Segment compare needs at least one segment.")
+    for previous, current in zip(segments, segments[1:]):
+        if current.start < previous.end:
+            raise RuntimeError("Segments must be in time order and must not overlap.")
+    if title_cards is not None and len(title_cards) != len(segments):
+        raise RuntimeError("Give one title card per segment.")
+
+    count = len(segments)
+    extra_inputs: list[str] = []
+    label_input = _shared_label_inputs(render_label, 2, extra_inputs)
+    parts = []
+    if count > 1:
+        for index in range(2):
+            pads = "".join(f"[in{index}_{k}]" for k in range(count))
+            parts.append(f"[{index}:v]split={count}{pads}")
+
+    audio = None if audio_input is None else (left, right)[audio_input]
+    if audio is not None and count > 1:
+        pads = "".join(f"[ain{k}]" for k in range(count))
+        parts.append(f"[{audio_input}:a]asplit={count}{pads}")
+
+    pieces = ""
+    for k, segment in enumerate(segments):
+        inputs = (f"in0_{k}", f"in1_{k}") if count > 1 else ("0:v", "1:v")
+        pair, (width, height) = _pair_graph(
+            replace(left, trim=left.trim + segment.start, duration=segment.duration),
+            replace(right, trim=right.trim + segment.start, duration=segment.duration),
+            inputs=inputs,
+            tag=f"_{k}",
+            label_input=label_input,
+            pix_fmt=pix_fmt,
+            **options,
+        )
+        parts.append(pair)
+        if audio is not None:
+            audio_pad = f"ain{k}" if count > 1 else f"{audio_input}:a"
+            audio_chain = trim_filter(audio.trim + segment.start, audio=True, duration=segment.duration)
+            if title_cards is not None:
+                audio_chain += f",aformat={_CARD_AUDIO}"
+            parts.append(f"[{audio_pad}]{audio_chain}[a_{k}]")
+
+        if title_cards is not None:
+            card = title_cards[k]
+            # concat needs matching sample aspect ratios on every piece.
+            parts.append(f"[v_{k}]setsar=1[seg_{k}]")
+            parts.append(
+                f"color=c=black:s={width}x{height}:r={rate:g}:d={card_seconds:g},format={pix_fmt}[card_{k}base];"
+                f"[card_{k}base][{label_input(card, width)}:v]"
+                f"overlay=x=(main_w-overlay_w)/2:y={_label_overlay_y(card.position)},setsar=1[card_{k}]"
+            )
+            pieces += f"[card_{k}]"
+            if audio is not None:
+                parts.append(f"anullsrc=r=48000:cl=stereo,atrim=duration={card_seconds:g},aformat={_CARD_AUDIO}[acard_{k}]")
+                pieces += f"[acard_{k}]"
+            pieces += f"[seg_{k}]"
+        else:
+            pieces += f"[v_{k}]"
+        if audio is not None:
+            pieces += f"[a_{k}]"
+
+    pieces_count = count * (2 if title_cards is not None else 1)
+    if audio is not None:
+        parts.append(f"{pieces}concat=n={pieces_count}:v=1:a=1[v][a]")
+        return CompareGraph(";".join(parts), "[v]", "[a]", extra_inputs)
+    parts.append(f"{pieces}concat=n={pieces_count}:v=1:a=0[v]")
+    return CompareGraph(";".join(parts), "[v]", None, extra_inputs)
+
+
+GRID_MAX_SIZE = (3840, 2160)
+GRID_MAX_INPUTS = 16
+
+
+def grid_shape(count: int) -> tuple[int, int]:
+    """Columns and rows for `count` cells, as square as possible, wider than tall."""
+    columns = 1
+    while columns * columns < count:
+        columns += 1
+    rows = -(-count // columns)
+    return columns, rows
+
+
+def _grid_cell_size(
+    sources: list[CompareSource],
+    columns: int,
+    rows: int,
+    gap: int,
+    max_size: tuple[int, int],
+) -> tuple[int, int]:
+    # Cells use the largest input's size, shrunk until the whole grid fits.
+    largest = max(sources, key=lambda source: source.width * source.height)
+    width, height = largest.width, largest.height
+    max_width = min(GRID_MAX_SIZE[0], max_size[0] or GRID_MAX_SIZE[0])
+    max_height = min(GRID_MAX_SIZE[1], max_size[1] or GRID_MAX_SIZE[1])
+    factor = min(
+        1.0,
+        (max_width - gap * (columns - 1)) / (width * columns),
+        (max_height - gap * (rows - 1)) / (height * rows),
+    )
+    return max(2, _even(int(width * factor))), max(2, _even(int(height * factor)))
+
+
+def _fit_cell(source: CompareSource, width: int, height: int, scaler: str = "") -> str | None:
+    if (source.width, source.height) == (width, height):
+        return None
+    flags = f":flags={scaler}" if scaler else ""
+    if abs(source.width / source.height - width / height) < 0.01:
+        return f"scale={width}:{height}{flags}"
+    return (
+        f"scale={width}:{height}:force_original_aspect_ratio=decrease:force_divisible_by=2{flags},"
+        f"pad={width}:{height}:(ow-iw)/2:(oh-ih)/2"
+    )
+
+
+def build_grid_graph(
+    sources: list[CompareSource],
+    *,
+    gap: int = 0,
+    gap_color: str = "black",
+    audio_input: int | None = None,
+    pix_fmt: str = DEFAULT_PIX_FMT,
+    render_label: Callable[[TextLabel, int], str] | None = None,
+    max_size: tuple[int, int] = (0, 0),
+    scaler: str = "",
+) -> CompareGraph:
+    """
+    Tile 2-16 inputs into one xstack grid in a single pass. Every input is
+    scaled to a common cell (letterboxed when its aspect differs), labelled
+    with a pre-rendered band, and placed at a fixed pixel position. The grid
+    fits in 3840x2160, or in `max_size` when that is smaller.
+    """
+    if not 2 <= len(sources) <= GRID_MAX_INPUTS:
+        raise RuntimeError(f"Grid compare needs 2 to {GRID_MAX_INPUTS} inputs.")
+    if any(source.width <= 0 or source.height <= 0 for source in sources):
+        raise RuntimeError("Compare graph needs valid input resolutions.")
+
+    columns, rows = grid_shape(len(sources))
+    cell_width, cell_height = _grid_cell_size(sources, columns, rows, gap, max_size)
+    extra_inputs: list[str] = []
+    graph = ""
+    positions = []
+    for index, source in enumerate(sources):
+        chain = _branch(source, None, _fit_cell(source, cell_width, cell_height, scaler), pix_fmt) or "null"
+        if source.label is None:
+            graph += f"[{index}:v]{chain}[c{index}];"
+        else:
+            if render_label is None:
+                raise RuntimeError("Labels need a renderer to rasterize them.")
+            extra_inputs.append(render_label(source.label, cell_width))
+            label_input = len(sources) + len(extra_inputs) - 1
+            graph += (
+                f"[{index}:v]{chain}[c{index}base];"
+                f"[c{index}base][{label_input}:v]"
+                f"overlay=x=(main_w-overlay_w)/2:y={_label_overlay_y(source.label.position)}[c{index}];"
+            )
+        column, row = index % columns, index // columns
+        positions.append(f"{column * (cell_width + gap)}_{row * (cell_height + gap)}")
+
+    cells = "".join(f"[c{index}]" for index in range(len(sources)))
+    graph += f"{cells}xstack=inputs={len(sources)}:layout={'|'.join(positions)}:fill={gap_color}[v]"
+
+    audio_map = None
+    if audio_input is not None:
+        source = sources[audio_input]
+        audio_map = f"{audio_input}:a"
+        if source.trim > 0:
+            graph += f";[{audio_input}:a]{trim_filter(source.trim, audio=True)}[a]"
+            audio_map = "[a]"
+    return CompareGraph(graph, "[v]", audio_map, extra_inputs)
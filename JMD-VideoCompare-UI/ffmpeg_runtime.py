@@ -5,12 +5,23 @@ Pure stdlib module so CLI mode can run headless without importing Qt.
 
 from __future__ import annotations
 
+import hashlib
+import http.client
+import json
 import os
+import queue
+import re
 import shutil
 import subprocess
+import threading
+import time
+import urllib.error
 import urllib.parse
 import urllib.request
 import zipfile
+from concurrent.futures import ThreadPoolExecutor, wait
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
 from pathlib import Path
 from typing import Callable
 
@@ -21,6 +32,27 @@ FFMPEG_DOWNLOAD_URLS = [
 
 UpdateCallback = Callable[[str], None]
 
+VALIDATION_MANIFEST_NAME = "validation-manifest.json"
+CAPABILITIES_CACHE_NAME = "capabilities-cache.json"
+CURRENT_VERSION_POINTER = "current-version.txt"
+INSTALL_LOCK_NAME = "install.lock"
+PINNED_RUNTIME_NAME = "pinned-runtime.json"
+
+_CHUNK_SIZE = 1024 * 256
+_RESUME_ATTEMPTS = 5
+_PROBE_TIMEOUT = 10
+_PROBE_GRACE = 1.5
+_SEGMENT_CONNECTIONS = 4
+_MIN_SEGMENT_SIZE = 1024 * 1024 * 4
+_LOCK_TIMEOUT = 60 * 30
+_MANIFEST_LOCK_TIMEOUT = 10
+_KEEP_VERSIONS = 2
+_STALE_SECONDS = 60 * 60
+_RUNTIME_BINARIES = ("ffmpeg.exe", "ffprobe.exe")
+_SHA256_RE = re.compile(r"[0-9a-fA-F]{64}")
+
+_manifest_lock = threading.Lock()
+
 
 def default_cache_root() -> Path:
     base = os.environ.get("LOCALAPPDATA") or os.environ.get("APPDATA")
@@ -32,9 +64,57 @@ def default_cache_root() -> Path:
     return root
 
 
-def validate_exe(exe_path: Path) -> bool:
-    if not exe_path.exists() or not exe_path.is_file():
-        return False
+def _binary_fingerprint(exe_path: Path) -> dict[str, object] | None:
+    try:
+        stat = exe_path.stat()
+    except OSError:
+        return None
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+def _manifest_key(exe_path: Path) -> str:
+    return os.path.normcase(str(exe_path.resolve()))
+
+
+def _load_manifest(manifest_path: Path) -> dict[str, dict[str, object]]:
+    try:
+        data = json.loads(manifest_path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+def _write_manifest(manifest_path: Path, manifest: dict[str, dict[str, object]]) -> None:
+    tmp_path = manifest_path.with_name(f"{manifest_path.name}.{os.getpid()}.tmp")
+    try:
+        tmp_path.write_text(json.dumps(manifest, indent=2, sort_keys=True), encoding="utf-8")
+        os.replace(tmp_path, manifest_path)
+    except OSError:
+        try:
+            tmp_path.unlink(missing_ok=True)
+        except OSError:
+            pass
+
+
+def _update_manifest(manifest_path: Path, key: str, entry: dict[str, object]) -> None:
+    """
+    Store `entry` under `key`, dropping entries for binaries that no longer exist.
+    The read-modify-write holds a lock file next to the manifest, so CLI workers
+    validating at the same time do not drop each other's entries.
+    """
+    lock_path = manifest_path.with_name(f"{manifest_path.name}.lock")
+    with _manifest_lock:
+        try:
+            with _file_lock(lock_path, None, timeout=_MANIFEST_LOCK_TIMEOUT, purpose="updating the FFmpeg manifest"):
+                manifest = {k: v for k, v in _load_manifest(manifest_path).items() if Path(k).exists()}
+                manifest[key] = entry
+                _write_manifest(manifest_path, manifest)
+        except (OSError, RuntimeError):
+            # The manifest is only a cache; the next call validates again.
+            pass
+
+
+def _run_version_check(exe_path: Path) -> str | None:
     try:
         result = subprocess.run(
             [str(exe_path), "-version"],
@@ -43,26 +123,69 @@ def validate_exe(exe_path: Path) -> bool:
             text=True,
             timeout=8,
         )
-        return result.returncode == 0
     except Exception:
-        return False
+        return None
+    if result.returncode != 0:
+        return None
+    lines = (result.stdout or "").strip().splitlines()
+    return lines[0].strip() if lines else ""
+
+
+def runtime_version(exe_path: Path, *, cache_root: Path | None = None) -> str | None:
+    """
+    Return the `-version` banner line for a binary, or None when it fails validation.
+    Results are kept in a manifest under the cache root keyed by path, size and mtime,
+    so an unchanged binary is only spawned once.
+    """
+    if not exe_path.exists() or not exe_path.is_file():
+        return None
+    fingerprint = _binary_fingerprint(exe_path)
+    if fingerprint is None:
+        return None
+
+    manifest_path = (cache_root or default_cache_root()) / VALIDATION_MANIFEST_NAME
+    key = _manifest_key(exe_path)
+    with _manifest_lock:
+        entry = _load_manifest(manifest_path).get(key)
+    if (
+        isinstance(entry, dict)
+        and entry.get("size") == fingerprint["size"]
+        and entry.get("mtime_ns") == fingerprint["mtime_ns"]
+        and isinstance(entry.get("version"), str)
+    ):
+        return str(entry["version"])
+
+    version = _run_version_check(exe_path)
+    if version is None:
+        return None
+
+    _update_manifest(manifest_path, key, {**fingerprint, "version": version})
+    return version
+
+
+def validate_exe(exe_path: Path, *, cache_root: Path | None = None) -> bool:
+    return runtime_version(exe_path, cache_root=cache_root) is not None
 
 
-def validate_ffmpeg_pair(ffmpeg_path: Path, ffprobe_path: Path) -> bool:
-    return validate_exe(ffmpeg_path) and validate_exe(ffprobe_path)
+def validate_ffmpeg_pair(ffmpeg_path: Path, ffprobe_path: Path, *, cache_root: Path | None = None) -> bool:
+    return validate_exe(ffmpeg_path, cache_root=cache_root) and validate_exe(ffprobe_path, cache_root=cache_root)
 
 
-def find_ffmpeg_pair_in_tree(root: Path) -> tuple[Path | None, Path | None]:
+def find_ffmpeg_pair_in_tree(
+    root: Path,
+    *,
+    cache_root: Path | None = None,
+) -> tuple[Path | None, Path | None]:
     if not root.exists():
         return None, None
     for ffmpeg_path in root.rglob("ffmpeg.exe"):
         ffprobe_path = ffmpeg_path.with_name("ffprobe.exe")
-        if ffprobe_path.exists() and validate_ffmpeg_pair(ffmpeg_path, ffprobe_path):
+        if ffprobe_path.exists() and validate_ffmpeg_pair(ffmpeg_path, ffprobe_path, cache_root=cache_root):
             return ffmpeg_path, ffprobe_path
     return None, None
 
 
-def resolve_system_ffmpeg_pair() -> tuple[Path | None, Path | None]:
+def resolve_system_ffmpeg_pair(*, cache_root: Path | None = None) -> tuple[Path | None, Path | None]:
     ffmpeg_path = shutil.which("ffmpeg")
     ffprobe_path = shutil.which("ffprobe")
     if ffmpeg_path and not ffprobe_path:
@@ -73,34 +196,522 @@ def resolve_system_ffmpeg_pair() -> tuple[Path | None, Path | None]:
         return None, None
     ffmpeg = Path(ffmpeg_path)
     ffprobe = Path(ffprobe_path)
-    if validate_ffmpeg_pair(ffmpeg, ffprobe):
+    if validate_ffmpeg_pair(ffmpeg, ffprobe, cache_root=cache_root):
         return ffmpeg, ffprobe
     return None, None
 
 
-def _download_archive(target_path: Path, update_cb: UpdateCallback) -> None:
+@dataclass
+class FFmpegCapabilities:
+    """What a specific ffmpeg binary can do, collected from its listing flags."""
+
+    version: str
+    encoders: dict[str, str]  # encoder name -> "<type>:<codec>", type is V/A/S
+    filters: list[str]
+    pix_fmts: list[str]
+    muxers: list[str]
+
+    def _encoder_entries(self, media_type: str | None = None) -> list[tuple[str, str]]:
+        entries = []
+        for name, spec in self.encoders.items():
+            kind, _, codec = spec.partition(":")
+            if media_type is None or kind == media_type:
+                entries.append((name, codec))
+        return entries
+
+    def has_encoder(self, name: str, media_type: str | None = None) -> bool:
+        """Accept encoder names (libx264) and codec names (vp9), like `-c:v` does."""
+        return any(name in (encoder, codec) for encoder, codec in self._encoder_entries(media_type))
+
+    def has_filter(self, name: str) -> bool:
+        return name in self.filters
+
+    def has_pix_fmt(self, name: str) -> bool:
+        return name in self.pix_fmts
+
+    def has_muxer(self, name: str) -> bool:
+        return name in self.muxers
+
+    def supports_output_type(self, output_type: str) -> bool:
+        ext = output_type.lower().lstrip(".")
+        return self.has_muxer(OUTPUT_TYPE_MUXERS.get(ext, ext))
+
+    @property
+    def release(self) -> tuple[int, int] | None:
+        """(major, minor) of a release build; None for git snapshots, which track master."""
+        match = _RELEASE_RE.match(self.version)
+        return (int(match.group(1)), int(match.group(2))) if match else None
+
+    @property
+    def supports_fps_mode(self) -> bool:
+        """-fps_mode replaced -vsync in FFmpeg 5.1."""
+        return self.release is None or self.release >= (5, 1)
+
+
+OUTPUT_TYPE_MUXERS = {"mkv": "matroska", "wmv": "asf", "jpg": "image2", "png": "image2", "webp-seq": "image2"}
+
+_RELEASE_RE = re.compile(r"ffmpeg version n?(\d+)\.(\d+)")
+_ENCODER_LINE_RE = re.compile(r"^\s*([VAS])[F.][S.][X.][B.][D.]\s+(\S+)\s+(.*)$")
+_ENCODER_CODEC_RE = re.compile(r"\(codec (\S+)\)")
+_FILTER_LINE_RE = re.compile(r"^\s*[TSC.|]{2,3}\s+(\S+)\s+\S*->\S*")
+_PIX_FMT_LINE_RE = re.compile(r"^\s*[I.][O.][H.][P.][B.]\s+(\S+)")
+_MUXER_LINE_RE = re.compile(r"^\s*D?E\s*d?\s+(\S+)")
+
+
+def _parse_encoder_listing(text: str) -> dict[str, str]:
+    encoders: dict[str, str] = {}
+    for line in text.splitlines():
+        match = _ENCODER_LINE_RE.match(line)
+        if not match or match.group(2) == "=":
+            continue
+        kind, name, description = match.groups()
+        codec_match = _ENCODER_CODEC_RE.search(description)
+        encoders[name] = f"{kind}:{codec_match.group(1) if codec_match else name}"
+    return encoders
+
+
+def _parse_name_listing(text: str, pattern: re.Pattern[str]) -> list[str]:
+    names: list[str] = []
+    for line in text.splitlines():
+        match = pattern.match(line)
+        if match and match.group(1) != "=":
+            names.extend(part for part in match.group(1).split(",") if part)
+    return sorted(set(names))
+
+
+def _run_listing(ffmpeg_path: Path, flag: str) -> str:
+    result = subprocess.run(
+        [str(ffmpeg_path), "-hide_banner", flag],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+        text=True,
+        timeout=15,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"ffmpeg {flag} failed with exit code {result.returncode}.")
+    return result.stdout or ""
+
+
+def probe_capabilities(ffmpeg_path: Path, *, cache_root: Path | None = None) -> FFmpegCapabilities:
+    """
+    Collect encoders, filters, pixel formats and muxers for `ffmpeg_path`.
+    The result is cached on disk per binary fingerprint (path, size, mtime), so
+    later calls for an unchanged binary return without spawning anything.
+    """
+    version = runtime_version(ffmpeg_path, cache_root=cache_root)
+    if version is None:
+        raise RuntimeError(f"FFmpeg binary failed validation: {ffmpeg_path}")
+    fingerprint = _binary_fingerprint(ffmpeg_path) or {}
+    cache_path = (cache_root or default_cache_root()) / CAPABILITIES_CACHE_NAME
+    key = _manifest_key(ffmpeg_path)
+
+    with _manifest_lock:
+        entry = _load_manifest(cache_path).get(key)
+    if (
+        isinstance(entry, dict)
+        and entry.get("size") == fingerprint.get("size")
+        and entry.get("mtime_ns") == fingerprint.get("mtime_ns")
+        and isinstance(entry.get("capabilities"), dict)
+    ):
+        try:
+            return FFmpegCapabilities(**entry["capabilities"])  # type: ignore[arg-type]
+        except TypeError:
+            pass
+
+    flags = ("-encoders", "-filters", "-pix_fmts", "-muxers")
+    with ThreadPoolExecutor(max_workers=len(flags)) as pool:
+        listings = dict(zip(flags, pool.map(lambda flag: _run_listing(ffmpeg_path, flag), flags)))
+    capabilities = FFmpegCapabilities(
+        version=version,
+        encoders=_parse_encoder_listing(listings["-encoders"]),
+        filters=_parse_name_listing(listings["-filters"], _FILTER_LINE_RE),
+        pix_fmts=_parse_name_listing(listings["-pix_fmts"], _PIX_FMT_LINE_RE),
+        muxers=_parse_name_listing(listings["-muxers"], _MUXER_LINE_RE),
+    )
+
+    _update_manifest(cache_path, key, {**fingerprint, "capabilities": asdict(capabilities)})
+    return capabilities
+
+
+def file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as in_file:
+        for chunk in iter(lambda: in_file.read(_CHUNK_SIZE * 4), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _partial_path(target_path: Path) -> Path:
+    return target_path.with_name(f"{target_path.name}.partial")
+
+
+def _checksum_path(target_path: Path) -> Path:
+    return target_path.with_name(f"{target_path.name}.sha256")
+
+
+def _parse_sha256_listing(text: str, filename: str) -> str | None:
+    """Find a hash in `sha256sum`-style text, preferring the line naming `filename`."""
+    single: str | None = None
+    for line in text.splitlines():
+        tokens = line.replace("*", " ").split()
+        digest = next((t.lower() for t in tokens if _SHA256_RE.fullmatch(t)), None)
+        if not digest:
+            continue
+        if filename in tokens:
+            return digest
+        if single is None and len(tokens) == 1:
+            single = digest
+    return single
+
+
+def _fetch_published_sha256(url: str) -> str | None:
+    """Look up the mirror's published SHA-256 (`<url>.sha256` or a sibling `checksums.sha256`)."""
+    filename = url.rsplit("/", 1)[-1]
+    for checksum_url in (f"{url}.sha256", f"{url.rsplit('/', 1)[0]}/checksums.sha256"):
+        try:
+            req = urllib.request.Request(checksum_url, headers={"User-Agent": "JMD-VideoCompare-UI"})
+            with urllib.request.urlopen(req, timeout=15) as response:
+                text = response.read(1024 * 64).decode("utf-8", errors="replace")
+        except Exception:
+            continue
+        digest = _parse_sha256_listing(text, filename)
+        if digest:
+            return digest
+    return None
+
+
+def recorded_sha256(target_path: Path) -> str | None:
+    try:
+        return _checksum_path(target_path).read_text(encoding="utf-8").split()[0].lower()
+    except (OSError, IndexError):
+        return None
+
+
+def is_verified_archive(target_path: Path) -> bool:
+    """True when `target_path` exists and matches the SHA-256 recorded next to it."""
+    recorded = recorded_sha256(target_path)
+    if not target_path.is_file() or not recorded:
+        return False
+    return file_sha256(target_path) == recorded
+
+
+def _partial_state_path(target_path: Path) -> Path:
+    return target_path.with_name(f"{target_path.name}.partial.json")
+
+
+def discard_archive(target_path: Path) -> None:
+    for path in (
+        target_path,
+        _partial_path(target_path),
+        _partial_state_path(target_path),
+        _checksum_path(target_path),
+    ):
+        try:
+            path.unlink(missing_ok=True)
+        except OSError:
+            pass
+
+
+def _download_to_partial(url: str, partial_path: Path, update_cb: UpdateCallback) -> None:
+    """
+    Stream `url` into `partial_path`, resuming with HTTP Range requests when the
+    connection drops. A server that ignores the Range header restarts the file.
+    """
     last_error: Exception | None = None
-    for url in FFMPEG_DOWNLOAD_URLS:
-        host = urllib.parse.urlparse(url).netloc
+    for _ in range(_RESUME_ATTEMPTS):
+        offset = partial_path.stat().st_size if partial_path.exists() else 0
+        headers = {"User-Agent": "JMD-VideoCompare-UI"}
+        if offset:
+            headers["Range"] = f"bytes={offset}-"
+            update_cb(f"Resuming FFmpeg download at {offset / (1024 * 1024):.1f} MB...")
+        req = urllib.request.Request(url, headers=headers)
         try:
-            update_cb(f"Downloading FFmpeg from {host}...")
-            req = urllib.request.Request(url, headers={"User-Agent": "JMD-VideoCompare-UI"})
-            with urllib.request.urlopen(req, timeout=45) as response, open(target_path, "wb") as out_file:
-                total_str = response.headers.get("Content-Length")
-                total = int(total_str) if total_str and total_str.isdigit() else 0
-                downloaded = 0
+            with urllib.request.urlopen(req, timeout=45) as response:
+                if offset and getattr(response, "status", 200) != 206:
+                    offset = 0
+                length_str = response.headers.get("Content-Length")
+                remaining = int(length_str) if length_str and length_str.isdigit() else 0
+                total = offset + remaining if remaining else 0
+                downloaded = offset
                 next_percent = 5
-                while True:
-                    chunk = response.read(1024 * 256)
+                if total > 0:
+                    next_percent = (int((downloaded * 100) / total) // 5 + 1) * 5
+                with open(partial_path, "ab" if offset else "wb") as out_file:
+                    while True:
+                        chunk = response.read(_CHUNK_SIZE)
+                        if not chunk:
+                            break
+                        out_file.write(chunk)
+                        downloaded += len(chunk)
+                        if total > 0:
+                            percent = int((downloaded * 100) / total)
+                            if percent >= next_percent:
+                                update_cb(f"Downloading FFmpeg... {min(percent, 100)}%")
+                                next_percent = (percent // 5 + 1) * 5
+                if total > 0 and downloaded < total:
+                    raise ConnectionError(f"Connection closed at {downloaded} of {total} bytes.")
+            return
+        except urllib.error.HTTPError as exc:
+            if exc.code == 416 and offset:
+                # Stale partial larger than the remote file; start over.
+                partial_path.unlink(missing_ok=True)
+                last_error = exc
+                continue
+            raise
+        except (OSError, http.client.HTTPException) as exc:
+            last_error = exc
+    raise RuntimeError(f"Download did not complete after {_RESUME_ATTEMPTS} attempts: {last_error}")
+
+
+@dataclass
+class MirrorProbe:
+    url: str
+    latency: float
+    size: int
+    accepts_ranges: bool
+
+
+@dataclass
+class _Segment:
+    start: int
+    end: int
+    done: int = 0
+
+    @property
+    def length(self) -> int:
+        return self.end - self.start + 1
+
+
+def _probe_mirror(url: str) -> MirrorProbe:
+    """Request the first byte of `url` to measure latency, total size and Range support."""
+    req = urllib.request.Request(url, headers={"User-Agent": "JMD-VideoCompare-UI", "Range": "bytes=0-0"})
+    started = time.monotonic()
+    with urllib.request.urlopen(req, timeout=_PROBE_TIMEOUT) as response:
+        response.read(1)
+        latency = time.monotonic() - started
+        status = getattr(response, "status", 200)
+        size = 0
+        content_range = response.headers.get("Content-Range") or ""
+        match = re.match(r"bytes\s+\d+-\d+/(\d+)", content_range)
+        if status == 206 and match:
+            size = int(match.group(1))
+        elif status == 200:
+            length_str = response.headers.get("Content-Length")
+            size = int(length_str) if length_str and length_str.isdigit() else 0
+    return MirrorProbe(url=url, latency=latency, size=size, accepts_ranges=status == 206 and size > 0)
+
+
+def rank_mirrors(urls: list[str], update_cb: UpdateCallback | None = None) -> list[MirrorProbe]:
+    """
+    Probe every mirror at once and return the reachable ones, fastest first.
+    Once one mirror answers, slower ones get a short grace period instead of
+    their full timeout. Probe threads are daemonic so a dead mirror never
+    delays interpreter exit.
+    """
+    cb = update_cb or _noop
+    cb("Probing FFmpeg download mirrors...")
+    results: queue.Queue[tuple[str, MirrorProbe | None]] = queue.Queue()
+
+    def probe_into_queue(url: str) -> None:
+        try:
+            results.put((url, _probe_mirror(url)))
+        except Exception:
+            results.put((url, None))
+
+    for url in urls:
+        threading.Thread(target=probe_into_queue, args=(url,), daemon=True).start()
+
+    probes: list[MirrorProbe] = []
+    deadline = time.monotonic() + _PROBE_TIMEOUT + 1
+    for _ in urls:
+        try:
+            url, probe = results.get(timeout=max(0.0, deadline - time.monotonic()))
+        except queue.Empty:
+            break
+        host = urllib.parse.urlparse(url).netloc
+        if probe is None:
+            cb(f"Mirror {host} is unreachable.")
+            continue
+        cb(f"Mirror {host} responded in {probe.latency * 1000:.0f} ms.")
+        if not probes:
+            deadline = min(deadline, time.monotonic() + _PROBE_GRACE)
+        probes.append(probe)
+    probes.sort(key=lambda probe: probe.latency)
+    return probes
+
+
+def _plan_segments(size: int, state: dict[str, object] | None) -> list[_Segment]:
+    if state and isinstance(state.get("segments"), list):
+        try:
+            return [_Segment(int(a), int(b), int(c)) for a, b, c in state["segments"]]  # type: ignore[union-attr]
+        except (TypeError, ValueError):
+            pass
+    count = max(1, min(_SEGMENT_CONNECTIONS, size // _MIN_SEGMENT_SIZE))
+    step = size // count
+    segments = []
+    for index in range(count):
+        start = index * step
+        end = size - 1 if index == count - 1 else start + step - 1
+        segments.append(_Segment(start, end))
+    return segments
+
+
+def _fetch_segment(url: str, partial_path: Path, segment: _Segment) -> None:
+    last_error: Exception | None = None
+    for _ in range(_RESUME_ATTEMPTS):
+        position = segment.start + segment.done
+        if position > segment.end:
+            return
+        req = urllib.request.Request(
+            url,
+            headers={"User-Agent": "JMD-VideoCompare-UI", "Range": f"bytes={position}-{segment.end}"},
+        )
+        try:
+            with urllib.request.urlopen(req, timeout=45) as response, open(partial_path, "r+b") as out_file:
+                if getattr(response, "status", 200) != 206:
+                    raise RuntimeError("Mirror stopped honouring range requests.")
+                out_file.seek(position)
+                while position <= segment.end:
+                    chunk = response.read(min(_CHUNK_SIZE, segment.end - position + 1))
                     if not chunk:
                         break
                     out_file.write(chunk)
-                    downloaded += len(chunk)
-                    if total > 0:
-                        percent = int((downloaded * 100) / total)
-                        if percent >= next_percent:
-                            update_cb(f"Downloading FFmpeg... {min(percent, 100)}%")
-                            next_percent += 5
+                    # Only bytes handed to the OS may be counted; `done` is persisted for resume.
+                    out_file.flush()
+                    position += len(chunk)
+                    segment.done += len(chunk)
+            if position > segment.end:
+                return
+        except (OSError, http.client.HTTPException) as exc:
+            last_error = exc
+    raise RuntimeError(f"Segment {segment.start}-{segment.end} did not complete: {last_error}")
+
+
+def _download_segmented(
+    probe: MirrorProbe,
+    partial_path: Path,
+    state_path: Path,
+    update_cb: UpdateCallback,
+) -> None:
+    """
+    Pull byte ranges of `probe.url` over several connections into a preallocated
+    file. Segment progress is persisted so an interrupted run resumes where it stopped.
+    """
+    state = _load_partial_state(state_path)
+    if not (state and state.get("url") == probe.url and state.get("size") == probe.size and partial_path.exists()):
+        state = None
+        with open(partial_path, "wb") as out_file:
+            out_file.truncate(probe.size)
+    segments = _plan_segments(probe.size, state)
+    pending = [segment for segment in segments if segment.done < segment.length]
+
+    def save_state() -> None:
+        _save_partial_state(
+            state_path,
+            {
+                "url": probe.url,
+                "size": probe.size,
+                "segments": [[seg.start, seg.end, seg.done] for seg in segments],
+            },
+        )
+
+    save_state()
+    update_cb(f"Downloading over {len(pending)} connection(s)...")
+    next_percent = 5
+    with ThreadPoolExecutor(max_workers=max(1, len(pending))) as pool:
+        futures = [pool.submit(_fetch_segment, probe.url, partial_path, seg) for seg in pending]
+        not_done = set(futures)
+        while not_done:
+            _, not_done = wait(not_done, timeout=0.5)
+            save_state()
+            percent = int(sum(seg.done for seg in segments) * 100 / probe.size)
+            if percent >= next_percent:
+                update_cb(f"Downloading FFmpeg... {min(percent, 100)}%")
+                next_percent = (percent // 5 + 1) * 5
+        for future in futures:
+            future.result()
+
+
+def _load_partial_state(state_path: Path) -> dict[str, object] | None:
+    try:
+        data = json.loads(state_path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    return data if isinstance(data, dict) else None
+
+
+def _save_partial_state(state_path: Path, state: dict[str, object]) -> None:
+    tmp_path = state_path.with_name(f"{state_path.name}.tmp")
+    try:
+        tmp_path.write_text(json.dumps(state), encoding="utf-8")
+        os.replace(tmp_path, state_path)
+    except OSError:
+        pass
+
+
+def _download_archive(
+    target_path: Path,
+    update_cb: UpdateCallback,
+    *,
+    urls: list[str] | None = None,
+    expected_sha256: str | None = None,
+) -> None:
+    """
+    Download the FFmpeg archive into `target_path`.
+
+    All mirrors are probed concurrently and tried fastest first. Mirrors that honour
+    Range requests are fetched in parallel segments; others stream with resume support.
+    The result is verified against the expected or published SHA-256 when there is one,
+    and its hash is recorded next to the archive, so a later call with a matching
+    archive already on disk skips the network.
+    """
+    if is_verified_archive(target_path):
+        update_cb("Using cached FFmpeg archive (matches its recorded SHA-256).")
+        return
+
+    target_path.parent.mkdir(parents=True, exist_ok=True)
+    candidates = list(urls or FFMPEG_DOWNLOAD_URLS)
+    probes = rank_mirrors(candidates, update_cb)
+    probed_urls = {probe.url for probe in probes}
+    # Unreachable mirrors stay last in line in case the probe itself was the problem.
+    attempts: list[MirrorProbe] = probes + [
+        MirrorProbe(url=url, latency=float("inf"), size=0, accepts_ranges=False)
+        for url in candidates
+        if url not in probed_urls
+    ]
+
+    partial_path = _partial_path(target_path)
+    state_path = _partial_state_path(target_path)
+    last_error: Exception | None = None
+    for probe in attempts:
+        url = probe.url
+        host = urllib.parse.urlparse(url).netloc
+        try:
+            published = _fetch_published_sha256(url) if not expected_sha256 else None
+            update_cb(f"Downloading FFmpeg from {host}...")
+            if probe.accepts_ranges:
+                _download_segmented(probe, partial_path, state_path, update_cb)
+            else:
+                state = _load_partial_state(state_path)
+                if not state or state.get("url") != url or state.get("segments") is not None:
+                    partial_path.unlink(missing_ok=True)
+                    _save_partial_state(state_path, {"url": url, "size": probe.size, "segments": None})
+                _download_to_partial(url, partial_path, update_cb)
+
+            expected = (expected_sha256 or published or "").lower()
+            if expected:
+                update_cb("Verifying FFmpeg download...")
+            actual = file_sha256(partial_path)
+            if expected and actual != expected:
+                partial_path.unlink(missing_ok=True)
+                state_path.unlink(missing_ok=True)
+                raise RuntimeError(f"SHA-256 mismatch (expected {expected}, got {actual}).")
+            if not expected:
+                update_cb(f"No published checksum found on {host}; download unverified, hash recorded.")
+
+            os.replace(partial_path, target_path)
+            _checksum_path(target_path).write_text(f"{actual}  {target_path.name}\n", encoding="utf-8")
+            state_path.unlink(missing_ok=True)
             update_cb("Download complete.")
             return
         except Exception as exc:
@@ -109,18 +720,209 @@ def _download_archive(target_path: Path, update_cb: UpdateCallback) -> None:
     raise RuntimeError(f"Failed to download FFmpeg: {last_error}")
 
 
-def _safe_extract_zip(zip_path: Path, output_dir: Path) -> None:
-    if output_dir.exists():
-        shutil.rmtree(output_dir, ignore_errors=True)
+def _select_runtime_members(zf: zipfile.ZipFile) -> list[zipfile.ZipInfo]:
+    """
+    Pick ffmpeg.exe, ffprobe.exe and their sibling DLLs from the central directory
+    without touching any other member (docs, presets, ffplay).
+    """
+    by_dir: dict[str, dict[str, zipfile.ZipInfo]] = {}
+    for info in zf.infolist():
+        if info.is_dir():
+            continue
+        parent, _, name = info.filename.rpartition("/")
+        by_dir.setdefault(parent, {})[name.lower()] = info
+    for members in by_dir.values():
+        if all(name in members for name in _RUNTIME_BINARIES):
+            return [
+                info
+                for name, info in members.items()
+                if name in _RUNTIME_BINARIES or name.endswith(".dll")
+            ]
+    raise RuntimeError("Downloaded archive does not contain ffmpeg.exe and ffprobe.exe.")
+
+
+def _extract_runtime_members(zip_path: Path, output_dir: Path) -> None:
+    """Stream only the runtime binaries from `zip_path` flat into `output_dir`."""
     output_dir.mkdir(parents=True, exist_ok=True)
-
     with zipfile.ZipFile(zip_path, "r") as zf:
         out_root = output_dir.resolve()
-        for member in zf.infolist():
-            target = (output_dir / member.filename).resolve()
-            if not str(target).startswith(str(out_root)):
+        members = _select_runtime_members(zf)
+        for member in members:
+            target = (output_dir / member.filename.rpartition("/")[2]).resolve()
+            if target.parent != out_root:
                 raise RuntimeError("Unsafe archive path detected while extracting FFmpeg.")
-        zf.extractall(output_dir)
+        for member in members:
+            target = output_dir / member.filename.rpartition("/")[2]
+            with zf.open(member) as src, open(target, "wb") as dst:
+                shutil.copyfileobj(src, dst, _CHUNK_SIZE)
+            unix_mode = (member.external_attr >> 16) & 0o777
+            if unix_mode:
+                os.chmod(target, unix_mode)
+
+
+def _read_current_version(root: Path) -> Path | None:
+    try:
+        name = (root / CURRENT_VERSION_POINTER).read_text(encoding="utf-8").strip()
+    except OSError:
+        return None
+    return root / "versions" / name if name else None
+
+
+def _write_current_version(root: Path, install_dir: Path) -> None:
+    pointer = root / CURRENT_VERSION_POINTER
+    tmp_path = pointer.with_name(f"{pointer.name}.{os.getpid()}.tmp")
+    tmp_path.write_text(install_dir.name, encoding="utf-8")
+    os.replace(tmp_path, pointer)
+
+
+def find_cached_ffmpeg_pair(root: Path) -> tuple[Path | None, Path | None]:
+    """Resolve the cached runtime from the version pointer, falling back to the legacy `current` tree."""
+    install_dir = _read_current_version(root)
+    if install_dir is not None:
+        ffmpeg_path = install_dir / "ffmpeg.exe"
+        ffprobe_path = install_dir / "ffprobe.exe"
+        if validate_ffmpeg_pair(ffmpeg_path, ffprobe_path, cache_root=root):
+            return ffmpeg_path, ffprobe_path
+    return find_ffmpeg_pair_in_tree(root / "current", cache_root=root)
+
+
+@contextmanager
+def install_lock(root: Path, update_cb: UpdateCallback | None = None, *, timeout: float = _LOCK_TIMEOUT):
+    """Hold an exclusive inter-process lock on `root/install.lock` while installing."""
+    root.mkdir(parents=True, exist_ok=True)
+    with _file_lock(root / INSTALL_LOCK_NAME, update_cb, timeout=timeout, purpose="installing FFmpeg"):
+        yield
+
+
+@contextmanager
+def _file_lock(lock_path: Path, update_cb: UpdateCallback | None, *, timeout: float, purpose: str):
+    """
+    Hold an exclusive inter-process lock on `lock_path`.
+    Uses msvcrt on Windows and fcntl elsewhere; waits up to `timeout` seconds.
+    """
+    cb = update_cb or _noop
+    lock_file = open(lock_path, "a+b")
+    deadline = time.monotonic() + timeout
+    announced = False
+    try:
+        while True:
+            try:
+                if os.name == "nt":
+                    import msvcrt
+
+                    lock_file.seek(0)
+                    msvcrt.locking(lock_file.fileno(), msvcrt.LK_NBLCK, 1)  # type: ignore[attr-defined]
+                else:
+                    import fcntl
+
+                    fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)  # type: ignore[attr-defined]
+                break
+            except OSError:
+                if time.monotonic() >= deadline:
+                    raise RuntimeError(f"Timed out waiting for another process to finish {purpose}.")
+                if not announced:
+                    cb(f"Waiting for another process to finish {purpose}...")
+                    announced = True
+                time.sleep(0.25)
+        yield
+    finally:
+        try:
+            if os.name == "nt":
+                import msvcrt
+
+                lock_file.seek(0)
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)  # type: ignore[attr-defined]
+            else:
+                import fcntl
+
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)  # type: ignore[attr-defined]
+        except OSError:
+            pass
+        lock_file.close()
+
+
+def _install_version(archive_path: Path, install_dir: Path, update_cb: UpdateCallback) -> None:
+    """Extract into a private staging directory, then rename it into place."""
+    update_cb("Extracting FFmpeg...")
+    staging_dir = install_dir.with_name(f"{install_dir.name}.staging-{os.getpid()}")
+    shutil.rmtree(staging_dir, ignore_errors=True)
+    _extract_runtime_members(archive_path, staging_dir)
+    if install_dir.exists():
+        # A damaged copy of the same version; move it aside rather than deleting in place.
+        trash_dir = install_dir.with_name(f"{install_dir.name}.trash-{os.getpid()}")
+        os.replace(install_dir, trash_dir)
+        shutil.rmtree(trash_dir, ignore_errors=True)
+    os.replace(staging_dir, install_dir)
+
+
+def collect_old_versions(root: Path, *, keep: int = _KEEP_VERSIONS) -> None:
+    """
+    Remove runtime versions other than the current one and the `keep - 1` most
+    recent, plus staging/trash leftovers and the legacy single-install layout.
+    Callers must hold `install_lock`.
+    """
+    versions_dir = root / "versions"
+    current = _read_current_version(root)
+    if current is None or not current.is_dir():
+        return
+    pinned_ffmpeg, _ = _read_pin(root)
+    now = time.time()
+    installed: list[Path] = []
+    for entry in versions_dir.iterdir() if versions_dir.is_dir() else []:
+        if not entry.is_dir() or entry == current:
+            continue
+        if pinned_ffmpeg is not None and pinned_ffmpeg.is_relative_to(entry.resolve()):
+            # Kept for as long as `runtime-bench --pin` points into it.
+            continue
+        if ".staging-" in entry.name or ".trash-" in entry.name:
+            if now - entry.stat().st_mtime > _STALE_SECONDS:
+                shutil.rmtree(entry, ignore_errors=True)
+            continue
+        installed.append(entry)
+    installed.sort(key=lambda entry: entry.stat().st_mtime, reverse=True)
+    for entry in installed[max(0, keep - 1):]:
+        shutil.rmtree(entry, ignore_errors=True)
+    for legacy in (root / "current", root / "extract-tmp"):
+        if legacy.is_dir():
+            shutil.rmtree(legacy, ignore_errors=True)
+
+
+def pin_runtime(ffmpeg_path: Path, ffprobe_path: Path, *, cache_root: Path | None = None) -> None:
+    """Prefer this ffmpeg/ffprobe pair over every other source in `ensure_ffmpeg_runtime`."""
+    pin_path = (cache_root or default_cache_root()) / PINNED_RUNTIME_NAME
+    tmp_path = pin_path.with_name(f"{pin_path.name}.{os.getpid()}.tmp")
+    payload = {"ffmpeg": str(ffmpeg_path.resolve()), "ffprobe": str(ffprobe_path.resolve())}
+    tmp_path.write_text(json.dumps(payload, indent=2), encoding="utf-8")
+    os.replace(tmp_path, pin_path)
+
+
+def unpin_runtime(*, cache_root: Path | None = None) -> None:
+    try:
+        ((cache_root or default_cache_root()) / PINNED_RUNTIME_NAME).unlink(missing_ok=True)
+    except OSError:
+        pass
+
+
+def _read_pin(root: Path) -> tuple[Path | None, Path | None]:
+    """The pinned pair as recorded, without validating it; (None, None) when nothing is pinned."""
+    try:
+        data = json.loads((root / PINNED_RUNTIME_NAME).read_text(encoding="utf-8"))
+        return Path(data["ffmpeg"]), Path(data["ffprobe"])
+    except (OSError, ValueError, KeyError, TypeError):
+        return None, None
+
+
+def read_pinned_runtime(
+    *, cache_root: Path | None = None, update_cb: UpdateCallback | None = None
+) -> tuple[Path | None, Path | None]:
+    root = cache_root or default_cache_root()
+    ffmpeg_path, ffprobe_path = _read_pin(root)
+    if ffmpeg_path is None or ffprobe_path is None:
+        return None, None
+    if validate_ffmpeg_pair(ffmpeg_path, ffprobe_path, cache_root=root):
+        return ffmpeg_path, ffprobe_path
+    (update_cb or _noop)(f"Warning: pinned FFmpeg runtime {ffmpeg_path} no longer validates; ignoring the pin.")
+    return None, None
 
 
 def _noop(_: str) -> None:
@@ -136,63 +938,66 @@ def ensure_ffmpeg_runtime(
 ) -> tuple[str, str, str]:
     """
     Resolve ffmpeg/ffprobe paths and source:
+    - "pinned": pair chosen with `pin_runtime` (e.g. by `runtime-bench --pin`)
     - "system": from PATH
     - "bundled": from base_dir/bin
     - "cached": from previous download cache
     - "downloaded": freshly downloaded
+
+    Validation results are remembered in the cache root manifest, so resolving
+    an unchanged runtime does not spawn any subprocess.
     """
     cb = update_cb or _noop
     root = cache_root or default_cache_root()
 
     if not force_download:
+        pinned_ffmpeg, pinned_ffprobe = read_pinned_runtime(cache_root=root, update_cb=cb)
+        if pinned_ffmpeg and pinned_ffprobe:
+            return str(pinned_ffmpeg), str(pinned_ffprobe), "pinned"
+
         cb("Checking system FFmpeg installation...")
-        system_ffmpeg, system_ffprobe = resolve_system_ffmpeg_pair()
+        system_ffmpeg, system_ffprobe = resolve_system_ffmpeg_pair(cache_root=root)
         if system_ffmpeg and system_ffprobe:
             return str(system_ffmpeg), str(system_ffprobe), "system"
 
         cb("Checking bundled FFmpeg runtime...")
         bundled_ffmpeg = base_dir / "bin" / "ffmpeg.exe"
         bundled_ffprobe = base_dir / "bin" / "ffprobe.exe"
-        if validate_ffmpeg_pair(bundled_ffmpeg, bundled_ffprobe):
+        if validate_ffmpeg_pair(bundled_ffmpeg, bundled_ffprobe, cache_root=root):
             return str(bundled_ffmpeg), str(bundled_ffprobe), "bundled"
 
         cb("Checking cached FFmpeg runtime...")
-        cached_root = root / "current"
-        cached_ffmpeg, cached_ffprobe = find_ffmpeg_pair_in_tree(cached_root)
+        cached_ffmpeg, cached_ffprobe = find_cached_ffmpeg_pair(root)
         if cached_ffmpeg and cached_ffprobe:
             return str(cached_ffmpeg), str(cached_ffprobe), "cached"
 
     cb("FFmpeg not found. Starting first-run download...")
     archive_path = root / "ffmpeg-runtime.zip"
-    extract_tmp = root / "extract-tmp"
-    install_root = root / "current"
 
-    _download_archive(archive_path, cb)
-    cb("Extracting FFmpeg...")
-    _safe_extract_zip(archive_path, extract_tmp)
-
-    extracted_ffmpeg, extracted_ffprobe = find_ffmpeg_pair_in_tree(extract_tmp)
-    if not extracted_ffmpeg or not extracted_ffprobe:
-        raise RuntimeError("Downloaded archive does not contain ffmpeg.exe and ffprobe.exe.")
-
-    if install_root.exists():
-        shutil.rmtree(install_root, ignore_errors=True)
-    install_root.mkdir(parents=True, exist_ok=True)
-
-    source_dir = extracted_ffmpeg.parent
-    target_dir = install_root / "bin"
-    shutil.copytree(source_dir, target_dir, dirs_exist_ok=True)
-
-    final_ffmpeg = target_dir / "ffmpeg.exe"
-    final_ffprobe = target_dir / "ffprobe.exe"
-    if not validate_ffmpeg_pair(final_ffmpeg, final_ffprobe):
-        raise RuntimeError("FFmpeg validation failed after extraction.")
-
-    shutil.rmtree(extract_tmp, ignore_errors=True)
-    try:
-        archive_path.unlink(missing_ok=True)
-    except Exception:
-        pass
+    with install_lock(root, cb):
+        if not force_download:
+            # Another process may have finished the install while we waited.
+            cached_ffmpeg, cached_ffprobe = find_cached_ffmpeg_pair(root)
+            if cached_ffmpeg and cached_ffprobe:
+                cb("FFmpeg runtime installed by another process.")
+                return str(cached_ffmpeg), str(cached_ffprobe), "cached"
+        else:
+            discard_archive(archive_path)
+        _download_archive(archive_path, cb)
+
+        digest = recorded_sha256(archive_path) or file_sha256(archive_path)
+        install_dir = root / "versions" / digest[:16]
+        final_ffmpeg = install_dir / "ffmpeg.exe"
+        final_ffprobe = install_dir / "ffprobe.exe"
+        if not validate_ffmpeg_pair(final_ffmpeg, final_ffprobe, cache_root=root):
+            _install_version(archive_path, install_dir, cb)
+            if not validate_ffmpeg_pair(final_ffmpeg, final_ffprobe, cache_root=root):
+                raise RuntimeError("FFmpeg validation failed after extraction.")
+
+        # The verified archive is kept so a damaged install can be rebuilt offline.
+        _write_current_version(root, install_dir)
+        os.utime(install_dir)
+        collect_old_versions(root)
 
     cb("FFmpeg setup complete.")
     return str(final_ffmpeg), str(final_ffprobe), "downloaded"
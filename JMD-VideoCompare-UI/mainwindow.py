@@ -3,11 +3,9 @@ import sys
 import subprocess
 import re
 import os
+import json
+import tempfile
 from pathlib import Path
-import shutil
-import zipfile
-import urllib.request
-import urllib.parse
 try:
     import winreg
 except ImportError:  # non-Windows
@@ -22,8 +20,9 @@ sys.path.insert(0, str(_BASE_DIR))
 from PyQt6.QtWidgets import (
     QApplication, QMainWindow, QFileDialog, QMessageBox, QSplashScreen,
     QWidget, QVBoxLayout, QHBoxLayout, QGridLayout,
-    QLabel, QLineEdit, QCheckBox, QSpinBox,
-    QFrame, QPlainTextEdit, QDockWidget, QProgressBar
+    QLabel, QLineEdit, QCheckBox, QSpinBox, QDoubleSpinBox,
+    QFrame, QPlainTextEdit, QDockWidget, QProgressBar,
+    QDialog, QDialogButtonBox, QRubberBand
 )
 from PyQt6.QtGui import (
     QTextCursor,
@@ -40,14 +39,41 @@ from PyQt6.QtGui import (
     QPainterPath,
     QFontMetrics,
 )
-from PyQt6.QtCore import Qt, QThread, pyqtSignal, QUrl, QSize, QTimer, QSettings
+from PyQt6.QtCore import Qt, QThread, pyqtSignal, QUrl, QSize, QTimer, QSettings, QPoint, QRect
 import logging
 
 from theme import apply_theme
 from theme import stylesheet as theme_stylesheet
 from theme.tokens import Tokens
 from app_info import APP_NAME, SPLASH_SUBTITLE, version_label, window_title
-from ffmpeg_runtime import default_cache_root
+from compare_command import CompareJob, build_compare_command, build_grid_command, build_still_command, output_seconds
+from compare_graph import (
+    GRID_MAX_INPUTS,
+    LAYOUT_CHOICES,
+    ANIMATED_FPS,
+    ANIMATED_TYPES,
+    ANIMATED_WIDTH,
+    SAMPLE_MODES,
+    SCALERS,
+    SLIDESHOW_FPS,
+    TextLabel,
+    animated_codec_args,
+    parse_roi,
+    parse_time,
+    required_filters,
+)
+from ffmpeg_runtime import ensure_ffmpeg_runtime, probe_capabilities, validate_ffmpeg_pair
+from media_probe import probe_media
+from preflight import (
+    AUDIO_AUTO,
+    AUDIO_COPY,
+    PreflightInput,
+    PreflightJob,
+    PreflightReport,
+    audio_encoder,
+    resolve_audio_codec,
+    run_preflight,
+)
 from components import (
     primary_button,
     secondary_button,
@@ -82,12 +108,6 @@ _FONT_STYLE_WORDS = (
     "narrow",
 )
 
-_FFMPEG_DOWNLOAD_URLS = [
-    "https://www.gyan.dev/ffmpeg/builds/ffmpeg-release-essentials.zip",
-    "https://github.com/BtbN/FFmpeg-Builds/releases/download/latest/ffmpeg-master-latest-win64-gpl.zip",
-]
-
-
 def _strip_style_words(font_name: str) -> str:
     """Remove trailing style words from a registry font display name."""
     words = font_name.strip().split()
@@ -164,167 +184,16 @@ class FontScanner(QThread):
 
 
 def _parse_time_to_seconds(time_str: str) -> float:
-    """Parse HH:MM:SS or HH:MM:SS.ms to seconds."""
-    m = re.match(r"(\d+):(\d+):(\d+)(?:\.(\d+))?", time_str.strip())
-    if not m:
-        return 0.0
-    h, mm, s = int(m.group(1)), int(m.group(2)), int(m.group(3))
-    ms = int(m.group(4)) if m.group(4) else 0
-    return h * 3600 + mm * 60 + s + ms / 100.0
-
-
-def _ffmpeg_cache_root() -> Path:
-    return default_cache_root()
-
-
-def _validate_exe(exe_path: Path) -> bool:
-    if not exe_path.exists() or not exe_path.is_file():
-        return False
+    """Parse seconds, MM:SS or HH:MM:SS[.frac] to seconds; 0 when invalid."""
     try:
-        result = subprocess.run(
-            [str(exe_path), "-version"],
-            stdout=subprocess.PIPE,
-            stderr=subprocess.STDOUT,
-            text=True,
-            timeout=8,
-        )
-        return result.returncode == 0
-    except Exception:
-        return False
-
-
-def _validate_ffmpeg_pair(ffmpeg_path: Path, ffprobe_path: Path) -> bool:
-    return _validate_exe(ffmpeg_path) and _validate_exe(ffprobe_path)
-
-
-def _find_ffmpeg_pair_in_tree(root: Path) -> tuple[Path | None, Path | None]:
-    if not root.exists():
-        return None, None
-    for ffmpeg_path in root.rglob("ffmpeg.exe"):
-        ffprobe_path = ffmpeg_path.with_name("ffprobe.exe")
-        if ffprobe_path.exists() and _validate_ffmpeg_pair(ffmpeg_path, ffprobe_path):
-            return ffmpeg_path, ffprobe_path
-    return None, None
-
-
-def _resolve_system_ffmpeg_pair() -> tuple[Path | None, Path | None]:
-    ffmpeg_path = shutil.which("ffmpeg")
-    ffprobe_path = shutil.which("ffprobe")
-    if ffmpeg_path and not ffprobe_path:
-        sibling = Path(ffmpeg_path).with_name("ffprobe.exe")
-        if sibling.exists():
-            ffprobe_path = str(sibling)
-    if not ffmpeg_path or not ffprobe_path:
-        return None, None
-    ffmpeg = Path(ffmpeg_path)
-    ffprobe = Path(ffprobe_path)
-    if _validate_ffmpeg_pair(ffmpeg, ffprobe):
-        return ffmpeg, ffprobe
-    return None, None
-
-
-def _download_ffmpeg_archive(target_path: Path, update_cb) -> None:
-    last_error = None
-    for url in _FFMPEG_DOWNLOAD_URLS:
-        try:
-            host = urllib.parse.urlparse(url).netloc
-            update_cb(f"Downloading FFmpeg from {host}...")
-            request = urllib.request.Request(url, headers={"User-Agent": "JMD-VideoCompare-UI"})
-            with urllib.request.urlopen(request, timeout=45) as response, open(target_path, "wb") as out_file:
-                total_str = response.headers.get("Content-Length")
-                total = int(total_str) if total_str and total_str.isdigit() else 0
-                downloaded = 0
-                next_percent = 5
-                while True:
-                    chunk = response.read(1024 * 256)
-                    if not chunk:
-                        break
-                    out_file.write(chunk)
-                    downloaded += len(chunk)
-                    if total > 0:
-                        percent = int((downloaded * 100) / total)
-                        if percent >= next_percent:
-                            update_cb(f"Downloading FFmpeg... {min(percent, 100)}%")
-                            next_percent += 5
-            update_cb("Download complete.")
-            return
-        except Exception as e:
-            last_error = e
-            update_cb(f"Download failed from {host}, trying fallback...")
-            continue
-    raise RuntimeError(f"Failed to download FFmpeg: {last_error}")
-
-
-def _safe_extract_zip(zip_path: Path, output_dir: Path) -> None:
-    if output_dir.exists():
-        shutil.rmtree(output_dir, ignore_errors=True)
-    output_dir.mkdir(parents=True, exist_ok=True)
-
-    with zipfile.ZipFile(zip_path, "r") as zf:
-        for member in zf.infolist():
-            member_target = (output_dir / member.filename).resolve()
-            if not str(member_target).startswith(str(output_dir.resolve())):
-                raise RuntimeError("Unsafe archive path detected while extracting FFmpeg.")
-        zf.extractall(output_dir)
+        return parse_time(time_str)
+    except RuntimeError:
+        return 0.0
 
 
 def _ensure_ffmpeg_runtime(base_dir: Path, update_cb) -> tuple[str, str, str]:
-    # Prefer user/system install to avoid unnecessary downloads.
-    update_cb("Checking system FFmpeg installation...")
-    system_ffmpeg, system_ffprobe = _resolve_system_ffmpeg_pair()
-    if system_ffmpeg and system_ffprobe:
-        return str(system_ffmpeg), str(system_ffprobe), "system"
-
-    # Bundled binaries (if present in dev/build environment).
-    update_cb("Checking bundled FFmpeg runtime...")
-    bundled_ffmpeg = base_dir / "bin" / "ffmpeg.exe"
-    bundled_ffprobe = base_dir / "bin" / "ffprobe.exe"
-    if _validate_ffmpeg_pair(bundled_ffmpeg, bundled_ffprobe):
-        return str(bundled_ffmpeg), str(bundled_ffprobe), "bundled"
-
-    # Cached runtime from previous downloads.
-    update_cb("Checking cached FFmpeg runtime...")
-    cache_root = _ffmpeg_cache_root()
-    cached_root = cache_root / "current"
-    cached_ffmpeg, cached_ffprobe = _find_ffmpeg_pair_in_tree(cached_root)
-    if cached_ffmpeg and cached_ffprobe:
-        return str(cached_ffmpeg), str(cached_ffprobe), "cached"
-
-    # Download + extract runtime.
-    update_cb("FFmpeg not found. Starting first-run download...")
-    archive_path = cache_root / "ffmpeg-runtime.zip"
-    extract_tmp = cache_root / "extract-tmp"
-    install_root = cache_root / "current"
-
-    _download_ffmpeg_archive(archive_path, update_cb)
-    update_cb("Extracting FFmpeg...")
-    _safe_extract_zip(archive_path, extract_tmp)
-
-    extracted_ffmpeg, extracted_ffprobe = _find_ffmpeg_pair_in_tree(extract_tmp)
-    if not extracted_ffmpeg or not extracted_ffprobe:
-        raise RuntimeError("Downloaded FFmpeg archive does not contain ffmpeg.exe and ffprobe.exe.")
-
-    if install_root.exists():
-        shutil.rmtree(install_root, ignore_errors=True)
-    install_root.mkdir(parents=True, exist_ok=True)
-
-    source_dir = extracted_ffmpeg.parent
-    target_dir = install_root / "bin"
-    shutil.copytree(source_dir, target_dir, dirs_exist_ok=True)
-
-    final_ffmpeg = target_dir / "ffmpeg.exe"
-    final_ffprobe = target_dir / "ffprobe.exe"
-    if not _validate_ffmpeg_pair(final_ffmpeg, final_ffprobe):
-        raise RuntimeError("Downloaded FFmpeg runtime failed validation after extraction.")
-
-    shutil.rmtree(extract_tmp, ignore_errors=True)
-    try:
-        archive_path.unlink(missing_ok=True)
-    except Exception:
-        pass
-
-    update_cb("FFmpeg setup complete.")
-    return str(final_ffmpeg), str(final_ffprobe), "downloaded"
+    # Shared resolver: system PATH, bundled bin, cached runtime, then download.
+    return ensure_ffmpeg_runtime(base_dir, update_cb)
 
 
 def _detect_system_theme_mode(app: QApplication) -> str:
@@ -450,6 +319,7 @@ def _build_splash_pixmap(base_dir: Path) -> QPixmap:
 class StartupThread(QThread):
     update_signal = pyqtSignal(str)
     ready_signal = pyqtSignal(str, str, str)  # ffmpeg, ffprobe, source
+    capabilities_signal = pyqtSignal(object)  # FFmpegCapabilities
     error_signal = pyqtSignal(str)
 
     def __init__(self, base_dir: Path):
@@ -462,11 +332,32 @@ class StartupThread(QThread):
     def run(self):
         try:
             ffmpeg_path, ffprobe_path, source = _ensure_ffmpeg_runtime(self.base_dir, self._emit_update)
+            try:
+                self._emit_update("Checking FFmpeg capabilities...")
+                self.capabilities_signal.emit(probe_capabilities(Path(ffmpeg_path)))
+            except Exception as e:
+                logging.warning(f"FFmpeg capability probe failed: {e}")
             self.ready_signal.emit(ffmpeg_path, ffprobe_path, source)
         except Exception as e:
             self.error_signal.emit(str(e))
 
 
+class PreflightThread(QThread):
+    report_signal = pyqtSignal(object)  # PreflightReport
+    error_signal = pyqtSignal(str)
+
+    def __init__(self, ffprobe_path: str, job: PreflightJob):
+        super().__init__()
+        self.ffprobe_path = ffprobe_path
+        self.job = job
+
+    def run(self):
+        try:
+            self.report_signal.emit(run_preflight(self.ffprobe_path, self.job))
+        except Exception as e:
+            self.error_signal.emit(str(e))
+
+
 class FFmpegThread(QThread):
     update_signal = pyqtSignal(str)
     progress_signal = pyqtSignal(int, str)  # percent 0-100, status text
@@ -510,6 +401,117 @@ class FFmpegThread(QThread):
             self.progress_signal.emit(0, str(e))
 
 
+class RoiSelectorLabel(QLabel):
+    """Frame preview with a rubber-band selection."""
+
+    def __init__(self, pixmap: QPixmap, parent=None):
+        super().__init__(parent)
+        self.setPixmap(pixmap)
+        self.setFixedSize(pixmap.size())
+        self.setCursor(QCursor(Qt.CursorShape.CrossCursor))
+        self._rubber_band = QRubberBand(QRubberBand.Shape.Rectangle, self)
+        self._origin = QPoint()
+        self.selection = QRect()
+
+    def mousePressEvent(self, event):
+        self._origin = event.position().toPoint()
+        self._rubber_band.setGeometry(QRect(self._origin, QSize()))
+        self._rubber_band.show()
+
+    def mouseMoveEvent(self, event):
+        rect = QRect(self._origin, event.position().toPoint()).normalized()
+        self._rubber_band.setGeometry(rect.intersected(self.rect()))
+
+    def mouseReleaseEvent(self, event):
+        self.selection = self._rubber_band.geometry()
+
+
+class RoiSelectorDialog(QDialog):
+    MAX_PREVIEW = QSize(960, 540)
+
+    def __init__(self, frame_path: str, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Select Region of Interest")
+        frame = QPixmap(frame_path)
+        self._frame_size = frame.size()
+        preview = frame
+        if frame.width() > self.MAX_PREVIEW.width() or frame.height() > self.MAX_PREVIEW.height():
+            preview = frame.scaled(
+                self.MAX_PREVIEW,
+                Qt.AspectRatioMode.KeepAspectRatio,
+                Qt.TransformationMode.SmoothTransformation,
+            )
+        self._scale = frame.width() / preview.width() if preview.width() else 1.0
+
+        layout = QVBoxLayout(self)
+        layout.addWidget(QLabel("Drag a rectangle over Video 1 to choose the region to compare."))
+        self._selector = RoiSelectorLabel(preview, self)
+        layout.addWidget(self._selector)
+        buttons = QDialogButtonBox(QDialogButtonBox.StandardButton.Ok | QDialogButtonBox.StandardButton.Cancel)
+        buttons.accepted.connect(self.accept)
+        buttons.rejected.connect(self.reject)
+        layout.addWidget(buttons)
+
+    def roi_text(self) -> str:
+        rect = self._selector.selection
+        if rect.width() < 2 or rect.height() < 2:
+            return ""
+        x = int(rect.x() * self._scale)
+        y = int(rect.y() * self._scale)
+        w = min(int(rect.width() * self._scale), self._frame_size.width() - x)
+        h = min(int(rect.height() * self._scale), self._frame_size.height() - y)
+        return f"{x}:{y}:{w}:{h}"
+
+
+class ExtraVideoRow(QWidget):
+    """One additional grid input: path, label and start time."""
+
+    changed = pyqtSignal()
+    remove_requested = pyqtSignal(object)
+
+    def __init__(self, browse_start, parent=None):
+        super().__init__(parent)
+        self._browse_start = browse_start
+        layout = QHBoxLayout(self)
+        layout.setSpacing(Tokens.SPACE_2)
+        layout.setContentsMargins(0, 0, 0, 0)
+        self.lineEditPath = QLineEdit()
+        self.lineEditPath.setPlaceholderText("Video path")
+        layout.addWidget(self.lineEditPath, 3)
+        self.pushButtonBrowse = secondary_button("Browse", parent=self)
+        layout.addWidget(self.pushButtonBrowse)
+        self.lineEditLabel = QLineEdit()
+        self.lineEditLabel.setPlaceholderText("Label (file name)")
+        layout.addWidget(self.lineEditLabel, 2)
+        self.lineEditStartTime = QLineEdit("00:00:00")
+        self.lineEditStartTime.setAlignment(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignTrailing | Qt.AlignmentFlag.AlignVCenter)
+        self.lineEditStartTime.setMaximumWidth(90)
+        layout.addWidget(self.lineEditStartTime)
+        self.pushButtonRemove = ghost_button("Remove", parent=self)
+        layout.addWidget(self.pushButtonRemove)
+
+        self.pushButtonBrowse.clicked.connect(self._browse)
+        self.pushButtonRemove.clicked.connect(lambda: self.remove_requested.emit(self))
+        for edit in (self.lineEditPath, self.lineEditLabel, self.lineEditStartTime):
+            edit.textChanged.connect(self.changed)
+
+    def _browse(self):
+        file_name, _ = QFileDialog.getOpenFileName(self, "Select Video", self._browse_start(self.lineEditPath.text()))
+        if file_name:
+            self.lineEditPath.setText(file_name)
+
+    def label_text(self) -> str:
+        return self.lineEditLabel.text() or Path(self.lineEditPath.text()).stem
+
+    def to_dict(self) -> dict[str, str]:
+        return {"path": self.lineEditPath.text(), "label": self.lineEditLabel.text(), "start": self.lineEditStartTime.text()}
+
+    def load(self, data: dict) -> None:
+        self.lineEditPath.setText(str(data.get("path", "")))
+        self.lineEditLabel.setText(str(data.get("label", "")))
+        self.lineEditStartTime.setText(str(data.get("start", "00:00:00")))
+
+
 class MainWindow(QMainWindow):
     def __init__(self, parent=None, initial_theme_mode: str | None = None):
         super().__init__(parent)
@@ -519,6 +521,9 @@ class MainWindow(QMainWindow):
         self.ffmpeg_exe_path = str(_BASE_DIR / "bin" / "ffmpeg.exe")
         self.ffprobe_exe_path = str(_BASE_DIR / "bin" / "ffprobe.exe")
         self.font_cache = {}
+        self.ffmpeg_capabilities = None
+        self._filter_script_path: str | None = None
+        self.preflight_thread: PreflightThread | None = None
         self._build_ui()
         self._connect_signals()
         self.populate_codec_comboboxes()
@@ -568,6 +573,21 @@ class MainWindow(QMainWindow):
         video_layout.addLayout(self._build_video_section("Video 2 (right side)", is_video1=False))
         main_layout.addLayout(video_layout)
 
+        # Additional inputs turn the compare into an N-way grid.
+        extra_layout = QVBoxLayout()
+        extra_layout.setSpacing(Tokens.SPACE_2)
+        extra_header = QHBoxLayout()
+        extra_header.addWidget(SectionHeader("More videos (grid)", level="h2"))
+        extra_header.addStretch()
+        self.pushButtonAddVideo = secondary_button("Add Video", parent=self)
+        extra_header.addWidget(self.pushButtonAddVideo)
+        extra_layout.addLayout(extra_header)
+        self.extraVideosLayout = QVBoxLayout()
+        self.extraVideosLayout.setSpacing(Tokens.SPACE_2)
+        extra_layout.addLayout(self.extraVideosLayout)
+        self.extra_video_rows: list[ExtraVideoRow] = []
+        main_layout.addLayout(extra_layout)
+
         main_layout.addWidget(self._make_hline())
 
         # Output options - compact layout
@@ -622,6 +642,66 @@ class MainWindow(QMainWindow):
         self.checkBoxOutputAudioVideo2 = QCheckBox("Audio from Video 2")
         output_layout.addWidget(self.checkBoxOutputAudioVideo2, row, 6)
 
+        row += 1
+        self.checkBoxRoi = QCheckBox("Region of interest")
+        output_layout.addWidget(self.checkBoxRoi, row, 0)
+        self.lineEditRoi = QLineEdit()
+        self.lineEditRoi.setPlaceholderText("x:y:w:h")
+        self.lineEditRoi.setMaximumWidth(140)
+        output_layout.addWidget(self.lineEditRoi, row, 1, 1, 2)
+        self.pushButtonRoiSelect = secondary_button("Select...", parent=self)
+        output_layout.addWidget(self.pushButtonRoiSelect, row, 3)
+        output_layout.addWidget(QLabel("Zoom:"), row, 4)
+        self.spinBoxRoiZoom = QSpinBox()
+        self.spinBoxRoiZoom.setRange(1, 8)
+        self.spinBoxRoiZoom.setSuffix("x")
+        output_layout.addWidget(self.spinBoxRoiZoom, row, 5)
+
+        row += 1
+        output_layout.addWidget(QLabel("Layout:"), row, 0)
+        self.comboBoxLayout = AnimatedComboBox()
+        self.comboBoxLayout.addItems(LAYOUT_CHOICES)
+        self.comboBoxLayout.setMinimumWidth(120)
+        output_layout.addWidget(self.comboBoxLayout, row, 1, 1, 2)
+        output_layout.addWidget(QLabel("Split:"), row, 3)
+        self.spinBoxSplitRatio = QSpinBox()
+        self.spinBoxSplitRatio.setRange(5, 95)
+        self.spinBoxSplitRatio.setValue(50)
+        self.spinBoxSplitRatio.setSuffix("%")
+        output_layout.addWidget(self.spinBoxSplitRatio, row, 4)
+
+        row += 1
+        output_layout.addWidget(QLabel("Sampling:"), row, 0)
+        self.comboBoxSample = AnimatedComboBox()
+        self.comboBoxSample.addItems(["off", *SAMPLE_MODES])
+        self.comboBoxSample.setMinimumWidth(120)
+        output_layout.addWidget(self.comboBoxSample, row, 1, 1, 2)
+        output_layout.addWidget(QLabel("Every:"), row, 3)
+        self.spinBoxSampleInterval = QDoubleSpinBox()
+        self.spinBoxSampleInterval.setRange(0.1, 3600)
+        self.spinBoxSampleInterval.setDecimals(1)
+        self.spinBoxSampleInterval.setValue(10)
+        output_layout.addWidget(self.spinBoxSampleInterval, row, 4)
+        self.checkBoxSamplePng = QCheckBox("PNG frames")
+        output_layout.addWidget(self.checkBoxSamplePng, row, 5)
+
+        row += 1
+        output_layout.addWidget(QLabel("Max size:"), row, 0)
+        self.spinBoxMaxWidth = QSpinBox()
+        self.spinBoxMaxWidth.setRange(0, 7680)
+        self.spinBoxMaxWidth.setSpecialValueText("off")
+        self.spinBoxMaxWidth.setSuffix(" px")
+        output_layout.addWidget(self.spinBoxMaxWidth, row, 1)
+        self.spinBoxMaxHeight = QSpinBox()
+        self.spinBoxMaxHeight.setRange(0, 4320)
+        self.spinBoxMaxHeight.setSpecialValueText("off")
+        self.spinBoxMaxHeight.setSuffix(" px")
+        output_layout.addWidget(self.spinBoxMaxHeight, row, 2)
+        output_layout.addWidget(QLabel("Scaler:"), row, 3)
+        self.comboBoxScaler = AnimatedComboBox()
+        self.comboBoxScaler.addItems(["default", *SCALERS])
+        output_layout.addWidget(self.comboBoxScaler, row, 4)
+
         output_group.setLayout(output_layout)
         main_layout.addWidget(output_group)
 
@@ -643,7 +723,7 @@ class MainWindow(QMainWindow):
         file_layout.addWidget(self.pushButtonOutputVideoBrowse)
         file_layout.addWidget(QLabel("Video Type:"))
         self.comboBoxOutputVideoType = AnimatedComboBox()
-        self.comboBoxOutputVideoType.addItems(["mkv", "mp4", "avi", "mov", "flv", "wmv", "webm"])
+        self.comboBoxOutputVideoType.addItems(["mkv", "mp4", "avi", "mov", "flv", "wmv", "webm", *ANIMATED_TYPES])
         file_layout.addWidget(self.comboBoxOutputVideoType)
         main_layout.addLayout(file_layout)
 
@@ -765,6 +845,29 @@ class MainWindow(QMainWindow):
 
         return layout
 
+    def add_extra_video(self, data: dict | None = None) -> ExtraVideoRow | None:
+        if len(self.extra_video_rows) >= GRID_MAX_INPUTS - 2:
+            self.statusbar.showMessage(f"A grid holds at most {GRID_MAX_INPUTS} videos.")
+            return None
+        row = ExtraVideoRow(lambda current: self._dialog_start_path(current, "browse/video2_dir"), self)
+        if data:
+            row.load(data)
+        row.changed.connect(self._save_settings)
+        row.remove_requested.connect(self.remove_extra_video)
+        self._set_tooltip(row.lineEditPath, "Path to an additional video; any extra video switches the output to a grid.")
+        self._set_tooltip(row.lineEditLabel, "Label for this video (uses the Video 1 font, size, color and position).")
+        self._set_tooltip(row.lineEditStartTime, "Start time in this video (HH:MM:SS).")
+        self.extraVideosLayout.addWidget(row)
+        self.extra_video_rows.append(row)
+        self._save_settings()
+        return row
+
+    def remove_extra_video(self, row: ExtraVideoRow) -> None:
+        self.extra_video_rows.remove(row)
+        self.extraVideosLayout.removeWidget(row)
+        row.deleteLater()
+        self._save_settings()
+
     def _make_hline(self):
         line = QFrame()
         line.setProperty("role", "divider-h")
@@ -803,6 +906,8 @@ class MainWindow(QMainWindow):
         self.pushButtonVideo1Browse.clicked.connect(self.browse_video1)
         self.pushButtonVideo2Browse.clicked.connect(self.browse_video2)
         self.pushButtonOutputVideoBrowse.clicked.connect(self.browse_output_video)
+        self.pushButtonRoiSelect.clicked.connect(self.select_roi)
+        self.pushButtonAddVideo.clicked.connect(lambda: self.add_extra_video())
         self.checkBoxOutputAudioVideo1.clicked.connect(self.update_audio_source)
         self.checkBoxOutputAudioVideo2.clicked.connect(self.update_audio_source)
         self.checkBoxVideo1AddTextBottom.clicked.connect(self.update_text_position_video1)
@@ -823,6 +928,17 @@ class MainWindow(QMainWindow):
         self.lineEditDuration.textChanged.connect(self._save_settings)
         self.lineEditBirate.textChanged.connect(self._save_settings)
         self.lineEditOutputVideoDividerWidth.textChanged.connect(self._save_settings)
+        self.lineEditRoi.textChanged.connect(self._save_settings)
+        self.spinBoxRoiZoom.valueChanged.connect(self._save_settings)
+        self.comboBoxLayout.currentTextChanged.connect(self._save_settings)
+        self.spinBoxSplitRatio.valueChanged.connect(self._save_settings)
+        self.comboBoxSample.currentTextChanged.connect(self._save_settings)
+        self.spinBoxSampleInterval.valueChanged.connect(self._save_settings)
+        self.checkBoxSamplePng.toggled.connect(self._save_settings)
+        self.spinBoxMaxWidth.valueChanged.connect(self._save_settings)
+        self.spinBoxMaxHeight.valueChanged.connect(self._save_settings)
+        self.comboBoxScaler.currentTextChanged.connect(self._save_settings)
+        self.checkBoxRoi.toggled.connect(self._save_settings)
 
         self.comboBoxVideoCodec.currentTextChanged.connect(self._save_settings)
         self.comboBoxAudioCodec.currentTextChanged.connect(self._save_settings)
@@ -916,6 +1032,18 @@ class MainWindow(QMainWindow):
         s.setValue("output/file", self.lineEditOutputVideoFile.text())
         s.setValue("output/audio_video1", self.checkBoxOutputAudioVideo1.isChecked())
         s.setValue("output/audio_video2", self.checkBoxOutputAudioVideo2.isChecked())
+        s.setValue("output/roi_enabled", self.checkBoxRoi.isChecked())
+        s.setValue("output/roi", self.lineEditRoi.text())
+        s.setValue("output/roi_zoom", self.spinBoxRoiZoom.value())
+        s.setValue("output/layout", self.comboBoxLayout.currentText())
+        s.setValue("output/split_ratio", self.spinBoxSplitRatio.value())
+        s.setValue("output/sample_mode", self.comboBoxSample.currentText())
+        s.setValue("output/sample_interval", self.spinBoxSampleInterval.value())
+        s.setValue("output/sample_png", self.checkBoxSamplePng.isChecked())
+        s.setValue("output/max_width", self.spinBoxMaxWidth.value())
+        s.setValue("output/max_height", self.spinBoxMaxHeight.value())
+        s.setValue("output/scaler", self.comboBoxScaler.currentText())
+        s.setValue("grid/extra_videos", json.dumps([row.to_dict() for row in self.extra_video_rows]))
 
         s.setValue("ui/log_visible", self.logDock.isVisible())
 
@@ -951,6 +1079,24 @@ class MainWindow(QMainWindow):
             self.checkBoxOutputAudioVideo1.setChecked(s.value("output/audio_video1", self.checkBoxOutputAudioVideo1.isChecked(), type=bool))
             self.checkBoxOutputAudioVideo2.setChecked(s.value("output/audio_video2", self.checkBoxOutputAudioVideo2.isChecked(), type=bool))
             self.lineEditOutputVideoFile.setText(s.value("output/file", self.lineEditOutputVideoFile.text(), type=str))
+            self.checkBoxRoi.setChecked(s.value("output/roi_enabled", self.checkBoxRoi.isChecked(), type=bool))
+            self.lineEditRoi.setText(s.value("output/roi", self.lineEditRoi.text(), type=str))
+            self.spinBoxRoiZoom.setValue(s.value("output/roi_zoom", self.spinBoxRoiZoom.value(), type=int))
+            self.comboBoxLayout.setCurrentText(s.value("output/layout", self.comboBoxLayout.currentText(), type=str))
+            self.spinBoxSplitRatio.setValue(s.value("output/split_ratio", self.spinBoxSplitRatio.value(), type=int))
+            self.comboBoxSample.setCurrentText(s.value("output/sample_mode", self.comboBoxSample.currentText(), type=str))
+            self.spinBoxSampleInterval.setValue(s.value("output/sample_interval", self.spinBoxSampleInterval.value(), type=float))
+            self.checkBoxSamplePng.setChecked(s.value("output/sample_png", self.checkBoxSamplePng.isChecked(), type=bool))
+            self.spinBoxMaxWidth.setValue(s.value("output/max_width", self.spinBoxMaxWidth.value(), type=int))
+            self.spinBoxMaxHeight.setValue(s.value("output/max_height", self.spinBoxMaxHeight.value(), type=int))
+            self.comboBoxScaler.setCurrentText(s.value("output/scaler", self.comboBoxScaler.currentText(), type=str))
+            try:
+                extra_videos = json.loads(s.value("grid/extra_videos", "[]", type=str) or "[]")
+            except ValueError:
+                extra_videos = []
+            for data in extra_videos:
+                if isinstance(data, dict):
+                    self.add_extra_video(data)
 
             self.comboBoxVideoCodec.setCurrentText(s.value("output/video_codec", self.comboBoxVideoCodec.currentText(), type=str))
             self.comboBoxAudioCodec.setCurrentText(s.value("output/audio_codec", self.comboBoxAudioCodec.currentText(), type=str))
@@ -1020,18 +1166,53 @@ class MainWindow(QMainWindow):
         # Output options
         self._set_tooltip(self.lineEditDuration, "Output duration (HH:MM:SS).")
         self._set_tooltip(self.comboBoxVideoCodec, "Video codec used for encoding.")
-        self._set_tooltip(self.comboBoxAudioCodec, "Audio codec used for encoding.")
+        self._set_tooltip(
+            self.comboBoxAudioCodec,
+            "Audio codec used for encoding. copy keeps the source track; auto copies it when the container accepts "
+            "its codec and the audio is not trimmed, and encodes otherwise.",
+        )
         self._set_tooltip(self.lineEditBirate, "Target video bitrate in kbps.")
         self._set_tooltip(self.checkBoxOutputVideoDivider, "Add a vertical divider between videos.")
         self._set_tooltip(self.lineEditOutputVideoDividerWidth, "Divider width in pixels.")
         self._set_tooltip(self.comboBoxVideoDividerColor, "Divider color.")
         self._set_tooltip(self.checkBoxOutputAudioVideo1, "Use audio track from Video 1.")
         self._set_tooltip(self.checkBoxOutputAudioVideo2, "Use audio track from Video 2.")
+        self._set_tooltip(self.checkBoxRoi, "Compare only a region of both videos instead of half of each frame.")
+        self._set_tooltip(self.lineEditRoi, "Region in Video 1 pixels as x:y:width:height.")
+        self._set_tooltip(self.pushButtonRoiSelect, "Drag a region on a frame from Video 1.")
+        self._set_tooltip(self.spinBoxRoiZoom, "Enlarge the region with nearest-neighbour scaling for pixel peeping.")
+        self._set_tooltip(
+            self.comboBoxLayout,
+            "split: Video 1 left / Video 2 right. side-by-side: both whole. vstack: top / bottom. "
+            "difference: amplified pixel difference. checkerboard: alternating tiles. wipe: moving split line.",
+        )
+        self._set_tooltip(self.spinBoxSplitRatio, "Share of the frame taken by Video 1 in the split and vstack layouts.")
+        self._set_tooltip(
+            self.comboBoxSample,
+            "Quick check on sampled frames only: keyframes (decodes keyframes only), "
+            "frames (every Nth frame) or seconds (one frame every N seconds).",
+        )
+        self._set_tooltip(self.spinBoxSampleInterval, "N for the frames and seconds sampling modes.")
+        self._set_tooltip(
+            self.checkBoxSamplePng,
+            f"Write one PNG per sample into a folder named after the output file instead of a {SLIDESHOW_FPS:g} fps slideshow.",
+        )
+        self._set_tooltip(
+            self.spinBoxMaxWidth,
+            "Largest output width. Inputs are scaled down once inside the graph, so encoding works at this size.",
+        )
+        self._set_tooltip(self.spinBoxMaxHeight, "Largest output height; off keeps the source resolution.")
+        self._set_tooltip(self.comboBoxScaler, "Scaling algorithm; lanczos is sharpest, area suits large reductions.")
+        self._set_tooltip(self.pushButtonAddVideo, f"Add another input; with more than two videos the output is a grid of up to {GRID_MAX_INPUTS}.")
 
         # Output file and log
         self._set_tooltip(self.lineEditOutputVideoFile, "Output file path and base name.")
         self._set_tooltip(self.pushButtonOutputVideoBrowse, "Choose where to save the output video.")
-        self._set_tooltip(self.comboBoxOutputVideoType, "Container format for the output file.")
+        self._set_tooltip(
+            self.comboBoxOutputVideoType,
+            f"Container format for the output file. gif and webp make a silent animated preview capped at "
+            f"{ANIMATED_FPS:g} fps and {ANIMATED_WIDTH} px wide (or the Max size width).",
+        )
         self._set_tooltip(self.logDock, "Processing output and FFmpeg command log.")
         self._set_tooltip(self.plainTextEditOutput, "Live processing output from FFmpeg.")
         self._set_tooltip(self.progressBar, "Current encode progress.")
@@ -1075,6 +1256,126 @@ class MainWindow(QMainWindow):
         self.ffmpeg_exe_path = ffmpeg_path
         self.ffprobe_exe_path = ffprobe_path
 
+    def _apply_runtime_capabilities(self, capabilities) -> None:
+        """Disable codec/container entries the resolved FFmpeg build cannot produce."""
+        self.ffmpeg_capabilities = capabilities
+        checks = (
+            (self.comboBoxVideoCodec, lambda name: capabilities.has_encoder(name, "V")),
+            (self.comboBoxAudioCodec, lambda name: name in (AUDIO_AUTO, AUDIO_COPY) or capabilities.has_encoder(audio_encoder(name), "A")),
+            (self.comboBoxOutputVideoType, capabilities.supports_output_type),
+        )
+        for combo, is_supported in checks:
+            model = combo.model()
+            for index in range(combo.count()):
+                item = model.item(index)
+                if item is None:
+                    continue
+                supported = is_supported(combo.itemText(index))
+                item.setEnabled(supported)
+                item.setToolTip("" if supported else "Not supported by the resolved FFmpeg build.")
+
+    def _unsupported_selections(self) -> list[str]:
+        caps = self.ffmpeg_capabilities
+        if caps is None:
+            return []
+        missing = []
+        video_codec = self.comboBoxVideoCodec.currentText()
+        audio_codec = self.comboBoxAudioCodec.currentText()
+        output_type = self.comboBoxOutputVideoType.currentText()
+        animated = output_type in ANIMATED_TYPES
+        if animated:
+            video_codec = animated_codec_args(output_type)[1]
+        if not caps.has_encoder(video_codec, "V"):
+            missing.append(f"video codec '{video_codec}'")
+        uses_audio = not animated and (self.checkBoxOutputAudioVideo1.isChecked() or self.checkBoxOutputAudioVideo2.isChecked())
+        if audio_codec != AUDIO_COPY:
+            # For auto this is the encoder it falls back to when the source track cannot be copied.
+            audio_codec = resolve_audio_codec(audio_codec, output_type, "")
+        if uses_audio and audio_codec != AUDIO_COPY and not caps.has_encoder(audio_codec, "A"):
+            missing.append(f"audio codec '{audio_codec}'")
+        if not caps.supports_output_type(output_type):
+            missing.append(f"output type '{output_type}'")
+        filters = required_filters(
+            "grid" if self.extra_video_rows else self.comboBoxLayout.currentText(),
+            divider=self.checkBoxOutputVideoDivider.isChecked(),
+            labels=self.checkBoxVideo1AddText.isChecked() or self.checkBoxVideo2AddText.isChecked(),
+        )
+        if output_type == "gif":
+            filters += ["palettegen", "paletteuse"]
+        missing.extend(f"filter '{name}'" for name in filters if not caps.has_filter(name))
+        return missing
+
+    def _text_position(self, top_checkbox, bottom_checkbox) -> str:
+        if top_checkbox.isChecked():
+            return "top"
+        if bottom_checkbox.isChecked():
+            return "bottom"
+        return "middle"
+
+    def _sample_mode(self) -> str | None:
+        mode = self.comboBoxSample.currentText()
+        return mode if mode in SAMPLE_MODES else None
+
+    def _size_options(self) -> dict:
+        scaler = self.comboBoxScaler.currentText()
+        return {
+            "max_size": (self.spinBoxMaxWidth.value(), self.spinBoxMaxHeight.value()),
+            "scaler": scaler if scaler in SCALERS else "",
+        }
+
+    def _build_preflight_job(self, output_file: str) -> PreflightJob:
+        def font_resolver(combo):
+            def resolve():
+                family = combo.currentFont().family()
+                path = self.get_font_path(family)
+                if not path:
+                    raise RuntimeError(f"Unable to resolve font family '{family}'.")
+                return path
+            return resolve
+
+        fonts = {}
+        if self.checkBoxVideo1AddText.isChecked():
+            fonts["Video 1 text"] = font_resolver(self.fontComboBoxVideo1)
+        if self.checkBoxVideo2AddText.isChecked() and not self.extra_video_rows:
+            fonts["Video 2 text"] = font_resolver(self.fontComboBoxVideo2)
+
+        audio_input = None
+        if self._sample_mode():
+            pass  # sampled output has no audio
+        elif self.checkBoxOutputAudioVideo1.isChecked():
+            audio_input = 0
+        elif self.checkBoxOutputAudioVideo2.isChecked():
+            audio_input = 1
+
+        try:
+            bitrate_k = int(self.lineEditBirate.text())
+        except ValueError:
+            bitrate_k = 0
+        return PreflightJob(
+            inputs=[
+                PreflightInput(
+                    self.lineEditVideo1.text(),
+                    _parse_time_to_seconds(self.lineEditStartTimeVideo1.text()),
+                    "Video 1",
+                    # Counting keyframe samples for progress needs the keyframe index of Video 1.
+                    keyframes=self._sample_mode() == "keyframes",
+                ),
+                PreflightInput(self.lineEditVideo2.text(), _parse_time_to_seconds(self.lineEditStartTimeVideo2.text()), "Video 2"),
+                *(
+                    PreflightInput(row.lineEditPath.text(), _parse_time_to_seconds(row.lineEditStartTime.text()), f"Video {index}")
+                    for index, row in enumerate(self.extra_video_rows, start=3)
+                ),
+            ],
+            output_path=output_file,
+            output_type=self.comboBoxOutputVideoType.currentText(),
+            duration=_parse_time_to_seconds(self.lineEditDuration.text()),
+            video_codec=self.comboBoxVideoCodec.currentText(),
+            audio_codec=self.comboBoxAudioCodec.currentText(),
+            bitrate_k=bitrate_k,
+            audio_input=audio_input,
+            fonts=fonts,
+        )
+
     def _show_splash_message(self, message: str) -> None:
         self.splash.showMessage(
             message,
@@ -1103,6 +1404,7 @@ class MainWindow(QMainWindow):
         self.splash = splash
         self.startup_thread = StartupThread(_BASE_DIR)
         self.startup_thread.update_signal.connect(self._show_splash_message)
+        self.startup_thread.capabilities_signal.connect(self._apply_runtime_capabilities)
         self.startup_thread.ready_signal.connect(self._on_startup_ready)
         self.startup_thread.error_signal.connect(self._on_startup_error)
         self.startup_thread.start()
@@ -1118,7 +1420,7 @@ class MainWindow(QMainWindow):
 
     def populate_codec_comboboxes(self):
         self.comboBoxVideoCodec.addItems(['libx264', 'libx265', 'mpeg4', 'vp9', 'av1'])
-        self.comboBoxAudioCodec.addItems(['aac', 'libmp3lame', 'opus', 'vorbis', 'flac'])
+        self.comboBoxAudioCodec.addItems([AUDIO_AUTO, AUDIO_COPY, 'aac', 'libmp3lame', 'opus', 'vorbis', 'flac'])
 
     def populate_color_comboboxes(self):
         colors = ['white', 'black', 'red', 'green', 'blue', 'yellow', 'purple', 'cyan', 'grey']
@@ -1168,17 +1470,53 @@ class MainWindow(QMainWindow):
             self.lineEditOutputVideoFile.setText(file_name)
             self._update_browse_dir_from_path(file_name, "browse/output_dir")
 
+    def select_roi(self):
+        video1_path = self.lineEditVideo1.text()
+        if not Path(video1_path).is_file():
+            QMessageBox.critical(self, "Error", "Choose Video 1 before selecting a region.")
+            return
+        start = _parse_time_to_seconds(self.lineEditStartTimeVideo1.text())
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            frame_path = str(Path(tmp_dir) / "frame.png")
+            cmd = [self.ffmpeg_exe_path, "-v", "error", "-y"]
+            if start > 0:
+                cmd.extend(["-ss", f"{start:.3f}"])
+            cmd.extend(["-i", video1_path, "-frames:v", "1", frame_path])
+            result = subprocess.run(cmd, capture_output=True, text=True)
+            if result.returncode != 0 or not Path(frame_path).is_file():
+                QMessageBox.critical(self, "Error", f"Unable to read a frame from Video 1: {result.stderr.strip()}")
+                return
+            dialog = RoiSelectorDialog(frame_path, self)
+            if dialog.exec() == QDialog.DialogCode.Accepted and dialog.roi_text():
+                self.lineEditRoi.setText(dialog.roi_text())
+                self.checkBoxRoi.setChecked(True)
+
     def validate_time_format(self, time_str):
-        return re.match(r"\d{2}:\d{2}:\d{2}", time_str) is not None
+        try:
+            parse_time(time_str)
+        except RuntimeError:
+            return False
+        return True
+
+    def _invalid_time_fields(self) -> list[str]:
+        fields = [
+            ("Video 1 start time", self.lineEditStartTimeVideo1),
+            ("Video 2 start time", self.lineEditStartTimeVideo2),
+            *((f"Video {index} start time", row.lineEditStartTime) for index, row in enumerate(self.extra_video_rows, start=3)),
+            ("Duration", self.lineEditDuration),
+        ]
+        return [name for name, line_edit in fields if not self.validate_time_format(line_edit.text())]
+
+    def get_media_info(self, video_path):
+        try:
+            return probe_media(self.ffprobe_exe_path, video_path)
+        except Exception as e:
+            logging.error(f"ffprobe error: {e}")
+            return None
 
     def get_resolution(self, video_path):
-        cmd = [self.ffprobe_exe_path, "-v", "error", "-select_streams", "v:0", "-show_entries", "stream=width,height", "-of", "csv=s=x:p=0", video_path]
-        result = subprocess.run(cmd, capture_output=True, text=True)
-        if result.returncode != 0:
-            logging.error(f"ffprobe error: {result.stderr}")
-            return (0, 0)
-        match = re.match(r'(\d+)x(\d+)', result.stdout)
-        return match.groups() if match else (0, 0)
+        info = self.get_media_info(video_path)
+        return info.display_resolution if info else (0, 0)
 
     def get_font_path(self, font_family):
         if not font_family:
@@ -1208,29 +1546,21 @@ class MainWindow(QMainWindow):
             return str(fallback)
         return ""
 
-    def convert_font_path(self, font_path):
-        return font_path.replace('\\', '/').replace(':', '\\:')
-
     def get_frame_rate(self, video_path, override_framerate=None):
         if override_framerate:
             try:
                 return str(float(override_framerate))
             except ValueError:
                 pass
-        cmd = [self.ffprobe_exe_path, "-v", "error", "-select_streams", "v:0", "-show_entries", "stream=r_frame_rate", "-of", "default=noprint_wrappers=1:nokey=1", video_path]
-        result = subprocess.run(cmd, capture_output=True, text=True)
-        if result.returncode != 0:
-            logging.error(f"ffprobe error: {result.stderr}")
-            return "25"
-        try:
-            num, den = result.stdout.strip().split('/')
-            return str(int(num) / int(den))
-        except Exception as e:
-            logging.error(f"Error calculating frame rate: {e}")
+        info = self.get_media_info(video_path)
+        if info is None or info.fps <= 0:
             return "25"
+        return str(info.fps)
 
     def process_videos(self):
-        if not _validate_ffmpeg_pair(Path(self.ffmpeg_exe_path), Path(self.ffprobe_exe_path)):
+        if self.preflight_thread is not None and self.preflight_thread.isRunning():
+            return
+        if not validate_ffmpeg_pair(Path(self.ffmpeg_exe_path), Path(self.ffprobe_exe_path)):
             QMessageBox.critical(
                 self,
                 "FFmpeg Missing",
@@ -1238,103 +1568,232 @@ class MainWindow(QMainWindow):
             )
             return
 
+        unsupported = self._unsupported_selections()
+        if unsupported:
+            QMessageBox.critical(
+                self,
+                "Unsupported Settings",
+                "The resolved FFmpeg build does not support: " + ", ".join(unsupported) + ".",
+            )
+            return
+
+        invalid_times = self._invalid_time_fields()
+        if invalid_times:
+            QMessageBox.critical(
+                self,
+                "Invalid Time",
+                ", ".join(invalid_times) + ": use seconds, MM:SS or HH:MM:SS[.frac].",
+            )
+            return
+
         video1_path = self.lineEditVideo1.text()
         video2_path = self.lineEditVideo2.text()
-        start_time_video1 = self.lineEditStartTimeVideo1.text()
-        start_time_video2 = self.lineEditStartTimeVideo2.text()
-        duration = self.lineEditDuration.text()
-        video_codec = self.comboBoxVideoCodec.currentText()
-        audio_codec = self.comboBoxAudioCodec.currentText()
-        bitrate = self.lineEditBirate.text()
-        divider_width = self.lineEditOutputVideoDividerWidth.text()
-        divider_color = self.comboBoxVideoDividerColor.currentText()
         output_file = self.lineEditOutputVideoFile.text()
         output_file_extension = self.comboBoxOutputVideoType.currentText()
-        use_audio_from_video1 = self.checkBoxOutputAudioVideo1.isChecked()
-        use_audio_from_video2 = self.checkBoxOutputAudioVideo2.isChecked()
 
-        res1 = self.get_resolution(video1_path)
-        res2 = self.get_resolution(video2_path)
-
-        if res1 == (0, 0) or res2 == (0, 0):
-            QMessageBox.critical(self, "Error", "Failed to obtain video resolutions. Check input file paths.")
+        if not output_file.endswith(f".{output_file_extension}"):
+            output_file = f"{output_file}.{output_file_extension}"
+        sample_mode = self._sample_mode()
+        sample_png = sample_mode is not None and self.checkBoxSamplePng.isChecked()
+        # PNG samples go into a folder named after the output file.
+        sample_dir = Path(output_file).with_suffix("")
+        if sample_mode and self.extra_video_rows:
+            QMessageBox.critical(self, "Error", "Sampling works with two videos only; remove the extra videos first.")
             return
+        animated = output_file_extension in ANIMATED_TYPES
+        if animated and (sample_mode or self.extra_video_rows):
+            QMessageBox.critical(self, "Error", "Animated previews work with two videos and sampling off.")
+            return
+        if not self.extra_video_rows:
+            try:
+                stills = [probe_media(self.ffprobe_exe_path, path).is_image for path in (video1_path, video2_path)]
+            except RuntimeError:
+                stills = [False, False]  # the preflight reports unreadable inputs
+            if all(stills):
+                self._process_stills(str(Path(output_file).with_suffix(".png")))
+                return
+            if any(stills):
+                QMessageBox.critical(self, "Error", "Video 1 and Video 2 must both be videos or both be still images.")
+                return
+
+        self.statusbar.showMessage("Checking inputs...")
+        # Probing can take seconds on network drives, so it runs off the UI thread.
+        self.preflight_thread = PreflightThread(
+            self.ffprobe_exe_path,
+            self._build_preflight_job(str(sample_dir) if sample_png else output_file),
+        )
+        self.preflight_thread.report_signal.connect(
+            lambda report: self._on_preflight_finished(report, video1_path, video2_path, output_file)
+        )
+        self.preflight_thread.error_signal.connect(self._on_preflight_error)
+        self.preflight_thread.start()
+
+    def _on_preflight_error(self, error_text: str) -> None:
+        self.statusbar.showMessage("Ready")
+        QMessageBox.critical(self, "Preflight Failed", error_text)
+
+    def _on_preflight_finished(
+        self,
+        report: PreflightReport,
+        video1_path: str,
+        video2_path: str,
+        output_file: str,
+    ) -> None:
+        """Second half of process_videos, once the inputs have been checked."""
+        for check in report.warnings:
+            self.append_to_output(f"Warning: {check.message}")
+        if not report.ok:
+            self.statusbar.showMessage("Ready")
+            QMessageBox.critical(
+                self,
+                "Preflight Failed",
+                "\n".join(check.message for check in report.errors),
+            )
+            return
+        if self.extra_video_rows:
+            self._process_grid(report, output_file)
+            return
+        try:
+            info1, info2 = report.probed_media[:2]
+            job = self._compare_job(
+                [video1_path, video2_path],
+                [
+                    _parse_time_to_seconds(self.lineEditStartTimeVideo1.text()),
+                    _parse_time_to_seconds(self.lineEditStartTimeVideo2.text()),
+                ],
+                self._text_labels(report.fonts),
+                output_file,
+            )
+            cmd = build_compare_command(self.ffmpeg_exe_path, job, [info1, info2])
+        except RuntimeError as e:
+            QMessageBox.critical(self, "Error", str(e))
+            return
+        if job.image_type:
+            job.image_dir.mkdir(exist_ok=True)
 
-        half_width1 = int(res1[0]) // 2
-        half_width2 = int(res2[0]) // 2
-        if half_width1 % 2 != 0:
-            half_width1 -= 1
-        if half_width2 % 2 != 0:
-            half_width2 -= 1
-
-        font_video1 = self.fontComboBoxVideo1.currentFont().family()
-        font_path_video1_raw = self.get_font_path(font_video1)
-        font_path_video1 = self.convert_font_path(font_path_video1_raw)
-
-        font_video2 = self.fontComboBoxVideo2.currentFont().family()
-        font_path_video2_raw = self.get_font_path(font_video2)
-        font_path_video2 = self.convert_font_path(font_path_video2_raw)
-
-        text_video1 = self.lineEditVideo1Text.text()
-        text_video2 = self.lineEditVideo2Text.text()
-        font_size_video1 = self.spinBoxVideo1FontSize.value()
-        font_size_video2 = self.spinBoxVideo2FontSize.value()
-        color_video1 = self.comboBoxVideo1AddTextColor.currentText()
-        color_video2 = self.comboBoxVideo2AddTextColor.currentText()
-
-        text_position_video1 = "(h-text_h)/2"
-        if self.checkBoxVideo1AddTextTop.isChecked():
-            text_position_video1 = "10"
-        elif self.checkBoxVideo1AddTextBottom.isChecked():
-            text_position_video1 = "h-text_h-10"
-
-        text_position_video2 = "(h-text_h)/2"
-        if self.checkBoxVideo2AddTextTop.isChecked():
-            text_position_video2 = "10"
-        elif self.checkBoxVideo2AddTextBottom.isChecked():
-            text_position_video2 = "h-text_h-10"
-
-        crop_scale_left = f"crop=iw/2:ih:0:0,scale=-2:{int(res2[1])}"
-        crop_right = f"crop={int(res2[0])/2}:{int(res2[1])}:{int(res2[0])/2}:0"
-        filter_complex = f"[0:v]{crop_scale_left}[left];[1:v]{crop_right}[right];"
-
-        if self.checkBoxVideo1AddText.isChecked():
-            filter_complex += f"[left]drawtext=text='{text_video1}':fontfile='{font_path_video1}':fontsize={font_size_video1}:fontcolor={color_video1}:x=(w-text_w)/2:y={text_position_video1}[left];"
-        if self.checkBoxVideo2AddText.isChecked():
-            filter_complex += f"[right]drawtext=text='{text_video2}':fontfile='{font_path_video2}':fontsize={font_size_video2}:fontcolor={color_video2}:x=(w-text_w)/2:y={text_position_video2}[right];"
+        self.append_to_output("FFmpeg command:\n" + " ".join(cmd))
+        self._start_ffmpeg(cmd, output_seconds(job, info1))
+
+    def _text_labels(self, fonts: dict[str, str]) -> list[TextLabel | None]:
+        """Video 1 and Video 2 labels; `fonts` holds the font file of each enabled one, keyed "Video N text"."""
+        labels = []
+        for name, text, size, color, top, bottom in (
+            (
+                "Video 1 text", self.lineEditVideo1Text, self.spinBoxVideo1FontSize,
+                self.comboBoxVideo1AddTextColor, self.checkBoxVideo1AddTextTop, self.checkBoxVideo1AddTextBottom,
+            ),
+            (
+                "Video 2 text", self.lineEditVideo2Text, self.spinBoxVideo2FontSize,
+                self.comboBoxVideo2AddTextColor, self.checkBoxVideo2AddTextTop, self.checkBoxVideo2AddTextBottom,
+            ),
+        ):
+            font = fonts.get(name)
+            labels.append(
+                TextLabel(text.text(), font, size.value(), color.currentText(), self._text_position(top, bottom)) if font else None
+            )
+        return labels
 
+    def _compare_job(self, inputs: list[str], starts: list[float], labels: list, output_file: str) -> CompareJob:
+        """The shared compare job for the current settings; raises RuntimeError for invalid values."""
+        divider_width = 0
         if self.checkBoxOutputVideoDivider.isChecked():
-            divider_layout = f"|w0+{divider_width}_0"
-        else:
-            divider_layout = "|w0_0"
-        filter_complex += f"[left][right]xstack=inputs=2:layout=0_0{divider_layout}:fill={divider_color}[v]"
+            try:
+                divider_width = int(self.lineEditOutputVideoDividerWidth.text())
+            except ValueError:
+                raise RuntimeError("Divider width must be a whole number of pixels.") from None
+        try:
+            bitrate_k = int(self.lineEditBirate.text())
+        except ValueError:
+            raise RuntimeError("Bitrate must be a whole number of kbps.") from None
+        audio_input = None
+        if self.checkBoxOutputAudioVideo1.isChecked():
+            audio_input = 0
+        elif self.checkBoxOutputAudioVideo2.isChecked():
+            audio_input = 1
+        sample_mode = self._sample_mode()
+        return CompareJob(
+            inputs=inputs,
+            output=output_file,
+            output_type=self.comboBoxOutputVideoType.currentText(),
+            duration=_parse_time_to_seconds(self.lineEditDuration.text()),
+            starts=starts,
+            labels=labels,
+            video_codec=self.comboBoxVideoCodec.currentText(),
+            bitrate_k=bitrate_k,
+            audio_codec=self.comboBoxAudioCodec.currentText(),
+            audio_input=audio_input,
+            layout=self.comboBoxLayout.currentText(),
+            ratio=self.spinBoxSplitRatio.value() / 100,
+            divider_width=divider_width,
+            divider_color=self.comboBoxVideoDividerColor.currentText(),
+            roi=parse_roi(self.lineEditRoi.text()) if self.checkBoxRoi.isChecked() else None,
+            zoom=self.spinBoxRoiZoom.value(),
+            sample=sample_mode,
+            sample_interval=self.spinBoxSampleInterval.value(),
+            image_type="png" if sample_mode and self.checkBoxSamplePng.isChecked() else None,
+            **self._size_options(),
+        )
 
-        if not output_file.endswith(f".{output_file_extension}"):
-            output_file = f"{output_file}.{output_file_extension}"
+    def _process_stills(self, output_file: str) -> None:
+        """Compare two still images into one lossless PNG, skipping the video pipeline."""
+        image1, image2 = self.lineEditVideo1.text(), self.lineEditVideo2.text()
+        try:
+            fonts = {}
+            for name, enabled, font_combo in (
+                ("Video 1 text", self.checkBoxVideo1AddText, self.fontComboBoxVideo1),
+                ("Video 2 text", self.checkBoxVideo2AddText, self.fontComboBoxVideo2),
+            ):
+                if enabled.isChecked():
+                    fonts[name] = self.get_font_path(font_combo.currentFont().family())
+                    if not fonts[name]:
+                        raise RuntimeError(f"Unable to resolve font family '{font_combo.currentFont().family()}'.")
+            job = self._compare_job([image1, image2], [0.0, 0.0], self._text_labels(fonts), output_file)
+            media = [probe_media(self.ffprobe_exe_path, image1), probe_media(self.ffprobe_exe_path, image2)]
+            cmd = build_still_command(self.ffmpeg_exe_path, job, media)
+        except RuntimeError as e:
+            QMessageBox.critical(self, "Error", str(e))
+            return
+
+        self.append_to_output("FFmpeg command:\n" + " ".join(cmd))
+        self._start_ffmpeg(cmd, 0)
 
-        cmd = [
-            self.ffmpeg_exe_path,
-            "-ss", str(start_time_video1),
-            "-i", str(video1_path),
-            "-ss", str(start_time_video2),
-            "-i", str(video2_path),
-            "-filter_complex", filter_complex,
-            "-map", "[v]",
-            "-t", str(duration),
-            "-c:v", str(video_codec),
-            "-b:v", str(bitrate) + "k",
-            str(output_file)
+    def _process_grid(self, report, output_file: str) -> None:
+        """Tile Video 1, Video 2 and every extra video into one grid in a single pass."""
+        label_style = None
+        if self.checkBoxVideo1AddText.isChecked():
+            label_style = (
+                report.fonts["Video 1 text"],
+                self.spinBoxVideo1FontSize.value(),
+                self.comboBoxVideo1AddTextColor.currentText(),
+                self._text_position(self.checkBoxVideo1AddTextTop, self.checkBoxVideo1AddTextBottom),
+            )
+        entries = [
+            (self.lineEditVideo1.text(), self.lineEditStartTimeVideo1.text(), self.lineEditVideo1Text.text()),
+            (self.lineEditVideo2.text(), self.lineEditStartTimeVideo2.text(), self.lineEditVideo2Text.text()),
+            *((row.lineEditPath.text(), row.lineEditStartTime.text(), row.label_text()) for row in self.extra_video_rows),
         ]
-        if use_audio_from_video1:
-            cmd.extend(["-map", "0:a", "-c:a", audio_codec])
-        elif use_audio_from_video2:
-            cmd.extend(["-map", "1:a", "-c:a", audio_codec])
+        # Large grids exceed the command-line limit, so the graph goes through a script file.
+        fd, script_path = tempfile.mkstemp(prefix="compare-grid-", suffix=".txt")
+        os.close(fd)
+        try:
+            job = self._compare_job(
+                [path for path, _, _ in entries],
+                [_parse_time_to_seconds(start) for _, start, _ in entries],
+                [TextLabel(text, *label_style) if label_style else None for _, _, text in entries],
+                output_file,
+            )
+            cmd = build_grid_command(self.ffmpeg_exe_path, job, report.probed_media, script_path)
+        except RuntimeError as e:
+            Path(script_path).unlink(missing_ok=True)
+            QMessageBox.critical(self, "Error", str(e))
+            return
+        self._filter_script_path = script_path
 
         self.append_to_output("FFmpeg command:\n" + " ".join(cmd))
+        self.append_to_output("Filter script:\n" + Path(script_path).read_text(encoding="utf-8"))
+        self._start_ffmpeg(cmd, job.duration)
 
-        # Parse duration for progress (HH:MM:SS -> seconds)
-        duration_seconds = _parse_time_to_seconds(duration)
-
+    def _start_ffmpeg(self, cmd: list[str], duration_seconds: float) -> None:
         try:
             self.ffmpeg_thread = FFmpegThread(cmd, duration_seconds)
             self.ffmpeg_thread.update_signal.connect(self.append_to_output)
@@ -1353,6 +1812,9 @@ class MainWindow(QMainWindow):
         self.statusbar.showMessage(status)
 
     def _on_ffmpeg_finished(self):
+        if self._filter_script_path:
+            Path(self._filter_script_path).unlink(missing_ok=True)
+            self._filter_script_path = None
         self.progressBar.setValue(100)
         self.statusbar.showMessage("Processing complete.")
         # Keep progress bar visible briefly, then hide
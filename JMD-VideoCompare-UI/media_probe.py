@@ -0,0 +1,316 @@
+"""
+Single-shot ffprobe wrapper with a persistent probe cache.
+Pure stdlib module shared by the GUI and headless CLI.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import subprocess
+from bisect import bisect_right
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+
+from ffmpeg_runtime import default_cache_root
+
+PROBE_CACHE_VERSION = 1
+
+
+@dataclass
+class AudioStreamInfo:
+    index: int
+    codec: str
+    channels: int
+    sample_rate: int
+    language: str | None = None
+
+
+@dataclass
+class MediaInfo:
+    path: str
+    width: int
+    height: int
+    fps: float
+    duration: float
+    pix_fmt: str
+    video_codec: str
+    rotation: int
+    format_name: str
+    audio_streams: list[AudioStreamInfo] = field(default_factory=list)
+    start_time: float = 0.0
+    # Keyframe timestamps relative to start_time; None until indexed.
+    keyframes: list[float] | None = None
+    intra_only: bool = False
+
+    @property
+    def resolution(self) -> tuple[int, int]:
+        return self.width, self.height
+
+    @property
+    def display_resolution(self) -> tuple[int, int]:
+        """Resolution after applying the rotation FFmpeg autorotate will use."""
+        if self.rotation % 180 == 90:
+            return self.height, self.width
+        return self.width, self.height
+
+    @property
+    def has_audio(self) -> bool:
+        return bool(self.audio_streams)
+
+    @property
+    def is_image(self) -> bool:
+        """A single still picture (PNG, TIFF, JPEG, ...), read by an image demuxer."""
+        return not self.audio_streams and (self.format_name == "image2" or self.format_name.endswith("_pipe"))
+
+    def to_dict(self) -> dict[str, object]:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: dict[str, object]) -> "MediaInfo":
+        values = dict(data)
+        values["audio_streams"] = [AudioStreamInfo(**stream) for stream in values.get("audio_streams") or []]  # type: ignore[arg-type]
+        return cls(**values)  # type: ignore[arg-type]
+
+
+def default_probe_cache_dir() -> Path:
+    return default_cache_root().parent / "probe-cache"
+
+
+def _parse_rate(value: object) -> float:
+    text = str(value or "")
+    if "/" in text:
+        num, _, den = text.partition("/")
+        try:
+            return float(num) / float(den) if float(den) else 0.0
+        except ValueError:
+            return 0.0
+    try:
+        return float(text)
+    except ValueError:
+        return 0.0
+
+
+def _parse_float(value: object) -> float:
+    try:
+        return float(value)  # type: ignore[arg-type]
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def _stream_rotation(stream: dict) -> int:
+    tags = stream.get("tags") or {}
+    if "rotate" in tags:
+        try:
+            return int(float(tags["rotate"])) % 360
+        except (TypeError, ValueError):
+            pass
+    for side_data in stream.get("side_data_list") or []:
+        if "rotation" in side_data:
+            try:
+                # Display matrix rotation is counter-clockwise; tags are clockwise.
+                return int(-float(side_data["rotation"])) % 360
+            except (TypeError, ValueError):
+                pass
+    return 0
+
+
+def parse_probe_json(path: str, payload: dict) -> MediaInfo:
+    streams = payload.get("streams") or []
+    fmt = payload.get("format") or {}
+    video = next((s for s in streams if s.get("codec_type") == "video"), None)
+    if video is None:
+        raise RuntimeError(f"No video stream found in {path}.")
+
+    fps = _parse_rate(video.get("avg_frame_rate")) or _parse_rate(video.get("r_frame_rate"))
+    duration = _parse_float(fmt.get("duration")) or _parse_float(video.get("duration"))
+    audio_streams = [
+        AudioStreamInfo(
+            index=int(stream.get("index", 0)),
+            codec=str(stream.get("codec_name") or ""),
+            channels=int(stream.get("channels") or 0),
+            sample_rate=int(_parse_float(stream.get("sample_rate"))),
+            language=(stream.get("tags") or {}).get("language"),
+        )
+        for stream in streams
+        if stream.get("codec_type") == "audio"
+    ]
+    return MediaInfo(
+        path=path,
+        width=int(video.get("width") or 0),
+        height=int(video.get("height") or 0),
+        fps=fps,
+        duration=duration,
+        pix_fmt=str(video.get("pix_fmt") or ""),
+        video_codec=str(video.get("codec_name") or ""),
+        rotation=_stream_rotation(video),
+        format_name=str(fmt.get("format_name") or ""),
+        audio_streams=audio_streams,
+        start_time=_parse_float(fmt.get("start_time")),
+    )
+
+
+def _cache_entry_path(cache_dir: Path, media_path: Path) -> Path:
+    key = os.path.normcase(str(media_path.resolve()))
+    return cache_dir / f"{hashlib.sha1(key.encode('utf-8')).hexdigest()}.json"
+
+
+def _load_cached(entry_path: Path, size: int, mtime_ns: int) -> MediaInfo | None:
+    try:
+        data = json.loads(entry_path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    if (
+        not isinstance(data, dict)
+        or data.get("version") != PROBE_CACHE_VERSION
+        or data.get("size") != size
+        or data.get("mtime_ns") != mtime_ns
+    ):
+        return None
+    try:
+        return MediaInfo.from_dict(data["info"])
+    except (KeyError, TypeError):
+        return None
+
+
+def _store_cached(entry_path: Path, size: int, mtime_ns: int, info: MediaInfo) -> None:
+    entry_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = entry_path.with_name(f"{entry_path.name}.{os.getpid()}.tmp")
+    payload = {"version": PROBE_CACHE_VERSION, "size": size, "mtime_ns": mtime_ns, "info": info.to_dict()}
+    try:
+        tmp_path.write_text(json.dumps(payload), encoding="utf-8")
+        os.replace(tmp_path, entry_path)
+    except OSError:
+        try:
+            tmp_path.unlink(missing_ok=True)
+        except OSError:
+            pass
+
+
+@dataclass
+class SeekPlan:
+    input_seek: float  # seconds passed as input-side -ss (a keyframe when indexed)
+    trim: float  # seconds decoded and dropped in the filtergraph after the seek
+
+    def input_args(self) -> list[str]:
+        return ["-ss", f"{self.input_seek:.6f}"] if self.input_seek > 0 else []
+
+
+def plan_seek(info: MediaInfo, start_seconds: float) -> SeekPlan:
+    """
+    Choose the cheapest accurate seek: jump straight to the keyframe at or before
+    the start and decode only the remainder. Without an index (or for intra-only
+    sources, where every frame is a keyframe) the start is used as-is.
+    """
+    if start_seconds <= 0:
+        return SeekPlan(0.0, 0.0)
+    if info.intra_only or not info.keyframes:
+        return SeekPlan(start_seconds, 0.0)
+    position = bisect_right(info.keyframes, start_seconds + 1e-6) - 1
+    if position < 0:
+        return SeekPlan(0.0, start_seconds)
+    keyframe = info.keyframes[position]
+    trim = start_seconds - keyframe
+    half_frame = 0.5 / info.fps if info.fps > 0 else 0.02
+    if trim < half_frame:
+        return SeekPlan(keyframe, 0.0)
+    return SeekPlan(keyframe, trim)
+
+
+def _index_keyframes(ffprobe_path: str, media_path: str, start_time: float) -> tuple[list[float], bool]:
+    """
+    Stream video packet flags (no decoding) and collect keyframe timestamps.
+    Returns (keyframes, intra_only); intra-only sources store an empty list.
+    """
+    cmd = [
+        ffprobe_path,
+        "-v",
+        "error",
+        "-select_streams",
+        "v:0",
+        "-show_entries",
+        "packet=pts_time,flags",
+        "-of",
+        "csv=p=0",
+        str(media_path),
+    ]
+    process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+    assert process.stdout is not None
+    keyframes: list[float] = []
+    packets = 0
+    for line in process.stdout:
+        fields = line.strip().split(",")
+        if not fields or not fields[0] or fields[0] == "N/A":
+            continue
+        packets += 1
+        if len(fields) > 1 and "K" not in fields[1]:
+            continue
+        try:
+            keyframes.append(round(float(fields[0]) - start_time, 6))
+        except ValueError:
+            continue
+    process.wait()
+    if process.returncode != 0:
+        raise RuntimeError(f"ffprobe keyframe index failed for {media_path}.")
+    if packets and len(keyframes) == packets:
+        return [], True
+    keyframes.sort()
+    return keyframes, False
+
+
+def probe_media(
+    ffprobe_path: str,
+    media_path: str,
+    *,
+    cache_dir: Path | None = None,
+    use_cache: bool = True,
+    with_keyframes: bool = False,
+) -> MediaInfo:
+    """
+    Probe `media_path` with one `ffprobe -of json -show_streams -show_format` call.
+    Results are cached on disk keyed by path, size and mtime, so an unchanged file
+    is never probed twice. With `with_keyframes`, a keyframe index is collected
+    once and stored in the same cache entry.
+    """
+    path = Path(media_path)
+    try:
+        stat = path.stat()
+    except OSError:
+        raise RuntimeError(f"Input not found: {media_path}") from None
+
+    entry_path = _cache_entry_path(cache_dir or default_probe_cache_dir(), path)
+    info: MediaInfo | None = None
+    if use_cache:
+        info = _load_cached(entry_path, stat.st_size, stat.st_mtime_ns)
+        if info is not None and (not with_keyframes or info.keyframes is not None):
+            return info
+    if info is None:
+        info = _run_probe(ffprobe_path, str(media_path))
+    if with_keyframes:
+        info.keyframes, info.intra_only = _index_keyframes(ffprobe_path, str(media_path), info.start_time)
+    if use_cache:
+        _store_cached(entry_path, stat.st_size, stat.st_mtime_ns, info)
+    return info
+
+
+def _run_probe(ffprobe_path: str, media_path: str) -> MediaInfo:
+    cmd = [
+        ffprobe_path,
+        "-v",
+        "error",
+        "-of",
+        "json",
+        "-show_streams",
+        "-show_format",
+        str(media_path),
+    ]
+    result = subprocess.run(cmd, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"ffprobe failed for {media_path}: {result.stderr.strip()}")
+    try:
+        payload = json.loads(result.stdout or "{}")
+    except ValueError:
+        raise RuntimeError(f"Unable to parse ffprobe output for {media_path}.") from None
+
+    return parse_probe_json(media_path, payload)
@@ -0,0 +1,328 @@
+"""
+Concurrent preflight checks for compare jobs.
+Pure stdlib module shared by the GUI and headless CLI.
+"""
+
+from __future__ import annotations
+
+import os
+import shutil
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Callable
+
+from media_probe import MediaInfo, probe_media
+
+# Encoder choices offered by the GUI/CLI mapped to the codec they produce.
+ENCODER_CODECS = {
+    "libx264": "h264",
+    "libx265": "hevc",
+    "mpeg4": "mpeg4",
+    "vp9": "vp9",
+    "libvpx-vp9": "vp9",
+    "av1": "av1",
+    "libaom-av1": "av1",
+    "libsvtav1": "av1",
+    "aac": "aac",
+    "libmp3lame": "mp3",
+    "opus": "opus",
+    "libopus": "opus",
+    "vorbis": "vorbis",
+    "libvorbis": "vorbis",
+    "flac": "flac",
+}
+
+# Codecs each output type can carry; a missing entry means "anything goes".
+CONTAINER_VIDEO_CODECS: dict[str, set[str]] = {
+    "mp4": {"h264", "hevc", "mpeg4", "av1", "vp9"},
+    "mov": {"h264", "hevc", "mpeg4"},
+    "avi": {"h264", "mpeg4"},
+    "flv": {"h264"},
+    "wmv": {"h264", "mpeg4"},
+    "webm": {"vp9", "av1"},
+}
+CONTAINER_AUDIO_CODECS: dict[str, set[str]] = {
+    "mp4": {"aac", "mp3", "opus"},
+    "mov": {"aac", "mp3"},
+    "avi": {"aac", "mp3"},
+    "flv": {"aac", "mp3"},
+    "wmv": {"aac", "mp3"},
+    "webm": {"opus", "vorbis"},
+}
+
+# Audio codec choices besides the encoders: copy the source track, or copy it when possible.
+AUDIO_COPY = "copy"
+AUDIO_AUTO = "auto"
+# Encoders "auto" falls back to, in order of preference.
+_AUDIO_FALLBACK_ENCODERS = ("aac", "libopus", "libmp3lame", "libvorbis", "flac")
+# Audio choices named after a codec whose native FFmpeg encoder is experimental
+# (-c:a opus fails without -strict -2); they map to the library encoders.
+AUDIO_ENCODERS = {"opus": "libopus", "vorbis": "libvorbis"}
+
+_AUDIO_BITRATE_ESTIMATE_K = 320
+_DISK_HEADROOM = 1.1
+
+
+def codec_fits_container(output_type: str, codec: str, kind: str) -> bool:
+    """`codec` may be an encoder choice or a codec name; `kind` is "video" or "audio"."""
+    table = CONTAINER_VIDEO_CODECS if kind == "video" else CONTAINER_AUDIO_CODECS
+    allowed = table.get(output_type.lower().lstrip("."))
+    return allowed is None or ENCODER_CODECS.get(codec, codec) in allowed
+
+
+def source_audio_codec(info: MediaInfo | None) -> str:
+    """Codec of the first audio track, or "" when there is none."""
+    return info.audio_streams[0].codec if info is not None and info.audio_streams else ""
+
+
+def audio_encoder(choice: str) -> str:
+    """The -c:a encoder for an audio codec choice."""
+    return AUDIO_ENCODERS.get(choice, choice)
+
+
+def resolve_audio_codec(requested: str, output_type: str, source_codec: str, *, filtered: bool = False) -> str:
+    """
+    Turn an audio codec choice into the -c:a value. "copy" and "auto" copy the
+    source track when the container can carry its codec and the audio is not
+    filtered (trimmed) in the graph; "auto" otherwise encodes with the first
+    fallback encoder the container accepts.
+    """
+    can_copy = bool(source_codec) and not filtered and codec_fits_container(output_type, source_codec, "audio")
+    if requested == AUDIO_COPY:
+        if not can_copy:
+            if filtered:
+                raise RuntimeError("Audio cannot be stream-copied because it is trimmed in the filtergraph; choose an encoder or auto.")
+            raise RuntimeError(f"{source_codec or 'The source'} audio cannot be copied into .{output_type}; choose an encoder or auto.")
+        return AUDIO_COPY
+    if requested == AUDIO_AUTO:
+        if can_copy:
+            return AUDIO_COPY
+        return next((name for name in _AUDIO_FALLBACK_ENCODERS if codec_fits_container(output_type, name, "audio")), "aac")
+    return audio_encoder(requested)
+
+
+@dataclass
+class PreflightInput:
+    path: str
+    start: float = 0.0
+    label: str = ""
+    keyframes: bool = False  # also index the keyframes (seeking past 0 always does)
+
+
+@dataclass
+class PreflightJob:
+    inputs: list[PreflightInput]
+    output_path: str
+    output_type: str
+    duration: float
+    video_codec: str
+    audio_codec: str
+    bitrate_k: int
+    audio_input: int | None = None
+    # Label -> callable returning a font path (raises RuntimeError when unresolved).
+    fonts: dict[str, Callable[[], str]] = field(default_factory=dict)
+    # Further files written by the same job (same codec, bitrate and duration).
+    extra_outputs: list[str] = field(default_factory=list)
+
+
+@dataclass
+class PreflightCheck:
+    name: str
+    ok: bool
+    message: str = ""
+    severity: str = "error"
+
+
+@dataclass
+class PreflightReport:
+    checks: list[PreflightCheck]
+    media: list[MediaInfo | None]
+    fonts: dict[str, str]
+    elapsed: float
+
+    @property
+    def ok(self) -> bool:
+        return not self.errors
+
+    @property
+    def errors(self) -> list[PreflightCheck]:
+        return [check for check in self.checks if not check.ok and check.severity == "error"]
+
+    @property
+    def warnings(self) -> list[PreflightCheck]:
+        return [check for check in self.checks if not check.ok and check.severity == "warning"]
+
+    @property
+    def probed_media(self) -> list[MediaInfo]:
+        """Media of every input; a passed report has probed them all."""
+        if any(info is None for info in self.media):
+            raise RuntimeError("Preflight could not probe every input.")
+        return [info for info in self.media if info is not None]
+
+    def to_dict(self) -> dict[str, object]:
+        return {
+            "ok": self.ok,
+            "elapsed": round(self.elapsed, 4),
+            "checks": [asdict(check) for check in self.checks],
+        }
+
+
+def _probe_check(ffprobe_path: str, item: PreflightInput) -> tuple[PreflightCheck, MediaInfo | None]:
+    name = f"probe {item.label or item.path}"
+    try:
+        info = probe_media(ffprobe_path, item.path, with_keyframes=item.keyframes or item.start > 0)
+    except RuntimeError as exc:
+        return PreflightCheck(name, False, str(exc)), None
+    if info.width <= 0 or info.height <= 0:
+        return PreflightCheck(name, False, f"No usable video resolution in {item.path}."), None
+    width, height = info.display_resolution
+    return PreflightCheck(name, True, f"{width}x{height} {info.video_codec} {info.duration:.2f}s"), info
+
+
+def _font_check(label: str, resolve: Callable[[], str]) -> tuple[PreflightCheck, str]:
+    name = f"font {label}"
+    try:
+        path = resolve()
+    except RuntimeError as exc:
+        return PreflightCheck(name, False, str(exc)), ""
+    if not path or not Path(path).exists():
+        return PreflightCheck(name, False, f"Font file not found: {path or '(unresolved)'}"), ""
+    return PreflightCheck(name, True, path), path
+
+
+def _container_checks(job: PreflightJob) -> list[PreflightCheck]:
+    checks = []
+    video_ok = codec_fits_container(job.output_type, job.video_codec, "video")
+    checks.append(
+        PreflightCheck(
+            "video codec",
+            video_ok,
+            f"{job.video_codec} in .{job.output_type}" if video_ok else f"{job.video_codec} cannot be written to .{job.output_type}.",
+        )
+    )
+    if job.audio_input is not None and job.audio_codec not in (AUDIO_COPY, AUDIO_AUTO):
+        audio_ok = codec_fits_container(job.output_type, job.audio_codec, "audio")
+        checks.append(
+            PreflightCheck(
+                "audio codec",
+                audio_ok,
+                f"{job.audio_codec} in .{job.output_type}" if audio_ok else f"{job.audio_codec} cannot be written to .{job.output_type}.",
+            )
+        )
+    return checks
+
+
+def _output_check(job: PreflightJob) -> PreflightCheck:
+    outputs = [Path(path) for path in (job.output_path, *job.extra_outputs)]
+    directory = outputs[0].parent if str(outputs[0].parent) else Path(".")
+    for output in outputs:
+        folder = output.parent if str(output.parent) else Path(".")
+        if not folder.is_dir():
+            return PreflightCheck("output", False, f"Output folder does not exist: {folder}")
+        for item in job.inputs:
+            try:
+                if output.exists() and os.path.samefile(output, item.path):
+                    return PreflightCheck("output", False, f"Output would overwrite input: {item.path}")
+            except OSError:
+                continue
+    try:
+        free = shutil.disk_usage(directory).free
+    except OSError as exc:
+        return PreflightCheck("output", False, f"Unable to read free space for {directory}: {exc}")
+    audio_k = _AUDIO_BITRATE_ESTIMATE_K if job.audio_input is not None else 0
+    estimate = int(len(outputs) * job.duration * (job.bitrate_k + audio_k) * 1000 / 8 * _DISK_HEADROOM)
+    if free < estimate:
+        return PreflightCheck(
+            "output",
+            False,
+            f"Not enough disk space in {directory}: about {estimate / 1e6:.0f} MB needed, {free / 1e6:.0f} MB free.",
+        )
+    return PreflightCheck("output", True, f"~{estimate / 1e6:.0f} MB estimated, {free / 1e6:.0f} MB free")
+
+
+def _media_checks(job: PreflightJob, media: list[MediaInfo | None]) -> list[PreflightCheck]:
+    checks = []
+    for item, info in zip(job.inputs, media):
+        if info is None:
+            continue
+        label = item.label or item.path
+        if info.duration > 0 and item.start >= info.duration:
+            checks.append(
+                PreflightCheck(
+                    f"range {label}",
+                    False,
+                    f"Start {item.start:.2f}s is past the end of {label} ({info.duration:.2f}s).",
+                )
+            )
+        elif info.duration > 0 and item.start + job.duration > info.duration + 0.01:
+            available = info.duration - item.start
+            checks.append(
+                PreflightCheck(
+                    f"range {label}",
+                    False,
+                    f"Only {available:.2f}s of {label} remain after the start; output will be shorter.",
+                    severity="warning",
+                )
+            )
+    if job.audio_input is not None and job.audio_input < len(media):
+        info = media[job.audio_input]
+        if info is not None:
+            label = job.inputs[job.audio_input].label or job.inputs[job.audio_input].path
+            checks.append(
+                PreflightCheck(
+                    "audio source",
+                    info.has_audio,
+                    f"{info.audio_streams[0].codec} from {label}" if info.has_audio else f"{label} has no audio stream.",
+                )
+            )
+            if info.has_audio and job.audio_codec in (AUDIO_COPY, AUDIO_AUTO):
+                # Whether the track ends up trimmed is only known with the graph; this checks the container.
+                codec = source_audio_codec(info)
+                try:
+                    chosen = resolve_audio_codec(job.audio_codec, job.output_type, codec)
+                    checks.append(
+                        PreflightCheck(
+                            "audio codec",
+                            True,
+                            f"copy {codec} into .{job.output_type}" if chosen == AUDIO_COPY else f"{chosen} in .{job.output_type}",
+                        )
+                    )
+                except RuntimeError as exc:
+                    checks.append(PreflightCheck("audio codec", False, str(exc)))
+    return checks
+
+
+def run_preflight(ffprobe_path: str, job: PreflightJob) -> PreflightReport:
+    """
+    Probe inputs, resolve fonts and check the output concurrently, then run the
+    checks that depend on the probe results. A warm probe cache makes this cheap.
+    """
+    started = time.perf_counter()
+    if job.duration <= 0:
+        duration_check = PreflightCheck("duration", False, "Duration must be greater than zero.")
+    else:
+        duration_check = PreflightCheck("duration", True, f"{job.duration:.2f}s")
+
+    with ThreadPoolExecutor(max_workers=len(job.inputs) + len(job.fonts) + 1) as pool:
+        probe_futures = [pool.submit(_probe_check, ffprobe_path, item) for item in job.inputs]
+        font_futures = {label: pool.submit(_font_check, label, resolve) for label, resolve in job.fonts.items()}
+        output_future = pool.submit(_output_check, job)
+        checks = [duration_check, *_container_checks(job)]
+
+        media: list[MediaInfo | None] = []
+        for future in probe_futures:
+            check, info = future.result()
+            checks.append(check)
+            media.append(info)
+        fonts: dict[str, str] = {}
+        for label, future in font_futures.items():
+            check, path = future.result()
+            checks.append(check)
+            if path:
+                fonts[label] = path
+        checks.append(output_future.result())
+
+    checks.extend(_media_checks(job, media))
+    return PreflightReport(checks, media, fonts, time.perf_counter() - started)
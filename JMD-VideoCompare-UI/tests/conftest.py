@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# The app modules live next to app.py rather than in a package.
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
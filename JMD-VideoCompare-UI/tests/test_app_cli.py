@@ -0,0 +1,72 @@
+import subprocess
+from types import SimpleNamespace
+from typing import cast
+
+import pytest
+
+import app_cli
+from app_cli import CliProcessOptions, build_parser
+from compare_graph import parse_time
+
+
+def _process_args(*extra: str) -> list[str]:
+    return ["process", "--video1", "a.mp4", "--video2", "b.mp4", "--output", "out", *extra]
+
+
+@pytest.mark.parametrize(
+    ("text", "seconds"),
+    [("90", 90.0), ("1:30", 90.0), ("00:01:30", 90.0), ("00:01:30.5", 90.5), ("1.5", 1.5), ("250ms", 0.25)],
+)
+def test_parse_time_accepts_ffmpeg_syntax(text, seconds):
+    assert parse_time(text) == pytest.approx(seconds)
+
+
+@pytest.mark.parametrize("text", ["", "1:2:3:4", "1:75", "abc", "-5", "00:01:30x"])
+def test_parse_time_rejects_invalid(text):
+    with pytest.raises(RuntimeError):
+        parse_time(text)
+
+
+def test_start_and_duration_accept_seconds_and_minutes():
+    args = build_parser().parse_args(_process_args("--start1", "90", "--start2", "1:30", "--duration", "30"))
+    assert parse_time(args.start1) == parse_time(args.start2) == 90.0
+    assert parse_time(args.duration) == 30.0
+
+
+@pytest.mark.parametrize("option", ["--start1", "--start2", "--duration", "--input-start"])
+def test_invalid_time_is_an_argparse_error(option, capsys):
+    with pytest.raises(SystemExit) as exc:
+        build_parser().parse_args(_process_args(option, "1m30"))
+    assert exc.value.code == 2
+    assert "1m30" in capsys.readouterr().err
+
+
+def test_single_pair_folder_batch_creates_output_folder(tmp_path, monkeypatch):
+    folder1, folder2 = tmp_path / "a", tmp_path / "b"
+    for folder in (folder1, folder2):
+        folder.mkdir()
+        (folder / "shot.png").write_bytes(b"")
+    opts = cast(
+        CliProcessOptions,
+        SimpleNamespace(
+            video1=str(folder1),
+            video2=str(folder2),
+            output=str(tmp_path / "out"),
+            sample=None,
+            segments=[],
+            variants=[],
+            contact_sheet=None,
+            dry_run=False,
+            workers=1,
+        ),
+    )
+    monkeypatch.setattr(app_cli, "probe_capabilities", lambda path: SimpleNamespace(has_encoder=lambda *args: True))
+    monkeypatch.setattr(app_cli, "_scan_windows_fonts_registry", dict)
+    monkeypatch.setattr(app_cli, "_build_image_command", lambda opts, *args: ["ffmpeg", args[-1]])
+    monkeypatch.setattr(app_cli.subprocess, "run", lambda cmd, **kwargs: subprocess.CompletedProcess(cmd, 0, "", ""))
+
+    pairs = app_cli._image_pairs(opts, "ffprobe")
+    assert pairs is not None
+    assert pairs == [(str(folder1 / "shot.png"), str(folder2 / "shot.png"), str(tmp_path / "out" / "shot.png"))]
+    assert app_cli._run_image_pairs(opts, "ffmpeg", "ffprobe", pairs) == 0
+    assert (tmp_path / "out").is_dir()
@@ -0,0 +1,136 @@
+import hashlib
+import os
+import re
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from ffmpeg_runtime import (
+    FFmpegCapabilities,
+    _download_archive,
+    _download_to_partial,
+    _load_manifest,
+    _update_manifest,
+    recorded_sha256,
+)
+
+PAYLOAD = os.urandom(300_000)
+
+
+class _FlakyRangeHandler(BaseHTTPRequestHandler):
+    """Serves PAYLOAD with Range support and drops the first transfer halfway."""
+
+    ranges: list[str] = []
+    dropped = False
+
+    def do_GET(self):
+        requested = self.headers.get("Range")
+        start, end = 0, len(PAYLOAD) - 1
+        match = re.fullmatch(r"bytes=(\d+)-(\d*)", requested or "")
+        if match:
+            start = int(match.group(1))
+            end = int(match.group(2)) if match.group(2) else end
+        body = PAYLOAD[start : end + 1]
+        self.send_response(206 if match else 200)
+        if match:
+            self.send_header("Content-Range", f"bytes {start}-{end}/{len(PAYLOAD)}")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if requested == "bytes=0-0":
+            # Mirror probe.
+            self.wfile.write(body)
+            return
+        type(self).ranges.append(requested or "")
+        if not type(self).dropped:
+            type(self).dropped = True
+            self.wfile.write(body[: len(body) // 2])
+            self.wfile.flush()
+            self.close_connection = True
+            return
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def flaky_server(monkeypatch):
+    monkeypatch.setenv("no_proxy", "*")
+    monkeypatch.setenv("NO_PROXY", "*")
+    handler = type("Handler", (_FlakyRangeHandler,), {"ranges": [], "dropped": False})
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}/ffmpeg.zip", handler
+    server.shutdown()
+    server.server_close()
+
+
+def _resumed_offset(ranges: list[str]) -> int:
+    assert len(ranges) == 2
+    match = re.fullmatch(r"bytes=(\d+)-\d*", ranges[1])
+    assert match
+    return int(match.group(1))
+
+
+def test_segmented_download_resumes_after_dropped_connection(tmp_path, flaky_server):
+    url, handler = flaky_server
+    target = tmp_path / "ffmpeg.zip"
+    expected = hashlib.sha256(PAYLOAD).hexdigest()
+
+    _download_archive(target, lambda message: None, urls=[url], expected_sha256=expected)
+
+    assert target.read_bytes() == PAYLOAD
+    assert recorded_sha256(target) == expected
+    assert handler.ranges[0] == f"bytes=0-{len(PAYLOAD) - 1}"
+    assert 0 < _resumed_offset(handler.ranges) < len(PAYLOAD)
+
+
+def test_streamed_download_resumes_with_range(tmp_path, flaky_server):
+    url, handler = flaky_server
+    partial = tmp_path / "ffmpeg.zip.partial"
+
+    _download_to_partial(url, partial, lambda message: None)
+
+    assert partial.read_bytes() == PAYLOAD
+    assert handler.ranges[0] == ""
+    assert 0 < _resumed_offset(handler.ranges) < len(PAYLOAD)
+
+
+def _record_binaries(manifest_path, paths):
+    for path in paths:
+        _update_manifest(manifest_path, path, {"version": path})
+
+
+def test_concurrent_manifest_updates_keep_every_entry(tmp_path):
+    manifest_path = tmp_path / "validation-manifest.json"
+    batches = []
+    for worker in range(4):
+        batch = []
+        for index in range(15):
+            binary = tmp_path / f"ffmpeg-{worker}-{index}.exe"
+            binary.write_bytes(b"")
+            batch.append(str(binary))
+        batches.append(batch)
+
+    with ProcessPoolExecutor(max_workers=len(batches)) as pool:
+        list(pool.map(_record_binaries, [manifest_path] * len(batches), batches))
+
+    assert set(_load_manifest(manifest_path)) == {path for batch in batches for path in batch}
+
+
+@pytest.mark.parametrize(
+    ("banner", "fps_mode"),
+    [
+        ("ffmpeg version 7.1-essentials_build-www.gyan.dev", True),
+        ("ffmpeg version 5.1.2", True),
+        ("ffmpeg version n5.0.1-12-g1b3a8d5f0e", False),
+        ("ffmpeg version 4.4.2-0ubuntu0.22.04.1", False),
+        ("ffmpeg version N-112345-gabcdef0123", True),
+        ("ffmpeg version 2024-01-01-git-abcdef-full_build-www.gyan.dev", True),
+    ],
+)
+def test_fps_mode_needs_ffmpeg_5_1(banner, fps_mode):
+    assert FFmpegCapabilities(banner, {}, [], [], []).supports_fps_mode is fps_mode
@@ -10,7 +10,9 @@ cd /d "%APP_DIR%"
 
 set CLI_HEADLESS=0
 if /I "%FIRST_ARG%"=="process" set CLI_HEADLESS=1
+if /I "%FIRST_ARG%"=="probe" set CLI_HEADLESS=1
 if /I "%FIRST_ARG%"=="ffmpeg-test" set CLI_HEADLESS=1
+if /I "%FIRST_ARG%"=="runtime-bench" set CLI_HEADLESS=1
 if /I "%FIRST_ARG%"=="--version" set CLI_HEADLESS=1
 if /I "%FIRST_ARG%"=="-V" set CLI_HEADLESS=1
 if /I "%FIRST_ARG%"=="--help" set CLI_HEADLESS=1